@@ -1,5 +1,9 @@
+import atexit
+import json
 import os
+import select
 import sys
+import time
 
 from enum import Enum
 
@@ -13,24 +17,130 @@ class LogType(Enum):
 
 
 MINIMUMLOGLEVEL = LogType.error #Set between 0-5, the lower the number, the less logs
+JSONLOGLEVEL = LogType.all #Minimum level of the logs written to the json lines file, when one is set
+JSONLOGPATH_ENVIRONMENT_KEY = "FUFIGHT_LOG_JSON_PATH" #Read from the environment so worker processes write to the same file
+LOGBUFFERSIZE = 64 * 1024 #Buffered logs are written once they reach this many bytes, on errors, and when the process exits
+LOGWRITESIZE = getattr(select, "PIPE_BUF", 512) #Largest write that pipes never interleave with other processes' writes
 
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
 
-def LOG(message):
-    if MINIMUMLOGLEVEL.value >= LogType.imporant.value:
-        print(f"LOG: {message}")
+class LogBuffer:
+    """Collects whole log lines and writes them to a file descriptor in as few writes as possible.
+    Every write ends at the end of a line and is at most LOGWRITESIZE bytes, so lines of other processes
+    writing to the same pipe or O_APPEND file are never mixed with them"""
+    def __init__(self, fileDescriptor = None, isLineBuffered = False):
+        self.fileDescriptor = fileDescriptor
+        self.isLineBuffered = isLineBuffered
+        self.lines = []
+        self.size = 0
 
-def LOGE(message):
-    if MINIMUMLOGLEVEL.value >= LogType.error.value:
-        print(f"ERROR: {message}")
+    def append(self, line, shouldFlush = False):
+        self.lines.append(line)
+        self.size += len(line)
+        if shouldFlush or self.isLineBuffered or self.size >= LOGBUFFERSIZE:
+            self.flush()
 
-def LOGD(message):
-    if MINIMUMLOGLEVEL.value >= LogType.debug.value:
-        print(f"LOGD: {message}")
+    def flush(self):
+        if len(self.lines) == 0:
+            return
+        lines = self.lines
+        self.lines = []
+        self.size = 0
+        if self.fileDescriptor is None:
+            sys.stdout.write(b"".join(lines).decode("utf-8", "replace"))
+            sys.stdout.flush()
+            return
+        #Keep print()'s output in order with the logs
+        sys.stdout.flush()
+        chunk = b""
+        for line in lines:
+            if len(chunk) > 0 and len(chunk) + len(line) > LOGWRITESIZE:
+                writeAll(self.fileDescriptor, chunk)
+                chunk = b""
+            chunk += line
+        writeAll(self.fileDescriptor, chunk)
 
-def LOGW(message):
-    if MINIMUMLOGLEVEL.value >= LogType.warning.value:
-        print(f"WARNING: {message}")
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def writeAll(fileDescriptor, data):
+    while len(data) > 0:
+        data = data[os.write(fileDescriptor, data):]
 
-def LOGA(message):
-    if MINIMUMLOGLEVEL.value >= LogType.all.value:
-        print(f"LOGA: {message}")
\ No newline at end of file
+def getStdoutBuffer():
+    """Returns a buffer writing to stdout's file descriptor, flushing every line when stdout is a terminal someone is watching"""
+    try:
+        return LogBuffer(sys.stdout.fileno(), isLineBuffered=sys.stdout.isatty())
+    except (AttributeError, OSError, ValueError):
+        #stdout was replaced by an object without a file descriptor
+        return LogBuffer(None, isLineBuffered=True)
+
+def getJsonBuffer():
+    jsonLogPath = os.environ.get(JSONLOGPATH_ENVIRONMENT_KEY)
+    if not jsonLogPath:
+        return None
+    return LogBuffer(os.open(jsonLogPath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644))
+
+STDOUTBUFFER = getStdoutBuffer()
+JSONBUFFER = getJsonBuffer()
+
+def setJsonLogPath(jsonLogPath):
+    """Appends every log of at least JSONLOGLEVEL to jsonLogPath as json lines, in this process and the worker processes it starts"""
+    global JSONBUFFER
+    flushLogs()
+    os.environ[JSONLOGPATH_ENVIRONMENT_KEY] = jsonLogPath
+    JSONBUFFER = getJsonBuffer()
+
+def isLogEnabled(logType):
+    """Returns True if a log of logType would be written anywhere. Use it to skip building expensive messages"""
+    return MINIMUMLOGLEVEL.value >= logType.value or (JSONBUFFER is not None and JSONLOGLEVEL.value >= logType.value)
+
+def writeLog(logType, prefix, message, args):
+    """Formats message with args, or calls message if it is a function, only if logType is enabled"""
+    if not isLogEnabled(logType):
+        return
+    if callable(message):
+        message = message()
+    elif len(args) > 0:
+        message = message.format(*args)
+    shouldFlush = logType == LogType.error
+    if MINIMUMLOGLEVEL.value >= logType.value:
+        STDOUTBUFFER.append(f"{prefix}{message}\n".encode("utf-8"), shouldFlush)
+    if JSONBUFFER is not None and JSONLOGLEVEL.value >= logType.value:
+        record = {"time": time.time(), "level": logType.name, "pid": os.getpid(), "message": str(message)}
+        JSONBUFFER.append((json.dumps(record) + "\n").encode("utf-8"), shouldFlush)
+
+def flushLogs():
+    """Writes every buffered log. Worker processes must call it before returning their result, because they exit without running atexit"""
+    STDOUTBUFFER.flush()
+    if JSONBUFFER is not None:
+        JSONBUFFER.flush()
+
+atexit.register(flushLogs)
+if hasattr(os, "register_at_fork"):
+    #Forked workers would otherwise write the parent's buffered logs again
+    os.register_at_fork(before=flushLogs)
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+# Each log accepts either a message, a message with {} formatted with args only when the log is enabled,
+# or a function returning the message that is only called when the log is enabled
+# e.g. LOGA("Renamed {} to {}", path, newPath) or LOGA(lambda: f"Files are {os.listdir(path)}")
+
+def LOG(message, *args):
+    writeLog(LogType.imporant, "LOG: ", message, args)
+
+def LOGE(message, *args):
+    writeLog(LogType.error, "ERROR: ", message, args)
+
+def LOGD(message, *args):
+    writeLog(LogType.debug, "LOGD: ", message, args)
+
+def LOGW(message, *args):
+    writeLog(LogType.warning, "WARNING: ", message, args)
+
+def LOGA(message, *args):
+    writeLog(LogType.all, "LOGA: ", message, args)
@@ -0,0 +1,192 @@
+# Compiles every animation clip of a character into one binary pack that can be memory-mapped and read without parsing any .dae
+#
+# Pack layout, every number is little-endian:
+# 1. Header: 8 bytes magic "FUCLIPS\0", uint32 version, uint32 clip count
+# 2. Clip index, one 96 bytes entry per clip:
+#    64 bytes NUL padded utf-8 clip name (e.g. "hit/head/hardLeft-m"), uint64 clip offset, uint64 clip length,
+#    uint32 joint count, uint32 most keyframes of a joint, float32 duration in seconds, uint32 reserved
+# 3. Clips, each starting at its offset aligned to 16 bytes:
+#    a. One 80 bytes entry per joint: 64 bytes NUL padded utf-8 joint name, uint32 keyframe count,
+#       uint32 times offset and uint32 transforms offset relative to the clip's offset, uint32 reserved
+#    b. Each joint's float32 keyframe times, then its row-major 4x4 float32 transforms with a stride of 64 bytes
+
+import mmap
+import os
+import struct
+import sys
+import xml.etree.ElementTree as ET
+
+from Logger import *
+from daeAnimation import *
+from daeHelpers import writeLinesAtomically
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+ANIMATION_PACK_NAME = "animations.fuclips"
+ANIMATION_PACK_MAGIC = b"FUCLIPS\0"
+ANIMATION_PACK_VERSION = 1
+HEADER_STRUCT = struct.Struct("<8sII")
+CLIP_ENTRY_STRUCT = struct.Struct("<64sQQIIfI")
+JOINT_ENTRY_STRUCT = struct.Struct("<64sIIII")
+CLIP_ALIGNMENT = 16
+IGNORED_FOLDER_NAMES = ["__MACOSX"] #Folders of macOS resource forks that Mixamo zips unzip along with their .dae
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+class AnimationPack:
+    """Memory-maps an animation pack and reads its clips without copying them"""
+    def __init__(self, packPath):
+        requireNumpy("read animation packs")
+        self.packPath = packPath
+        with open(packPath, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, clipCount = HEADER_STRUCT.unpack_from(self.data, 0)
+        if magic != ANIMATION_PACK_MAGIC or version != ANIMATION_PACK_VERSION:
+            raise ValueError(f"{packPath} is not a version {ANIMATION_PACK_VERSION} animation pack")
+        self.clips = {}
+        for index in range(clipCount):
+            name, offset, length, jointCount, keyframeCount, duration, reserved = CLIP_ENTRY_STRUCT.unpack_from(self.data, HEADER_STRUCT.size + index * CLIP_ENTRY_STRUCT.size)
+            self.clips[decodeName(name)] = {"offset": offset, "length": length, "jointCount": jointCount, "keyframeCount": keyframeCount, "duration": duration}
+
+    def getClip(self, clipName):
+        """Returns a dictionary of joint names and their keyframe times and transforms as NumPy views of the pack"""
+        clip = self.clips[clipName]
+        joints = {}
+        for index in range(clip["jointCount"]):
+            name, keyframeCount, timesOffset, transformsOffset, reserved = JOINT_ENTRY_STRUCT.unpack_from(self.data, clip["offset"] + index * JOINT_ENTRY_STRUCT.size)
+            times = np.frombuffer(self.data, dtype="<f4", count=keyframeCount, offset=clip["offset"] + timesOffset)
+            transforms = np.frombuffer(self.data, dtype="<f4", count=keyframeCount * MATRIX_STRIDE, offset=clip["offset"] + transformsOffset).reshape(-1, MATRIX_STRIDE)
+            joints[decodeName(name)] = (times, transforms)
+        return joints
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def encodeName(name):
+    encodedName = name.encode("utf-8")
+    if len(encodedName) > 64:
+        raise ValueError(f"Name is longer than 64 bytes: {name}")
+    return encodedName
+
+def decodeName(name):
+    return name.rstrip(b"\0").decode("utf-8")
+
+def getClipName(animationsPath, daePath):
+    """Returns the clip's name, which is its path in the animations folder without the extension e.g. "idle/idleFight\""""
+    return os.path.splitext(os.path.relpath(daePath, animationsPath))[0].replace(os.sep, "/")
+
+def getClipDaePaths(animationsPath):
+    """Returns the sorted paths of every .dae in the animations folder, skipping __MACOSX folders and their ._ resource forks"""
+    daePaths = []
+    for root, dirs, files in os.walk(animationsPath):
+        dirs[:] = [folder for folder in dirs if not folder in IGNORED_FOLDER_NAMES]
+        for file in files:
+            if file.endswith(".dae") and not file.startswith("._"):
+                daePaths.append(os.path.join(root, file))
+    return sorted(daePaths)
+
+def getClipData(channels):
+    """Returns a clip's joint entries and keyframes as bytes, along with its duration and most keyframes of a joint"""
+    jointEntries = []
+    keyframesData = []
+    offset = len(channels) * JOINT_ENTRY_STRUCT.size
+    for channel in channels:
+        times = channel.times.astype("<f4").tobytes()
+        transforms = channel.transforms.astype("<f4").tobytes()
+        jointEntries.append(JOINT_ENTRY_STRUCT.pack(encodeName(channel.jointName), channel.times.shape[0], offset, offset + len(times), 0))
+        keyframesData += [times, transforms]
+        offset += len(times) + len(transforms)
+    duration = max([float(channel.times.max()) for channel in channels if channel.times.shape[0] > 0], default=0)
+    keyframeCount = max([channel.times.shape[0] for channel in channels], default=0)
+    return b"".join(jointEntries + keyframesData), duration, keyframeCount
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def buildAnimationPack(animationsPath, packPath = None):
+    """Compiles every .dae in a character's animations folder into one pack, which defaults to the character's folder.
+    A .dae that cannot be parsed is logged and left out of the pack. Returns the pack's path"""
+    requireNumpy("build animation packs")
+    packPath = packPath or os.path.join(os.path.dirname(os.path.abspath(animationsPath)), ANIMATION_PACK_NAME)
+    clips = []
+    for daePath in getClipDaePaths(animationsPath):
+        try:
+            channels = getAnimationChannels(readDae(daePath).getroot())
+        except ET.ParseError as e:
+            LOGE(f"Not adding {daePath} to the animation pack because it could not be parsed. Reason: {e}")
+            continue
+        clips.append((getClipName(animationsPath, daePath), channels))
+    clipsOffset = HEADER_STRUCT.size + len(clips) * CLIP_ENTRY_STRUCT.size
+    clipEntries = []
+    clipsData = []
+    for (clipName, channels) in clips:
+        clipsOffset += -clipsOffset % CLIP_ALIGNMENT
+        clipData, duration, keyframeCount = getClipData(channels)
+        clipEntries.append(CLIP_ENTRY_STRUCT.pack(encodeName(clipName), clipsOffset, len(clipData), len(channels), keyframeCount, duration, 0))
+        clipsData.append(clipData)
+        clipsOffset += len(clipData)
+    packData = [HEADER_STRUCT.pack(ANIMATION_PACK_MAGIC, ANIMATION_PACK_VERSION, len(clips))] + clipEntries
+    offset = HEADER_STRUCT.size + len(clipEntries) * CLIP_ENTRY_STRUCT.size
+    for clipData in clipsData:
+        padding = -offset % CLIP_ALIGNMENT
+        packData += [b"\0" * padding, clipData]
+        offset += padding + len(clipData)
+    writeLinesAtomically(packData, packPath)
+    LOG(f"Built animation pack with {len(clips)} clips and {offset} bytes at {packPath}")
+    return packPath
+
+def verifyAnimationPack(packPath, animationsPath):
+    """Returns the list of differences between the pack and the .dae files it was built from. Empty if they match"""
+    animationPack = AnimationPack(packPath)
+    daePaths = getClipDaePaths(animationsPath)
+    differences = []
+    clipNames = [getClipName(animationsPath, daePath) for daePath in daePaths]
+    if sorted(clipNames) != sorted(animationPack.clips.keys()):
+        differences.append(f"Clips {sorted(animationPack.clips.keys())} do not match {sorted(clipNames)}")
+    for (clipName, daePath) in zip(clipNames, daePaths):
+        if not clipName in animationPack.clips:
+            continue
+        joints = animationPack.getClip(clipName)
+        try:
+            channels = getAnimationChannels(readDae(daePath).getroot())
+        except ET.ParseError as e:
+            differences.append(f"{clipName} could not be parsed from {daePath}. Reason: {e}")
+            continue
+        for channel in channels:
+            times, transforms = joints.get(channel.jointName, (None, None))
+            if times is None:
+                differences.append(f"{clipName} is missing joint {channel.jointName}")
+            elif not np.array_equal(times, channel.times.astype("<f4")) or not np.array_equal(transforms, channel.transforms.astype("<f4")):
+                differences.append(f"{clipName}'s {channel.jointName} keyframes do not match {daePath}")
+    return differences
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Main #######################################################
+#----------------------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    """
+    Execute by
+    1. Pass a character's animations folder to build its pack
+        python3 "animationPack.py" <path_to_animations_folder>
+    2. Pass --verify to compare an existing pack against the .dae files it was built from
+        python3 "animationPack.py" <path_to_animations_folder> --verify
+    """
+    shouldVerify = "--verify" in sys.argv
+    arguments = [arg for arg in sys.argv[1:] if arg != "--verify"]
+    if len(arguments) != 1 or not os.path.isdir(arguments[0]):
+        LOGE("Error Usage: python3 animationPack.py <path_to_animations_folder> <optional --verify>")
+        sys.exit(1)
+    animationsPath = arguments[0]
+    packPath = os.path.join(os.path.dirname(os.path.abspath(animationsPath)), ANIMATION_PACK_NAME)
+    if shouldVerify:
+        differences = verifyAnimationPack(packPath, animationsPath)
+        for difference in differences:
+            LOGE(difference)
+        LOG(f"RESULT: {packPath} has {len(differences)} differences with {animationsPath}")
+        sys.exit(1 if len(differences) > 0 else 0)
+    buildAnimationPack(animationsPath, packPath)
+    LOG(f"✅✅✅")
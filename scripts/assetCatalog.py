@@ -0,0 +1,163 @@
+# Catalog of every fighter's character and animation .dae files, so the app and tools can look clips up without walking the Characters folder
+#
+# The catalog is a json file shaped like:
+# {"version": 1, "fighters": {"Kim": {"characters": {"kim": {...}}, "animations": {"idle/idleFight": {...}}}}}
+# where each .dae's entry has its path relative to the fighter's folder, category, duration, frameCount, jointCount and size
+
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+from Logger import *
+from daeHelpers import writeLinesAtomically
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+ASSET_CATALOG_VERSION = 1 #Bump when the entries' format changes
+ASSET_CATALOG_NAME = "assetCatalog.json"
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def getLocalName(tag):
+    """Returns the tag without its namespace e.g. "node" for "{http://www.collada.org/2005/11/COLLADASchema}node\""""
+    return tag.rsplit("}", 1)[-1]
+
+def getDaeMetadata(daePath):
+    """Returns the .dae's duration, frame count, joint count and size by streaming through its elements.
+    Each element is cleared and removed from its parent once read, so only the <source> being read is ever kept in memory"""
+    metadata = {"duration": 0.0, "frameCount": 0, "jointCount": 0, "size": os.path.getsize(daePath)}
+    sourceDepth = 0
+    elementPath = [] #Open elements from the root, whose finished children are removed so memory stays bounded
+    for (event, element) in ET.iterparse(daePath, events=("start", "end")):
+        tag = getLocalName(element.tag)
+        if event == "start":
+            elementPath.append(element)
+            if tag == "node" and element.get("type") == "JOINT":
+                metadata["jointCount"] += 1
+            elif tag == "source":
+                sourceDepth += 1
+            continue
+        elementPath.pop()
+        if tag == "source":
+            sourceDepth -= 1
+            #Keyframe times are the sources whose accessor has a TIME param
+            if any(getLocalName(child.tag) == "param" and child.get("name") == "TIME" for child in element.iter()):
+                times = [float(time) for floatArray in element.iter() if getLocalName(floatArray.tag) == "float_array" for time in (floatArray.text or "").split()]
+                metadata["frameCount"] = max(metadata["frameCount"], len(times))
+                metadata["duration"] = max([metadata["duration"]] + times)
+        if sourceDepth == 0:
+            #Clearing the element alone would keep it attached to its parent, so every element read would stay in memory
+            element.clear()
+            if len(elementPath) > 0:
+                elementPath[-1].remove(element)
+    return metadata
+
+def getFighterPathFromDaePath(daePath):
+    """Returns the fighter's folder of a .dae inside its assets or animations folder, or None"""
+    folderPath = os.path.dirname(os.path.abspath(daePath))
+    while not os.path.basename(folderPath) in ["assets", "animations"]:
+        parentPath = os.path.dirname(folderPath)
+        if parentPath == folderPath:
+            return None
+        folderPath = parentPath
+    return os.path.dirname(folderPath)
+
+def getDaeEntry(fighterPath, daePath):
+    """Returns the catalog's entry of a .dae in fighterPath"""
+    relativePath = os.path.relpath(daePath, fighterPath).replace(os.sep, "/")
+    pathComponents = relativePath.split("/")
+    entry = {"path": relativePath, "category": pathComponents[1] if pathComponents[0] == "animations" and len(pathComponents) > 2 else None}
+    entry.update(getDaeMetadata(daePath))
+    return entry
+
+def getClipName(fighterPath, daePath):
+    """Returns the key of an animation e.g. "idle/idleFight" for animations/idle/idleFight.dae"""
+    return os.path.splitext(os.path.relpath(daePath, os.path.join(fighterPath, "animations")))[0].replace(os.sep, "/")
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+class AssetCatalog:
+    """Loads the catalog at catalogPath and updates the entries of the .dae files that were converted"""
+    def __init__(self, catalogPath, isEnabled = True):
+        self.catalogPath = catalogPath
+        self.isEnabled = isEnabled
+        self.fighters = {}
+        if isEnabled and os.path.isfile(catalogPath):
+            try:
+                with open(catalogPath, "r") as file:
+                    catalog = json.load(file)
+                if catalog.get("version") == ASSET_CATALOG_VERSION:
+                    self.fighters = catalog.get("fighters", {})
+            except (OSError, ValueError) as e:
+                LOGW(f"Ignoring unreadable asset catalog at {catalogPath}. Reason: {e}")
+
+    def getFighter(self, fighterPath):
+        return self.fighters.setdefault(os.path.basename(os.path.abspath(fighterPath)), {"characters": {}, "animations": {}})
+
+    def updateDae(self, daePath):
+        """Adds or replaces the entry of a converted character or animation .dae"""
+        if not self.isEnabled:
+            return
+        fighterPath = getFighterPathFromDaePath(daePath)
+        if fighterPath is None:
+            LOGW(f"Not adding {daePath} to the asset catalog because it is not in a fighter's assets or animations folder")
+            return
+        try:
+            entry = getDaeEntry(fighterPath, daePath)
+        except (ET.ParseError, OSError) as e:
+            LOGE(f"Not adding {daePath} to the asset catalog because it could not be read. Reason: {e}")
+            return
+        fighter = self.getFighter(fighterPath)
+        if entry["path"].startswith("animations/"):
+            fighter["animations"][getClipName(fighterPath, daePath)] = entry
+        else:
+            fighter["characters"][os.path.splitext(os.path.basename(daePath))[0]] = entry
+
+    def updateFighter(self, fighterPath):
+        """Replaces the fighter's characters and adds every animation in its assets and animations folders.
+        Animations are only added because a new fighter is usually converted outside of the Characters folder"""
+        if not self.isEnabled:
+            return
+        self.getFighter(fighterPath)["characters"] = {}
+        for folderName in ["assets", "animations"]:
+            for root, dirs, files in os.walk(os.path.join(fighterPath, folderName)):
+                for file in sorted(files):
+                    if file.endswith(".dae"):
+                        self.updateDae(os.path.join(root, file))
+
+    def save(self):
+        if not self.isEnabled:
+            return
+        catalog = {"version": ASSET_CATALOG_VERSION, "fighters": self.fighters}
+        catalogData = json.dumps(catalog, indent=2, sort_keys=True).encode("utf-8")
+        writeLinesAtomically([catalogData, b"\n"], self.catalogPath)
+        LOGA(lambda: f"Saved asset catalog with {len(self.fighters)} fighters at {self.catalogPath}")
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Main #######################################################
+#----------------------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    """
+    Execute by passing the Characters folder to rebuild its whole catalog
+        python3 "assetCatalog.py" <path_to_Characters_folder>
+        e.g. python3 "assetCatalog.py" '../iOS/FuFight/Resources/3DAssets.scnassets/Characters'
+    """
+    if len(sys.argv) != 2 or not os.path.isdir(sys.argv[1]):
+        LOGE("Error Usage: python3 assetCatalog.py <path_to_Characters_folder>")
+        sys.exit(1)
+    charactersPath = sys.argv[1]
+    assetCatalog = AssetCatalog(os.path.join(charactersPath, ASSET_CATALOG_NAME))
+    assetCatalog.fighters = {}
+    for fighterName in sorted(os.listdir(charactersPath)):
+        fighterPath = os.path.join(charactersPath, fighterName)
+        if os.path.isdir(fighterPath):
+            assetCatalog.updateFighter(fighterPath)
+    assetCatalog.save()
+    LOG(f"RESULT: Cataloged {len(assetCatalog.fighters)} fighters in {charactersPath}")
+    LOG(f"✅✅✅")
@@ -0,0 +1,160 @@
+# Finds the animations and textures in the Characters folder that have the same content, e.g. the specular maps
+# Mixamo's stock characters share, or clips only differing by their skeleton's "mixamorigN_" joint name prefix
+#
+# Files with the same bytes can be replaced with hard links to a single copy. Every duplicate is listed in a report shaped like:
+# {"version": 1, "savedBytes": 0, "groups": [{"hash": "...", "size": 0, "paths": ["Kim/assets/kimTexture1_Specular.png", ...], "identicalPaths": [...]}]}
+# where paths share the same normalized content, and identicalPaths are the ones with the same bytes as the first path
+
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+
+from Logger import *
+from buildCache import HASH_CHUNK_SIZE, getFileHash
+from daeHelpers import writeLinesAtomically
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+DEDUPE_REPORT_VERSION = 1 #Bump when the report's format or the normalization changes
+DEDUPE_EXTENSIONS = [".dae", ".png"]
+JOINT_PREFIX_PATTERN = re.compile(rb"mixamorig\d*[_:]") #e.g. "mixamorig6_Hips" or "mixamorig:Hips"
+CANONICAL_JOINT_PREFIX = b"mixamorig_"
+DAE_TIMESTAMP_PATTERN = re.compile(rb"<(created|modified)>[^<]*</(created|modified)>")
+DAE_WHITESPACE_PATTERN = re.compile(rb">\s+<")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_CONTENT_CHUNKS = {b"IHDR", b"PLTE", b"tRNS", b"IDAT"} #Chunks that change the pixels. Text, time and dpi chunks are ignored
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def getNormalizedDaeHash(daePath):
+    """Returns the sha256 of the .dae's content without its created and modified dates,
+    indentation, and with every joint name prefix replaced by "mixamorig_\""""
+    daeHash = hashlib.sha256()
+    with open(daePath, "rb") as file:
+        for line in file:
+            line = DAE_TIMESTAMP_PATTERN.sub(b"", line.strip())
+            line = DAE_WHITESPACE_PATTERN.sub(b"><", line)
+            daeHash.update(JOINT_PREFIX_PATTERN.sub(CANONICAL_JOINT_PREFIX, line))
+    return daeHash.hexdigest()
+
+def getNormalizedPngHash(pngPath):
+    """Returns the sha256 of the .png's header, palette, transparency and compressed pixels, ignoring its other chunks.
+    Returns the hash of the whole file if it is not a valid .png"""
+    pngHash = hashlib.sha256()
+    with open(pngPath, "rb") as file:
+        if file.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+            return getFileHash(pngPath)
+        while True:
+            chunkHeader = file.read(8)
+            if len(chunkHeader) < 8:
+                break
+            length, chunkType = struct.unpack(">I4s", chunkHeader)
+            if chunkType in PNG_CONTENT_CHUNKS:
+                #IDAT chunks are hashed as one stream, so files that only split their pixels differently match
+                if chunkType != b"IDAT":
+                    pngHash.update(chunkType)
+                remainingLength = length
+                while remainingLength > 0:
+                    chunk = file.read(min(remainingLength, HASH_CHUNK_SIZE))
+                    if len(chunk) == 0:
+                        break
+                    pngHash.update(chunk)
+                    remainingLength -= len(chunk)
+                file.seek(4, os.SEEK_CUR)
+            else:
+                file.seek(length + 4, os.SEEK_CUR)
+            if chunkType == b"IEND":
+                break
+    return pngHash.hexdigest()
+
+def getNormalizedHash(path):
+    if path.endswith(".dae"):
+        return getNormalizedDaeHash(path)
+    return getNormalizedPngHash(path)
+
+def getDedupablePaths(charactersPath):
+    """Returns the sorted paths of every .dae and .png in charactersPath including its subdirectories"""
+    paths = []
+    for root, dirs, files in os.walk(charactersPath):
+        for file in files:
+            if os.path.splitext(file)[1].lower() in DEDUPE_EXTENSIONS:
+                paths.append(os.path.join(root, file))
+    return sorted(paths)
+
+def linkFile(sourcePath, duplicatePath):
+    """Replaces duplicatePath with a hard link to sourcePath. The link is created next to it first,
+    so duplicatePath is never missing. Files rewritten later with writeLinesAtomically get their own copy again"""
+    tempPath = os.path.join(os.path.dirname(duplicatePath), f".{os.path.basename(duplicatePath)}.link")
+    if os.path.exists(tempPath):
+        os.unlink(tempPath)
+    os.link(sourcePath, tempPath)
+    os.replace(tempPath, duplicatePath)
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def getDuplicateGroups(charactersPath):
+    """Returns the groups of files with the same normalized content, each with the hash of that content,
+    the size of its first file, and its paths sorted with the files identical to the first path"""
+    pathsByHash = {}
+    for path in getDedupablePaths(charactersPath):
+        pathsByHash.setdefault(getNormalizedHash(path), []).append(path)
+    groups = []
+    for (normalizedHash, paths) in sorted(pathsByHash.items(), key=lambda item: item[1][0]):
+        if len(paths) < 2:
+            continue
+        sourceHash = getFileHash(paths[0])
+        identicalPaths = [path for path in paths[1:] if getFileHash(path) == sourceHash]
+        groups.append({"hash": normalizedHash, "size": os.path.getsize(paths[0]), "paths": paths, "identicalPaths": identicalPaths})
+    return groups
+
+def dedupeAssets(charactersPath, reportPath, shouldLink = False):
+    """Finds the duplicated animations and textures in charactersPath and writes them into the dedupe report at reportPath,
+    which stays out of charactersPath so it is not bundled with the app. If shouldLink, each file identical to its group's first file
+    is replaced with a hard link to it. Returns the duplicate groups"""
+    groups = getDuplicateGroups(charactersPath)
+    savedBytes = 0
+    linkedCount = 0
+    for group in groups:
+        sourcePath = group["paths"][0]
+        for duplicatePath in group["identicalPaths"]:
+            if shouldLink and not os.path.samefile(sourcePath, duplicatePath):
+                linkFile(sourcePath, duplicatePath)
+                linkedCount += 1
+                LOGA(lambda: f"Linked {duplicatePath} to {sourcePath}")
+            savedBytes += group["size"]
+        #Report paths relative to the Characters folder like the asset catalog, so the report is the same on every machine
+        for key in ["paths", "identicalPaths"]:
+            group[key] = [os.path.relpath(path, charactersPath).replace(os.sep, "/") for path in group[key]]
+    report = {"version": DEDUPE_REPORT_VERSION, "savedBytes": savedBytes, "groups": groups}
+    writeLinesAtomically([json.dumps(report, indent=2).encode("utf-8"), b"\n"], reportPath)
+    LOG(f"Found {len(groups)} groups of duplicated assets with {sum(len(group['identicalPaths']) for group in groups)} identical files taking {savedBytes} bytes. "
+        f"Linked {linkedCount} files. Wrote the report at {reportPath}")
+    return groups
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Main #######################################################
+#----------------------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    """
+    Execute by passing the Characters folder to report its duplicated animations and textures
+        python3 "assetDeduper.py" <path_to_Characters_folder> <optional --link>
+        e.g. python3 "assetDeduper.py" '../iOS/FuFight/Resources/3DAssets.scnassets/Characters' --link
+    Pass --link to also replace every identical file with a hard link to a single copy
+    The report is written to DEDUPE_REPORT_PATH of mixamoToXcode.py
+    """
+    from mixamoToXcode import DEDUPE_REPORT_PATH
+    shouldLink = "--link" in sys.argv
+    if shouldLink:
+        sys.argv.remove("--link")
+    if len(sys.argv) != 2 or not os.path.isdir(sys.argv[1]):
+        LOGE("Error Usage: python3 assetDeduper.py <path_to_Characters_folder> <optional --link>")
+        sys.exit(1)
+    dedupeAssets(sys.argv[1], DEDUPE_REPORT_PATH, shouldLink)
+    LOG(f"✅✅✅")
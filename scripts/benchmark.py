@@ -0,0 +1,470 @@
+# Times each stage of the character and animation scripts on synthetic Mixamo downloads, so changes can be compared on a fixed workload
+#
+# The generated zip files mimic Mixamo's downloads: ChNN_nonPBR.zip characters with textures/ChNN_1001_*.png and ChNN_1002_*.png,
+# animation zips, __MACOSX entries, and .dae files whose animations were not flattened yet
+
+import json
+import math
+import platform
+import random
+import shutil
+import statistics
+import struct
+import tempfile
+import time
+import zlib
+
+import Logger
+
+# Custom Files
+from mixamoAnimToXcode import *
+from Logger import *
+
+#----------------------------------------------------------------------------------------------------------------
+############################################### CUSTOMIZABLE SETTINGS ###########################################
+#----------------------------------------------------------------------------------------------------------------
+BENCHMARK_RESULTS_PATH = "benchmarkResults.json" #Can be overridden with --output path
+BENCHMARK_ITERATIONS = 3 #Can be overridden with --iterations N
+BENCHMARK_SEED = 2024 #Same seed generates the same zip files
+BENCHMARK_WORKLOADS = {
+    "small": {
+        "fighterTypes": [FighterType.kim, FighterType.deeJay],
+        "jointCounts": [25, 52],
+        "frameCounts": [30, 90],
+        "vertexCount": 2000,
+        "textureSize": 128,
+        "animationsPerFighter": 4,
+    },
+    "medium": {
+        "fighterTypes": [FighterType.kim, FighterType.deeJay, FighterType.jad, FighterType.corey],
+        "jointCounts": [25, 52, 65],
+        "frameCounts": [30, 90, 180],
+        "vertexCount": 8000,
+        "textureSize": 512,
+        "animationsPerFighter": 8,
+    },
+    "large": {
+        "fighterTypes": [FighterType.kim, FighterType.deeJay, FighterType.jad, FighterType.ruby, FighterType.cain, FighterType.andrew, FighterType.corey, FighterType.alexis],
+        "jointCounts": [25, 41, 52, 65],
+        "frameCounts": [30, 90, 180, 360],
+        "vertexCount": 20000,
+        "textureSize": 1024,
+        "animationsPerFighter": 16,
+    },
+}
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+BENCHMARK_RESULTS_VERSION = 1
+BENCHMARK_STAGES = ["unzipFile", "getFighterPaths", "updateDaeFile", "updateFighters", "prepareDaeAnimation"]
+FRAMES_PER_SECOND = 30
+#Mixamo's joints ordered so that a joint's parent always comes before it, then every finger joint last
+MIXAMO_BODY_JOINTS = [
+    ("Hips", None), ("Spine", "Hips"), ("Spine1", "Spine"), ("Spine2", "Spine1"), ("Neck", "Spine2"), ("Head", "Neck"), ("HeadTop_End", "Head"),
+    ("LeftShoulder", "Spine2"), ("LeftArm", "LeftShoulder"), ("LeftForeArm", "LeftArm"), ("LeftHand", "LeftForeArm"),
+    ("RightShoulder", "Spine2"), ("RightArm", "RightShoulder"), ("RightForeArm", "RightArm"), ("RightHand", "RightForeArm"),
+    ("LeftUpLeg", "Hips"), ("LeftLeg", "LeftUpLeg"), ("LeftFoot", "LeftLeg"), ("LeftToeBase", "LeftFoot"), ("LeftToe_End", "LeftToeBase"),
+    ("RightUpLeg", "Hips"), ("RightLeg", "RightUpLeg"), ("RightFoot", "RightLeg"), ("RightToeBase", "RightFoot"), ("RightToe_End", "RightToeBase"),
+    ("LeftEye", "Head"), ("RightEye", "Head"),
+]
+MIXAMO_FINGER_JOINTS = [(f"{side}Hand{finger}{index}", f"{side}Hand{finger}{index - 1}" if index > 1 else f"{side}Hand")
+                        for side in ["Left", "Right"] for finger in ["Thumb", "Index", "Middle", "Ring", "Pinky"] for index in range(1, 5)]
+MIXAMO_JOINTS = [(f"mixamorig_{name}", f"mixamorig_{parent}" if parent is not None else None) for (name, parent) in MIXAMO_BODY_JOINTS + MIXAMO_FINGER_JOINTS]
+MIXAMO_TEXTURE_TYPES = ["Diffuse", "Normal", "Specular"]
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def formatNumbers(numbers):
+    return " ".join(f"{number:.6f}" for number in numbers)
+
+def getRandomMatrix(rng, maximumTranslation):
+    """Returns a row-major 4x4 matrix rotating around the y axis and translating up to maximumTranslation"""
+    angle = rng.uniform(-math.pi, math.pi)
+    x, y, z = [rng.uniform(-maximumTranslation, maximumTranslation) for _ in range(3)]
+    return [math.cos(angle), 0, math.sin(angle), x, 0, 1, 0, y, -math.sin(angle), 0, math.cos(angle), z, 0, 0, 0, 1]
+
+def getPngData(size, rng):
+    """Returns an RGB .png of size by size pixels of smooth noise, which compresses about as well as a real texture"""
+    rows = []
+    for y in range(size):
+        row = bytearray([0])
+        for x in range(size):
+            value = int(127 + 60 * math.sin(x / 9.0) * math.cos(y / 7.0)) + rng.randint(0, 24)
+            row += bytes([value, (value * 3) % 256, 255 - value])
+        rows.append(bytes(row))
+    def getChunk(chunkType, data):
+        return struct.pack(">I", len(data)) + chunkType + data + struct.pack(">I", zlib.crc32(chunkType + data) & 0xffffffff)
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + getChunk(b"IHDR", header) + getChunk(b"IDAT", zlib.compress(b"".join(rows), 6)) + getChunk(b"IEND", b"")
+
+def getTextureNames(mixamoKey, hasMultipleTextureVersion):
+    """Returns the texture names Mixamo uses e.g. Ch02_1002_Diffuse.png, with the specular in 1001 when there are 2 versions"""
+    textureNames = []
+    for textureType in MIXAMO_TEXTURE_TYPES:
+        version = "1001" if not hasMultipleTextureVersion or textureType == "Specular" else "1002"
+        textureNames.append(f"{mixamoKey}_{version}_{textureType}.png")
+    return textureNames
+
+def getAnimationLines(joints, frameCount, rng):
+    """Returns the <library_animations> of an unflattened Mixamo .dae, with one <animation id=...> per joint"""
+    times = [frame / FRAMES_PER_SECOND for frame in range(frameCount)]
+    lines = ["  <library_animations>"]
+    for (joint, parent) in joints:
+        transforms = []
+        for frame in range(frameCount):
+            transforms += getRandomMatrix(rng, 20)
+        lines += [
+            f'    <animation id="{joint}-anim" name="{joint}">',
+            f'      <source id="{joint}-Matrix-animation-input">',
+            f'        <float_array id="{joint}-Matrix-animation-input-array" count="{frameCount}">',
+            formatNumbers(times) + "</float_array>",
+            "        <technique_common>",
+            f'          <accessor source="#{joint}-Matrix-animation-input-array" count="{frameCount}">',
+            '            <param name="TIME" type="float"/>',
+            "          </accessor>",
+            "        </technique_common>",
+            "      </source>",
+            f'      <source id="{joint}-Matrix-animation-output-transform">',
+            f'        <float_array id="{joint}-Matrix-animation-output-transform-array" count="{frameCount * 16}">',
+        ]
+        lines += [formatNumbers(transforms[index:index + 16]) for index in range(0, len(transforms), 16)]
+        lines[-1] += "</float_array>"
+        lines += [
+            "        <technique_common>",
+            f'          <accessor source="#{joint}-Matrix-animation-output-transform-array" count="{frameCount}" stride="16">',
+            '            <param type="float4x4"/>',
+            "          </accessor>",
+            "        </technique_common>",
+            "      </source>",
+            f'      <source id="{joint}-Interpolations">',
+            f'        <Name_array id="{joint}-Interpolations-array" count="{frameCount}">',
+            " " + " ".join(["LINEAR"] * frameCount) + "</Name_array>",
+            "        <technique_common>",
+            f'          <accessor source="#{joint}-Interpolations-array" count="{frameCount}">',
+            '            <param type="name"/>',
+            "          </accessor>",
+            "        </technique_common>",
+            "      </source>",
+            f'      <sampler id="{joint}-Matrix-animation-transform">',
+            f'        <input semantic="INPUT" source="#{joint}-Matrix-animation-input"/>',
+            f'        <input semantic="OUTPUT" source="#{joint}-Matrix-animation-output-transform"/>',
+            f'        <input semantic="INTERPOLATION" source="#{joint}-Interpolations"/>',
+            "      </sampler>",
+            f'      <channel source="#{joint}-Matrix-animation-transform" target="{joint}/matrix"/>',
+            "    </animation>",
+        ]
+    lines.append("  </library_animations>")
+    return lines
+
+def getSkinLines(meshName, joints, textureNames, vertexCount, rng):
+    """Returns the images, materials, effects, geometries and controllers of a Mixamo character"""
+    lines = ["  <library_images>"]
+    for (index, textureName) in enumerate(textureNames):
+        lines += [f'    <image id="file{index}-image" name="file{index}">', f"      <init_from>textures/{textureName}</init_from>", "    </image>"]
+    lines += [
+        "  </library_images>",
+        "  <library_materials>",
+        f'    <material id="{meshName}_material" name="{meshName}_material">',
+        f'      <instance_effect url="#{meshName}_material-fx"/>',
+        "    </material>",
+        "  </library_materials>",
+        "  <library_effects>",
+        f'    <effect id="{meshName}_material-fx" name="{meshName}_material">',
+        "      <profile_COMMON>",
+        '        <technique sid="standard">',
+        "          <phong>",
+        "            <diffuse>",
+        '              <texture texture="file0-image" texcoord="CHANNEL0"/>',
+        "            </diffuse>",
+        "          </phong>",
+        "        </technique>",
+        "      </profile_COMMON>",
+        "    </effect>",
+        "  </library_effects>",
+        "  <library_geometries>",
+        f'    <geometry id="{meshName}-lib" name="{meshName}Mesh">',
+        "      <mesh>",
+    ]
+    for (sourceName, stride, parameters) in [("Position", 3, "XYZ"), ("Normal0", 3, "XYZ"), ("UV0", 2, "ST")]:
+        values = [rng.uniform(-100, 100) if sourceName == "Position" else rng.uniform(0, 1) for _ in range(vertexCount * stride)]
+        lines += [
+            f'        <source id="{meshName}-lib-{sourceName}" name="{sourceName.lower()}">',
+            f'          <float_array id="{meshName}-lib-{sourceName}-array" count="{len(values)}"> {formatNumbers(values)}</float_array>',
+            "          <technique_common>",
+            f'            <accessor count="{vertexCount}" source="#{meshName}-lib-{sourceName}-array" stride="{stride}">',
+        ]
+        lines += [f'              <param name="{parameter}" type="float"/>' for parameter in parameters]
+        lines += ["            </accessor>", "          </technique_common>", "        </source>"]
+    triangleCount = vertexCount - 2
+    indices = [index for triangle in range(triangleCount) for index in [triangle, triangle + 1, triangle + 2] for _ in range(3)]
+    lines += [
+        f'        <vertices id="{meshName}-lib-Vertex">',
+        f'          <input semantic="POSITION" source="#{meshName}-lib-Position"/>',
+        "        </vertices>",
+        f'        <polylist count="{triangleCount}" material="{meshName}_materialSG">',
+        f'          <input semantic="VERTEX" offset="0" source="#{meshName}-lib-Vertex"/>',
+        f'          <input semantic="NORMAL" offset="1" source="#{meshName}-lib-Normal0"/>',
+        f'          <input semantic="TEXCOORD" offset="2" set="0" source="#{meshName}-lib-UV0"/>',
+        "          <vcount> " + " ".join(["3"] * triangleCount) + "</vcount>",
+        "          <p> " + " ".join(str(index) for index in indices) + "</p>",
+        "        </polylist>",
+        "      </mesh>",
+        "    </geometry>",
+        "  </library_geometries>",
+        "  <library_controllers>",
+        f'    <controller id="{meshName}Controller">',
+        f'      <skin source="#{meshName}-lib">',
+        "        <bind_shape_matrix>" + formatNumbers([1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]) + "</bind_shape_matrix>",
+        f'        <source id="{meshName}Controller-Joints">',
+        f'          <Name_array id="{meshName}Controller-Joints-array" count="{len(joints)}">',
+    ]
+    lines += [f" {joint}" for (joint, parent) in joints]
+    lines[-1] += "</Name_array>"
+    inverseBindMatrices = [getRandomMatrix(rng, 50) for _ in joints]
+    weights = [rng.uniform(0, 1) for _ in range(vertexCount)]
+    lines += [
+        "          <technique_common>",
+        f'            <accessor source="#{meshName}Controller-Joints-array" count="{len(joints)}">',
+        '              <param type="name"/>',
+        "            </accessor>",
+        "          </technique_common>",
+        "        </source>",
+        f'        <source id="{meshName}Controller-Matrices">',
+        f'          <float_array id="{meshName}Controller-Matrices-array" count="{len(joints) * 16}">',
+    ]
+    lines += [formatNumbers(matrix) for matrix in inverseBindMatrices]
+    lines[-1] += "</float_array>"
+    lines += [
+        "          <technique_common>",
+        f'            <accessor source="#{meshName}Controller-Matrices-array" count="{len(joints)}" stride="16">',
+        '              <param type="float4x4"/>',
+        "            </accessor>",
+        "          </technique_common>",
+        "        </source>",
+        f'        <source id="{meshName}Controller-Weights">',
+        f'          <float_array id="{meshName}Controller-Weights-array" count="{vertexCount}">',
+        formatNumbers(weights) + "</float_array>",
+        "          <technique_common>",
+        f'            <accessor source="#{meshName}Controller-Weights-array" count="{vertexCount}">',
+        '              <param type="float"/>',
+        "            </accessor>",
+        "          </technique_common>",
+        "        </source>",
+        "        <joints>",
+        f'          <input semantic="JOINT" source="#{meshName}Controller-Joints"/>',
+        f'          <input semantic="INV_BIND_MATRIX" source="#{meshName}Controller-Matrices"/>',
+        "        </joints>",
+        f'        <vertex_weights count="{vertexCount}">',
+        f'          <input semantic="JOINT" offset="0" source="#{meshName}Controller-Joints"/>',
+        f'          <input semantic="WEIGHT" offset="1" source="#{meshName}Controller-Weights"/>',
+        "          <vcount>" + " ".join(["1"] * vertexCount) + "</vcount>",
+        "          <v>" + " ".join(f"{rng.randrange(len(joints))} {index}" for index in range(vertexCount)) + "</v>",
+        "        </vertex_weights>",
+        "      </skin>",
+        "    </controller>",
+        "  </library_controllers>",
+    ]
+    return lines
+
+def getVisualSceneLines(meshName, joints, rng, hasSkin):
+    """Returns the <library_visual_scenes> with the joints nested under their parents, and the skinned mesh if hasSkin"""
+    childrenByParent = {}
+    for (joint, parent) in joints:
+        childrenByParent.setdefault(parent, []).append(joint)
+    lines = ["  <library_visual_scenes>", '    <visual_scene id="RootNode" name="RootNode">']
+    def appendJoint(joint, depth):
+        indentation = "  " * depth
+        lines.append(f'{indentation}<node id="{joint}" name="{joint}" sid="{joint}" type="JOINT">')
+        lines.append(f'{indentation}  <matrix sid="matrix">{formatNumbers(getRandomMatrix(rng, 20))}</matrix>')
+        for child in childrenByParent.get(joint, []):
+            appendJoint(child, depth + 1)
+        lines.append(f"{indentation}</node>")
+    for root in childrenByParent[None]:
+        appendJoint(root, 3)
+    if hasSkin:
+        lines += [
+            f'      <node id="{meshName}" name="{meshName}" type="NODE">',
+            f'        <instance_controller url="#{meshName}Controller">',
+            f"          <skeleton>#{joints[0][0]}</skeleton>",
+            "          <bind_material>",
+            "            <technique_common>",
+            f'              <instance_material symbol="{meshName}_materialSG" target="#{meshName}_material"/>',
+            "            </technique_common>",
+            "          </bind_material>",
+            "        </instance_controller>",
+            "      </node>",
+        ]
+    lines += ["    </visual_scene>", "  </library_visual_scenes>", "  <scene>", '    <instance_visual_scene url="#RootNode"/>', "  </scene>", "</COLLADA>"]
+    return lines
+
+def getDaeData(meshName, joints, frameCount, textureNames, vertexCount, rng):
+    """Returns an unflattened Mixamo .dae. It is skinned when textureNames is not empty"""
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<COLLADA xmlns="http://www.collada.org/2005/11/COLLADASchema" version="1.4.1">',
+        "  <asset>",
+        "    <contributor>",
+        "      <author>Mixamo</author>",
+        "      <authoring_tool>COLLADA Mixamo exporter</authoring_tool>",
+        "    </contributor>",
+        '    <unit meter="0.010000"/>',
+        "    <up_axis>Y_UP</up_axis>",
+        "  </asset>",
+    ]
+    hasSkin = len(textureNames) > 0
+    if hasSkin:
+        lines += getSkinLines(meshName, joints, textureNames, vertexCount, rng)
+    lines += getAnimationLines(joints, frameCount, rng)
+    lines += getVisualSceneLines(meshName, joints, rng, hasSkin)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+def writeMixamoZip(zipPath, daeName, daeData, textures):
+    """Writes a zip like Mixamo's, with the .dae, its textures and their __MACOSX resource forks"""
+    with zipfile.ZipFile(zipPath, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr(daeName, daeData)
+        zip_ref.writestr(f"__MACOSX/._{daeName}", b"\x00\x05\x16\x07")
+        for (textureName, textureData) in textures.items():
+            zip_ref.writestr(f"textures/{textureName}", textureData)
+            zip_ref.writestr(f"__MACOSX/textures/._{textureName}", b"\x00\x05\x16\x07")
+
+def generateWorkload(workload, downloadsPath, seed):
+    """Writes a character zip per fighter in downloadsPath.
+    Returns each fighter type's animation zips as a list of (category, zip name, zip data) to copy into its converted folder"""
+    rng = random.Random(seed)
+    animationZipsDic = {}
+    for (fighterIndex, fighterType) in enumerate(workload["fighterTypes"]):
+        fighter = getFighter(fighterType)
+        joints = MIXAMO_JOINTS[:workload["jointCounts"][fighterIndex % len(workload["jointCounts"])]]
+        textureNames = getTextureNames(fighter.mixamoKey, fighter.hasMultipleTextureVersion)
+        textures = {textureName: getPngData(workload["textureSize"], rng) for textureName in textureNames}
+        daeData = getDaeData(fighter.mixamoName, joints, 2, textureNames, workload["vertexCount"], rng)
+        writeMixamoZip(f"{downloadsPath}/{fighter.folderName}.zip", f"{fighter.folderName}.dae", daeData, textures)
+        animationZips = []
+        for animationIndex in range(workload["animationsPerFighter"]):
+            frameCount = workload["frameCounts"][animationIndex % len(workload["frameCounts"])]
+            category = ANIMATION_CATEGORIES[animationIndex % len(ANIMATION_CATEGORIES)]
+            animationName = f"{category}Animation{animationIndex}"
+            #Every other animation is downloaded with its skin, like the ones Mixamo exports with textures
+            hasSkin = animationIndex % 2 == 0
+            animationTextures = textures if hasSkin else {}
+            animationData = getDaeData(fighter.mixamoName, joints, frameCount, list(animationTextures.keys()), workload["vertexCount"], rng)
+            animationZipPath = f"{downloadsPath}/{animationName}.zip"
+            writeMixamoZip(animationZipPath, f"{animationName}.dae", animationData, animationTextures)
+            with open(animationZipPath, "rb") as file:
+                animationZips.append((category, animationName, file.read()))
+            os.remove(animationZipPath)
+        animationZipsDic[fighterType] = animationZips
+    return animationZipsDic
+
+def timeCall(stageTimes, stageName, function, *args):
+    """Calls function with args and adds the seconds it took to stageName's time"""
+    start = time.perf_counter()
+    result = function(*args)
+    stageTimes[stageName] = stageTimes.get(stageName, 0) + time.perf_counter() - start
+    return result
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def runBenchmarkIteration(workload, seed):
+    """Generates the workload in a temporary folder and returns the seconds each stage took and the number of calls"""
+    stageTimes = {}
+    stageCalls = {}
+    with tempfile.TemporaryDirectory() as rootPath:
+        downloadsPath = f"{rootPath}/Downloads"
+        unzipPath = f"{rootPath}/Unzip"
+        createFolder(downloadsPath)
+        createFolder(unzipPath)
+        animationZipsDic = generateWorkload(workload, downloadsPath, seed)
+        #1. unzipFile and updateDaeFile on their own copies of the character zips
+        for fighterType in workload["fighterTypes"]:
+            fighter = getFighter(fighterType)
+            zipPath = f"{unzipPath}/{fighter.folderName}.zip"
+            shutil.copyfile(f"{downloadsPath}/{fighter.folderName}.zip", zipPath)
+            unzippedPath = timeCall(stageTimes, "unzipFile", unzipFile, zipPath)
+            timeCall(stageTimes, "updateDaeFile", updateDaeFile, fighterType, f"{unzippedPath}/{fighter.folderName}.dae")
+        stageCalls["unzipFile"] = stageCalls["updateDaeFile"] = len(workload["fighterTypes"])
+        #2. getFighterPaths, which also unzips every character
+        fighterPathsDic = timeCall(stageTimes, "getFighterPaths", getFighterPaths, downloadsPath)
+        stageCalls["getFighterPaths"] = 1
+        #3. updateFighters, then prepareDaeAnimation on the animations copied into each converted fighter
+        stageCalls["updateFighters"] = stageCalls["prepareDaeAnimation"] = 0
+        for (fighterType, fighterPath) in fighterPathsDic.items():
+            newFighterPath = timeCall(stageTimes, "updateFighters", updateFighters, fighterType, fighterPath)
+            stageCalls["updateFighters"] += 1
+            for (category, animationName, zipData) in animationZipsDic[fighterType]:
+                animationZipPath = f"{newFighterPath}/animations/{category}/{animationName}.zip"
+                with open(animationZipPath, "wb") as file:
+                    file.write(zipData)
+                timeCall(stageTimes, "prepareDaeAnimation", prepareDaeAnimation, animationZipPath, "")
+                stageCalls["prepareDaeAnimation"] += 1
+    return stageTimes, stageCalls
+
+def runBenchmark(workloadName, iterations, seed = BENCHMARK_SEED):
+    """Runs the workload iterations times and returns the results as a json serializable dictionary"""
+    workload = BENCHMARK_WORKLOADS[workloadName]
+    stages = {stageName: {"seconds": []} for stageName in BENCHMARK_STAGES}
+    for iteration in range(iterations):
+        stageTimes, stageCalls = runBenchmarkIteration(workload, seed)
+        for stageName in BENCHMARK_STAGES:
+            stages[stageName]["seconds"].append(stageTimes.get(stageName, 0))
+            stages[stageName]["calls"] = stageCalls.get(stageName, 0)
+        print(f"Iteration {iteration + 1} of {iterations}: " + ", ".join(f"{stageName} {stageTimes.get(stageName, 0):.3f}s" for stageName in BENCHMARK_STAGES))
+    for stage in stages.values():
+        stage["min"] = min(stage["seconds"])
+        stage["median"] = statistics.median(stage["seconds"])
+        stage["mean"] = statistics.mean(stage["seconds"])
+    return {
+        "version": BENCHMARK_RESULTS_VERSION,
+        "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count(),
+        "workload": dict(workload, name=workloadName, seed=seed, fighterTypes=[fighterType.value for fighterType in workload["fighterTypes"]]),
+        "settings": dict(getFighterSettings(workload["fighterTypes"][0]), **getAnimationSettings("", False)),
+        "iterations": iterations,
+        "stages": stages,
+    }
+
+def printResults(results, baselineResults = None):
+    """Prints each stage's median seconds, and how much faster or slower it is than the baseline's median"""
+    for (stageName, stage) in results["stages"].items():
+        comparison = ""
+        if baselineResults is not None and stageName in baselineResults["stages"] and stage["median"] > 0:
+            baselineMedian = baselineResults["stages"][stageName]["median"]
+            comparison = f"\t{baselineMedian / stage['median']:.2f}x baseline's {baselineMedian:.4f}s"
+        print(f"{stageName:<20} {stage['calls']:>4} calls\tmedian {stage['median']:.4f}s\tmin {stage['min']:.4f}s{comparison}")
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Main #######################################################
+#----------------------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    """
+    Execute by
+    1. Pass the workload's name, which is small if not passed
+        python3 "benchmark.py" <optional_workload_name> <optional --iterations N> <optional --output path>
+        e.g. python3 "benchmark.py" medium --iterations 5 --output results.json
+    2. Pass --baseline with a previous run's results to compare each stage's median
+        e.g. python3 "benchmark.py" medium --baseline results.json
+    """
+    iterations = popArgument("--iterations", hasValue=True)
+    iterations = BENCHMARK_ITERATIONS if iterations is None else int(iterations)
+    resultsPath = popArgument("--output", hasValue=True) or BENCHMARK_RESULTS_PATH
+    baselinePath = popArgument("--baseline", hasValue=True)
+    workloadName = sys.argv[1] if len(sys.argv) > 1 else "small"
+    if len(sys.argv) > 2 or not workloadName in BENCHMARK_WORKLOADS or iterations < 1:
+        LOGE(f"Error Usage: python3 benchmark.py <optional {'|'.join(BENCHMARK_WORKLOADS.keys())}> <optional --iterations N> <optional --output path> <optional --baseline path>")
+        sys.exit(1)
+    #Only print the benchmark's results. Failures still stop the benchmark
+    Logger.MINIMUMLOGLEVEL = LogType.no
+    results = runBenchmark(workloadName, iterations)
+    baselineResults = None
+    if baselinePath is not None:
+        with open(baselinePath, "r") as file:
+            baselineResults = json.load(file)
+    printResults(results, baselineResults)
+    writeLinesAtomically([json.dumps(results, indent=2).encode("utf-8"), b"\n"], resultsPath)
+    print(f"Wrote benchmark results to {resultsPath}")
@@ -0,0 +1,96 @@
+# Persistent build manifest that lets the scripts skip Mixamo zips that were already converted and have not changed since
+
+import hashlib
+import json
+import os
+
+from Logger import *
+from daeHelpers import writeLinesAtomically
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+BUILD_CACHE_VERSION = 1 #Bump when the pipeline's output changes, so every cached input gets converted again
+HASH_CHUNK_SIZE = 1024 * 1024
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def getFileHash(path):
+    """Returns the sha256 of the file at path, reading it in chunks"""
+    fileHash = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            fileHash.update(chunk)
+    return fileHash.hexdigest()
+
+def getSettingsHash(settings):
+    """Returns the sha256 of a json serializable dictionary of settings"""
+    settingsData = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(settingsData).hexdigest()
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+class BuildManifest:
+    """Records each converted input zip's hash, the settings it was converted with, and the hash of every file it produced"""
+    def __init__(self, manifestPath, isEnabled = True):
+        self.manifestPath = manifestPath
+        self.isEnabled = isEnabled
+        self.entries = {}
+        self.inputHashes = {}
+        if isEnabled and os.path.isfile(manifestPath):
+            try:
+                with open(manifestPath, "r") as file:
+                    manifest = json.load(file)
+                if manifest.get("version") == BUILD_CACHE_VERSION:
+                    self.entries = manifest.get("entries", {})
+            except (OSError, ValueError) as e:
+                LOGW(f"Ignoring unreadable build manifest at {manifestPath}. Reason: {e}")
+
+    def getInputHash(self, inputPath):
+        """Returns the input's hash, computed once per run because inputs can be deleted after converting them"""
+        inputPath = os.path.abspath(inputPath)
+        if not inputPath in self.inputHashes:
+            self.inputHashes[inputPath] = getFileHash(inputPath)
+        return self.inputHashes[inputPath]
+
+    def refreshInputHash(self, inputPath):
+        """Computes the input's hash again after it was changed in place"""
+        self.inputHashes.pop(os.path.abspath(inputPath), None)
+        return self.getInputHash(inputPath)
+
+    def isUpToDate(self, inputPath, settings):
+        """Returns True if inputPath was converted with the same settings and its outputs are unchanged"""
+        if not self.isEnabled:
+            return False
+        inputHash = self.getInputHash(inputPath)
+        entry = self.entries.get(os.path.abspath(inputPath))
+        if entry is None or entry["inputHash"] != inputHash or entry["settingsHash"] != getSettingsHash(settings):
+            return False
+        for (outputPath, outputHash) in entry["outputs"].items():
+            if not os.path.isfile(outputPath) or getFileHash(outputPath) != outputHash:
+                LOGD(lambda: f"Output {outputPath} of {inputPath} is missing or changed")
+                return False
+        LOGA(lambda: f"Skipping unchanged {inputPath}")
+        return True
+
+    def record(self, inputPath, settings, outputPaths):
+        """Records the outputs produced by inputPath with settings"""
+        if not self.isEnabled:
+            return
+        self.entries[os.path.abspath(inputPath)] = {
+            "inputHash": self.getInputHash(inputPath),
+            "settingsHash": getSettingsHash(settings),
+            "outputs": {os.path.abspath(outputPath): getFileHash(outputPath) for outputPath in outputPaths},
+        }
+
+    def save(self):
+        if not self.isEnabled:
+            return
+        manifest = {"version": BUILD_CACHE_VERSION, "entries": self.entries}
+        manifestData = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+        writeLinesAtomically([manifestData], self.manifestPath)
+        LOGA(lambda: f"Saved build manifest with {len(self.entries)} entries at {self.manifestPath}")
@@ -0,0 +1,206 @@
+# Helpers that read, edit and mirror the keyframes of flattened Collada (.dae) animations with NumPy
+
+import re
+import sys
+import xml.etree.ElementTree as ET
+
+from Logger import *
+from daeHelpers import formatFloat, writeLinesAtomically
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+COLLADA_NAMESPACE = "http://www.collada.org/2005/11/COLLADASchema"
+COLLADA_NAMESPACES = {"c": COLLADA_NAMESPACE}
+MATRIX_STRIDE = 16
+TRANSLATION_INDICES = [3, 7, 11] #Indices of the translation in a row-major 4x4 matrix
+ROTATION_INDICES = [0, 1, 2, 4, 5, 6, 8, 9, 10] #Indices of the rotation and scale in a row-major 4x4 matrix
+KEYFRAME_PRECISION = 6 #Same number of decimals Mixamo exports
+MIRROR_AXIS_SIGNS = [-1, 1, 1, 1] #Reflects across the YZ plane, which swaps a Mixamo character's left and right
+LEFT_RIGHT_PATTERN = re.compile(r"Left|Right")
+
+ET.register_namespace("", COLLADA_NAMESPACE)
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+class AnimationChannel:
+    """A sampler's keyframe times, 4x4 matrices and interpolations, along with the elements they were read from"""
+    def __init__(self, sampler, target, sourcesById):
+        self.samplerId = sampler.get("id")
+        self.target = target
+        self.jointName = target.split("/")[0]
+        inputs = {input.get("semantic"): sourcesById[input.get("source").lstrip("#")] for input in sampler.findall("c:input", COLLADA_NAMESPACES)}
+        self.timesSource = inputs["INPUT"]
+        self.transformsSource = inputs["OUTPUT"]
+        self.interpolationsSource = inputs.get("INTERPOLATION")
+        self.times = np.array(getSourceArray(self.timesSource).text.split(), dtype=np.float64)
+        self.transforms = np.array(getSourceArray(self.transformsSource).text.split(), dtype=np.float64).reshape(-1, MATRIX_STRIDE)
+        self.interpolations = getSourceArray(self.interpolationsSource).text.split() if self.interpolationsSource is not None else []
+
+    def setKeyframes(self, keyframeIndices):
+        """Keeps only the keyframes at keyframeIndices and writes them back into the .dae's elements"""
+        self.setKeyframeValues(self.times[keyframeIndices], self.transforms[keyframeIndices], [self.interpolations[index] for index in keyframeIndices] if self.interpolationsSource is not None else [])
+
+    def setKeyframeValues(self, times, transforms, interpolations):
+        """Replaces the keyframes and writes them back into the .dae's elements"""
+        self.times = times
+        self.transforms = transforms
+        setSourceValues(self.timesSource, [formatFloat(time, KEYFRAME_PRECISION).decode("utf-8") for time in self.times])
+        setSourceValues(self.transformsSource, formatMatrices(self.transforms))
+        if self.interpolationsSource is not None:
+            self.interpolations = interpolations
+            setSourceValues(self.interpolationsSource, self.interpolations)
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def requireNumpy(stageName):
+    if np is None:
+        LOGE(f"NumPy is required to {stageName}. Install it with: pip3 install numpy")
+        sys.exit(1)
+
+def getSourceArray(source):
+    """Returns the <float_array> or <Name_array> of a <source>"""
+    sourceArray = source.find("c:float_array", COLLADA_NAMESPACES)
+    return sourceArray if sourceArray is not None else source.find("c:Name_array", COLLADA_NAMESPACES)
+
+def setSourceValues(source, values):
+    """Replaces the values of a <source>'s array and updates its count and its accessor's count"""
+    sourceArray = getSourceArray(source)
+    sourceArray.text = " ".join(values)
+    sourceArray.set("count", str(len(values)))
+    accessor = source.find("c:technique_common/c:accessor", COLLADA_NAMESPACES)
+    if accessor is not None:
+        stride = int(accessor.get("stride", "1"))
+        accessor.set("count", str(len(values) // stride))
+
+def formatMatrices(transforms):
+    return [formatFloat(value, KEYFRAME_PRECISION).decode("utf-8") for value in transforms.ravel()]
+
+def getMirroredJointName(jointName):
+    """Returns e.g. "mixamorig_RightHand" for "mixamorig_LeftHand", or the same name for joints in the middle like the spine"""
+    return LEFT_RIGHT_PATTERN.sub(lambda match: "Right" if match.group(0) == "Left" else "Left", jointName)
+
+def mirrorMatrices(matricesByName):
+    """Returns each name's 4x4 matrices reflected across the YZ plane, taken from its Left or Right counterpart when there is one.
+    Every matrix is reflected in one vectorized step, since reflecting a matrix only flips the sign of some of its values"""
+    if len(matricesByName) == 0:
+        return {}
+    mirrorSigns = np.outer(MIRROR_AXIS_SIGNS, MIRROR_AXIS_SIGNS).ravel()
+    names = list(matricesByName)
+    counts = [matricesByName[name].shape[0] for name in names]
+    reflectedMatrices = np.concatenate([matricesByName[name] for name in names]) * mirrorSigns
+    reflectedByName = dict(zip(names, np.split(reflectedMatrices, np.cumsum(counts)[:-1])))
+    return {name: reflectedByName.get(getMirroredJointName(name), reflectedByName[name]) for name in names}
+
+def readDae(daePath):
+    return ET.parse(daePath)
+
+def writeDae(tree, daePath):
+    """Writes the tree into daePath atomically and returns the number of bytes written"""
+    daeData = ET.tostring(tree.getroot(), encoding="utf-8", xml_declaration=True)
+    return writeLinesAtomically([daeData, b"\n"], daePath)
+
+def getAnimationChannels(root):
+    """Returns an AnimationChannel for every sampler animating a 4x4 matrix"""
+    sourcesById = {source.get("id"): source for source in root.iterfind(".//c:library_animations//c:source", COLLADA_NAMESPACES)}
+    samplersById = {sampler.get("id"): sampler for sampler in root.iterfind(".//c:library_animations//c:sampler", COLLADA_NAMESPACES)}
+    channels = []
+    for channel in root.iterfind(".//c:library_animations//c:channel", COLLADA_NAMESPACES):
+        sampler = samplersById.get(channel.get("source").lstrip("#"))
+        if sampler is None:
+            LOGW(f"Skipping channel with missing sampler {channel.get('source')}")
+            continue
+        animationChannel = AnimationChannel(sampler, channel.get("target"), sourcesById)
+        if animationChannel.transforms.shape[0] == animationChannel.times.shape[0]:
+            channels.append(animationChannel)
+    return channels
+
+def getKeyframesToKeep(times, transforms, positionTolerance, rotationTolerance):
+    """Returns the sorted indices of the keyframes needed so that linearly interpolating between them
+    stays within positionTolerance of every translation and within rotationTolerance of every rotation value.
+    Splits the worst segment first like Ramer-Douglas-Peucker, measuring each segment's error in one vectorized step"""
+    keyframeCount = times.shape[0]
+    if keyframeCount <= 2:
+        return np.arange(keyframeCount)
+    #Compare rotations without the joint's scale, e.g. Mixamo's root Armature is scaled by 100
+    scales = np.linalg.norm(transforms[:, [0, 4, 8]], axis=1)
+    scales[scales == 0] = 1
+    isKept = np.zeros(keyframeCount, dtype=bool)
+    isKept[[0, -1]] = True
+    segments = [(0, keyframeCount - 1)]
+    while len(segments) > 0:
+        start, end = segments.pop()
+        if end - start < 2:
+            continue
+        duration = times[end] - times[start]
+        progress = (times[start + 1:end] - times[start]) / duration if duration > 0 else np.zeros(end - start - 1)
+        interpolated = transforms[start] + progress[:, None] * (transforms[end] - transforms[start])
+        difference = transforms[start + 1:end] - interpolated
+        positionErrors = np.linalg.norm(difference[:, TRANSLATION_INDICES], axis=1) / positionTolerance
+        rotationErrors = np.abs(difference[:, ROTATION_INDICES]).max(axis=1) / scales[start + 1:end] / rotationTolerance
+        errors = np.maximum(positionErrors, rotationErrors)
+        worstIndex = int(np.argmax(errors))
+        if errors[worstIndex] > 1:
+            splitIndex = start + 1 + worstIndex
+            isKept[splitIndex] = True
+            segments.append((start, splitIndex))
+            segments.append((splitIndex, end))
+    return np.flatnonzero(isKept)
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def mirrorDaeAnimation(daePath, mirroredDaePath):
+    """Writes the .dae reflected across the YZ plane into mirroredDaePath, so a clip hitting with the right hand hits with the left.
+    Every joint's keyframes and rest pose are reflected, then swapped with its Left or Right counterpart's.
+    The .dae's elements are kept, so a flattened .dae stays flattened. Returns the number of mirrored channels"""
+    requireNumpy("mirror animations")
+    tree = readDae(daePath)
+    root = tree.getroot()
+    #1. Reflect and swap the keyframes of every channel
+    channels = getAnimationChannels(root)
+    channelsByJoint = {channel.jointName: channel for channel in channels}
+    mirroredTransforms = mirrorMatrices({channel.jointName: channel.transforms for channel in channels})
+    keyframes = {channel.jointName: (channel.times, channel.interpolations) for channel in channels}
+    for channel in channels:
+        sourceJointName = getMirroredJointName(channel.jointName)
+        times, interpolations = keyframes[sourceJointName if sourceJointName in channelsByJoint else channel.jointName]
+        channel.setKeyframeValues(times, mirroredTransforms[channel.jointName], interpolations)
+    #2. Reflect and swap the rest pose of every node
+    matrixElements = {}
+    for node in root.iterfind(".//c:library_visual_scenes//c:node", COLLADA_NAMESPACES):
+        matrix = node.find("c:matrix", COLLADA_NAMESPACES)
+        if matrix is not None and node.get("id") is not None:
+            matrixElements[node.get("id")] = matrix
+    mirroredMatrices = mirrorMatrices({nodeId: np.array(matrix.text.split(), dtype=np.float64).reshape(-1, MATRIX_STRIDE) for (nodeId, matrix) in matrixElements.items()})
+    for (nodeId, matrix) in matrixElements.items():
+        matrix.text = " ".join(formatMatrices(mirroredMatrices[nodeId]))
+    writeDae(tree, mirroredDaePath)
+    LOGA(lambda: f"Mirrored {len(channels)} channels of {daePath} into {mirroredDaePath}")
+    return len(channels)
+
+def reduceDaeKeyframes(daePath, positionTolerance, rotationTolerance):
+    """Drops every keyframe of the .dae's animations that linear interpolation reproduces within the tolerances.
+    Returns the number of keyframes before and after reducing"""
+    requireNumpy("reduce keyframes")
+    tree = readDae(daePath)
+    originalCount = 0
+    reducedCount = 0
+    for channel in getAnimationChannels(tree.getroot()):
+        keyframeIndices = getKeyframesToKeep(channel.times, channel.transforms, positionTolerance, rotationTolerance)
+        originalCount += channel.times.shape[0]
+        reducedCount += keyframeIndices.shape[0]
+        channel.setKeyframes(keyframeIndices)
+    writeDae(tree, daePath)
+    ratio = reducedCount / originalCount if originalCount > 0 else 1
+    LOG(f"Reduced keyframes of {daePath} from {originalCount} to {reducedCount} ({ratio:.1%} kept)")
+    return originalCount, reducedCount
@@ -0,0 +1,307 @@
+# Helpers that rewrite Collada (.dae) files in a single streaming pass, without loading the whole file in memory
+
+import os
+import re
+import tempfile
+
+from Logger import *
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+ANIMATION_ID_PATTERN = re.compile(rb"<animation id.*>")
+ANIMATION_CLOSE_TAG = b"</animation>"
+LIBRARY_ANIMATIONS_CLOSE_TAG = b"</library_animations>"
+REPLACE_CHUNK_SIZE = 1024 * 1024
+FLOAT_ARRAY_OPEN_PATTERN = re.compile(rb"<float_array\b[^>]*?\bid=\"([^\"]*)\"[^>]*>|<float_array\b[^>]*>")
+FLOAT_ARRAY_CLOSE_TAG = b"</float_array>"
+COMMENT_OPEN_TAG = b"<!--"
+COMMENT_CLOSE_TAG = b"-->"
+XML_TOKEN_PATTERN = re.compile(rb"<[^>]*>|[^<]+|<[^>]*$")
+XML_TAG_NAME_PATTERN = re.compile(rb"</?([^\s/>]+)")
+JOINT_TYPE_ATTRIBUTE = b'type="JOINT"'
+SKELETON_PRUNED_LIBRARIES = {b"library_images", b"library_materials", b"library_effects", b"library_geometries", b"library_controllers", b"library_cameras", b"library_lights"}
+SKELETON_PRUNED_NODE_CHILDREN = {b"instance_controller", b"instance_geometry", b"instance_camera", b"instance_light"}
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def flattenAnimationLines(lines):
+    """Merges every <animation id=...> inside <library_animations> into one unnamed <animation>.
+    Yields the same bytes the ConvertToXcodeCollada workflow's sed script writes, given the .dae's lines as bytes"""
+    isInFirstRange = True
+    appendedText = b""
+    for (index, line) in enumerate(lines):
+        hasNewLine = line.endswith(b"\n")
+        patternSpace = line[:-1] if hasNewLine else line
+        #1,/<animation id.*>/s/<animation id.*>/<animation>/
+        if isInFirstRange:
+            if index > 0 and ANIMATION_ID_PATTERN.search(patternSpace):
+                isInFirstRange = False
+            patternSpace = ANIMATION_ID_PATTERN.sub(b"<animation>", patternSpace, count=1)
+        #/<animation id.*>/d and /<\/animation>/d
+        if ANIMATION_ID_PATTERN.search(patternSpace) or ANIMATION_CLOSE_TAG in patternSpace:
+            continue
+        #/<\/library_animations>/s/<\/library_animations>/<\/animation>/
+        patternSpace = patternSpace.replace(LIBRARY_ANIMATIONS_CLOSE_TAG, ANIMATION_CLOSE_TAG, 1)
+        yield appendedText + patternSpace + b"\n" if hasNewLine else appendedText + patternSpace
+        #/<\/animation>/a\ <\/library_animations>
+        #macOS's sed appends the text without a trailing new line, so it begins the next line
+        appendedText = LIBRARY_ANIMATIONS_CLOSE_TAG if ANIMATION_CLOSE_TAG in patternSpace else b""
+    if len(appendedText) > 0:
+        yield appendedText
+
+def getNewFileMode(path):
+    """Returns the permissions of the file at path, or the default permissions of a new file if it does not exist"""
+    if os.path.exists(path):
+        return os.stat(path).st_mode & 0o777
+    currentUmask = os.umask(0)
+    os.umask(currentUmask)
+    return 0o666 & ~currentUmask
+
+def writeLinesAtomically(lines, path):
+    """Writes lines of bytes into a temporary file next to path, then renames it to path.
+    Returns the number of bytes written"""
+    fileDescriptor, tempPath = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    bytesWritten = 0
+    try:
+        with os.fdopen(fileDescriptor, "wb") as file:
+            for line in lines:
+                file.write(line)
+                bytesWritten += len(line)
+        #mkstemp creates files only readable by its owner, so keep the permissions a regular open() would give
+        os.chmod(tempPath, getNewFileMode(path))
+        os.replace(tempPath, path)
+    except BaseException:
+        os.unlink(tempPath)
+        raise
+    return bytesWritten
+
+def flattenDaeAnimations(daePath, outputPath = None):
+    """Flattens the animations of the .dae at daePath into outputPath, or into daePath itself if outputPath is not provided"""
+    with open(daePath, "rb") as file:
+        bytesWritten = writeLinesAtomically(flattenAnimationLines(file), outputPath or daePath)
+    LOGA(lambda: f"Flattened animations of {daePath} with {bytesWritten} bytes")
+    return bytesWritten
+
+def replaceInChunks(chunks, textToReplace, newText, counter):
+    """Yields chunks of bytes with every textToReplace replaced by newText, including the ones spanning two chunks.
+    Adds the number of replacements to counter["count"]"""
+    carry = b""
+    for chunk in chunks:
+        buffer = carry + chunk
+        position = 0
+        while True:
+            index = buffer.find(textToReplace, position)
+            if index == -1:
+                break
+            yield buffer[position:index] + newText
+            position = index + len(textToReplace)
+            counter["count"] += 1
+        #Hold back the end of the buffer that can still be the beginning of a match in the next chunk
+        keepFrom = max(position, len(buffer) - len(textToReplace) + 1)
+        yield buffer[position:keepFrom]
+        carry = buffer[keepFrom:]
+    yield carry
+
+def replaceInFile(path, textToReplace, newText, chunkSize = REPLACE_CHUNK_SIZE):
+    """Replaces every textToReplace in the file at path with newText, reading and writing chunkSize bytes at a time.
+    Returns the number of replacements"""
+    counter = {"count": 0}
+    with open(path, "rb") as file:
+        chunks = iter(lambda: file.read(chunkSize), b"")
+        writeLinesAtomically(replaceInChunks(chunks, textToReplace.encode("utf-8"), newText.encode("utf-8"), counter), path)
+    return counter["count"]
+
+def getLinesFromChunks(chunks):
+    """Yields the lines in chunks of bytes, joining the lines split across two chunks"""
+    carry = b""
+    for chunk in chunks:
+        buffer = carry + chunk
+        lineStart = 0
+        lineEnd = buffer.find(b"\n")
+        while lineEnd != -1:
+            yield buffer[lineStart:lineEnd + 1]
+            lineStart = lineEnd + 1
+            lineEnd = buffer.find(b"\n", lineStart)
+        carry = buffer[lineStart:]
+    if len(carry) > 0:
+        yield carry
+
+def getFloatArraySemantic(floatArrayId):
+    """Returns "time", "transform", "uv" or "default" based on the float_array's id Mixamo generates"""
+    floatArrayId = floatArrayId.lower()
+    if floatArrayId.endswith("-animation-input-array"):
+        return "time"
+    if floatArrayId.endswith("-animation-output-transform-array") or floatArrayId.endswith("-matrices-array"):
+        return "transform"
+    if "-uv" in floatArrayId or "texcoord" in floatArrayId:
+        return "uv"
+    return "default"
+
+def formatFloat(number, precision):
+    """Returns number as bytes printed with at most precision decimals and no trailing zeros"""
+    formattedNumber = b"%.*f" % (precision, float(number))
+    if b"." in formattedNumber:
+        formattedNumber = formattedNumber.rstrip(b"0").rstrip(b".")
+    return b"0" if formattedNumber == b"-0" else formattedNumber
+
+def formatFloats(numbers, precision):
+    """Returns the whitespace separated numbers printed with at most precision decimals and no trailing zeros"""
+    return b" ".join(formatFloat(number, precision) for number in numbers.split())
+
+def minifyDaeLines(lines, precisions, counter):
+    """Yields the .dae's lines without indentation, empty lines and comments, 
+    with each <float_array> printed at the precision of its semantic in precisions.
+    lines can also be chunks of bytes split anywhere, since they are joined back into lines first.
+    Adds the bytes read and written to counter["bytesRead"] and counter["bytesWritten"]"""
+    floatPrecision = None
+    isInComment = False
+    for line in getLinesFromChunks(lines):
+        counter["bytesRead"] += len(line)
+        pieces = []
+        rest = line.strip()
+        while len(rest) > 0:
+            if isInComment:
+                commentEnd = rest.find(COMMENT_CLOSE_TAG)
+                isInComment = commentEnd == -1
+                rest = b"" if isInComment else rest[commentEnd + len(COMMENT_CLOSE_TAG):]
+            elif floatPrecision is not None:
+                floatArrayEnd = rest.find(FLOAT_ARRAY_CLOSE_TAG)
+                floatArrayEnd = len(rest) if floatArrayEnd == -1 else floatArrayEnd
+                commentStart = rest.find(COMMENT_OPEN_TAG, 0, floatArrayEnd)
+                if commentStart != -1:
+                    pieces.append(formatFloats(rest[:commentStart], floatPrecision) + b" ")
+                    rest = rest[commentStart + len(COMMENT_OPEN_TAG):]
+                    isInComment = True
+                else:
+                    pieces.append(formatFloats(rest[:floatArrayEnd], floatPrecision))
+                    rest = rest[floatArrayEnd:]
+                    floatPrecision = None if len(rest) > 0 else floatPrecision
+            else:
+                commentStart = rest.find(COMMENT_OPEN_TAG)
+                floatArrayMatch = FLOAT_ARRAY_OPEN_PATTERN.search(rest)
+                if commentStart != -1 and (floatArrayMatch is None or commentStart < floatArrayMatch.start()):
+                    pieces.append(rest[:commentStart])
+                    rest = rest[commentStart + len(COMMENT_OPEN_TAG):]
+                    isInComment = True
+                elif floatArrayMatch is not None:
+                    pieces.append(rest[:floatArrayMatch.end()])
+                    #A self-closing <float_array/> has no floats, so the markup after it is kept as is
+                    if not floatArrayMatch.group().endswith(b"/>"):
+                        floatArrayId = (floatArrayMatch.group(1) or b"").decode("utf-8")
+                        floatPrecision = precisions.get(getFloatArraySemantic(floatArrayId), precisions["default"])
+                    rest = rest[floatArrayMatch.end():]
+                else:
+                    pieces.append(rest)
+                    rest = b""
+        minifiedLine = b"".join(pieces).strip()
+        if len(minifiedLine) > 0:
+            counter["bytesWritten"] += len(minifiedLine) + 1
+            yield minifiedLine + b"\n"
+
+def minifyDaeFile(daePath, precisions):
+    """Minifies the .dae at daePath in place and returns the number of bytes saved"""
+    counter = {"bytesRead": 0, "bytesWritten": 0}
+    with open(daePath, "rb") as file:
+        writeLinesAtomically(minifyDaeLines(file, precisions, counter), daePath)
+    bytesSaved = counter["bytesRead"] - counter["bytesWritten"]
+    LOG(f"Minified {daePath} from {counter['bytesRead']} to {counter['bytesWritten']} bytes, saving {bytesSaved} bytes")
+    return bytesSaved
+
+def getSkeletonTokens(lines):
+    """Yields the .dae's XML tokens, leaving out every library except the animations and visual scenes,
+    and every visual scene node that is not a joint or a parent of a joint. Yields None where something was left out"""
+    carry = b""
+    depth = 0
+    prunedDepth = None
+    isInVisualScenes = False
+    #Tokens of the non-joint nodes being read. Kept only if a joint is found inside them
+    nodeBuffers = []
+    for line in lines:
+        text = carry + line
+        carry = b""
+        for match in XML_TOKEN_PATTERN.finditer(text):
+            token = match.group()
+            if token.startswith(b"<") and not token.endswith(b">"):
+                #Tag continues on the next line
+                carry = token
+                break
+            sink = nodeBuffers[-1][1] if len(nodeBuffers) > 0 else None
+            isTag = token.startswith(b"<") and not token.startswith((b"<?", b"<!"))
+            if not isTag:
+                if prunedDepth is None:
+                    sink.append(token) if sink is not None else (yield token)
+                continue
+            name = XML_TAG_NAME_PATTERN.match(token).group(1)
+            isClosing = token.startswith(b"</")
+            isSelfClosing = token.endswith(b"/>")
+            if isClosing:
+                depth -= 1
+            if prunedDepth is not None:
+                if isClosing and depth == prunedDepth:
+                    prunedDepth = None
+                elif not isClosing and not isSelfClosing:
+                    depth += 1
+                continue
+            if isClosing:
+                isInVisualScenes = isInVisualScenes and name != b"library_visual_scenes"
+                if len(nodeBuffers) > 0 and nodeBuffers[-1][0] == depth:
+                    #Drop the node since no joint was found inside it
+                    nodeBuffers.pop()
+                    sink = nodeBuffers[-1][1] if len(nodeBuffers) > 0 else None
+                    sink.append(None) if sink is not None else (yield None)
+                else:
+                    sink.append(token) if sink is not None else (yield token)
+                continue
+            if (depth == 1 and name in SKELETON_PRUNED_LIBRARIES) or (isInVisualScenes and name in SKELETON_PRUNED_NODE_CHILDREN):
+                sink.append(None) if sink is not None else (yield None)
+                if not isSelfClosing:
+                    prunedDepth = depth
+                    depth += 1
+                continue
+            isInVisualScenes = isInVisualScenes or name == b"library_visual_scenes"
+            if isInVisualScenes and name == b"node":
+                if JOINT_TYPE_ATTRIBUTE in token:
+                    #Keep every parent node of this joint
+                    for (nodeDepth, nodeTokens) in nodeBuffers:
+                        yield from nodeTokens
+                    nodeBuffers = []
+                    sink = None
+                elif not isSelfClosing:
+                    nodeBuffers.append((depth, [token]))
+                    depth += 1
+                    continue
+            sink.append(token) if sink is not None else (yield token)
+            if not isSelfClosing:
+                depth += 1
+    if len(carry) > 0:
+        yield carry
+
+def pruneToSkeletonLines(lines):
+    """Yields the lines of a skeleton only .dae, which only has the asset, animations, joint nodes and scene.
+    Lines left empty by the pruning are dropped"""
+    linePieces = []
+    isLinePruned = False
+    for token in getSkeletonTokens(lines):
+        if token is None:
+            isLinePruned = True
+            continue
+        linePieces.append(token)
+        if token.endswith(b"\n"):
+            line = b"".join(linePieces)
+            if not isLinePruned or len(line.strip()) > 0:
+                yield line
+            linePieces = []
+            isLinePruned = False
+    if len(linePieces) > 0:
+        yield b"".join(linePieces)
+
+def pruneDaeToSkeleton(daePath):
+    """Removes the skin, geometries, materials and images of the .dae at daePath, keeping its joints and animations.
+    Returns the number of bytes written"""
+    with open(daePath, "rb") as file:
+        bytesWritten = writeLinesAtomically(pruneToSkeletonLines(file), daePath)
+    LOG(f"Pruned {daePath} to its skeleton and animations with {bytesWritten} bytes")
+    return bytesWritten
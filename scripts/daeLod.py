@@ -0,0 +1,356 @@
+# Generates lower levels of detail (LODs) of a character's .dae by simplifying its meshes with NumPy,
+# e.g. kim_lod1.dae and kim_lod2.dae next to kim.dae for the roster's thumbnails and the opponent in the background
+#
+# Each mesh is simplified by collapsing vertices into one of their neighbors, cheapest first, where the cost is the quadric error
+# of the surface around both vertices plus how different their skin weights are. Collapses are done in rounds of vertices far enough
+# apart to be collapsed together, so each round's costs and checks are computed in a few vectorized steps.
+# The remaining vertices keep their position, normals, UVs and skin weights. Vertices on UV seams, hard edges, material borders
+# and open borders are never removed, so seams stay intact
+
+import sys
+
+from Logger import *
+from daeAnimation import COLLADA_NAMESPACES, getSourceArray, np, readDae, requireNumpy, setSourceValues, writeDae
+from assetCatalog import getLocalName
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+LOD_SUFFIX = "_lod" #Added with the LOD's number to the .dae's name e.g. kim_lod1.dae
+LOD_MAX_ROUNDS = 200 #Rounds of collapses before stopping short of a ratio, e.g. when most vertices are on seams
+LOD_SKIN_WEIGHT_COST = 0.05 #Cost of collapsing 2 vertices with completely different skin weights, as a fraction of the mesh's size
+PRIMITIVE_TAGS = ["triangles", "polylist"]
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def getInputs(element):
+    """Returns each (semantic, source id, offset) of the element's <input>s"""
+    return [(input.get("semantic"), input.get("source").lstrip("#"), int(input.get("offset", "0"))) for input in element.findall("c:input", COLLADA_NAMESPACES)]
+
+def getIntegers(element):
+    return np.array((element.text or "").split() if element is not None else [], dtype=np.int64)
+
+def getSourceRows(source):
+    """Returns the source's values as text, one row per accessor element, so kept rows are written back unchanged"""
+    accessor = source.find("c:technique_common/c:accessor", COLLADA_NAMESPACES)
+    stride = int(accessor.get("stride", "1")) if accessor is not None else 1
+    return np.array((getSourceArray(source).text or "").split()).reshape(-1, stride)
+
+def setSourceRows(source, rows):
+    setSourceValues(source, rows.ravel().tolist())
+
+def getPrimitives(mesh):
+    return [child for child in mesh if getLocalName(child.tag) in PRIMITIVE_TAGS]
+
+def getTriangleCorners(primitive, stride):
+    """Returns the primitive's corners shaped (triangles, 3, stride), splitting its polygons into fans"""
+    corners = getIntegers(primitive.find("c:p", COLLADA_NAMESPACES)).reshape(-1, stride)
+    if getLocalName(primitive.tag) == "triangles":
+        return corners.reshape(-1, 3, stride)
+    vcount = getIntegers(primitive.find("c:vcount", COLLADA_NAMESPACES))
+    triangleCounts = np.maximum(vcount - 2, 0)
+    polygonStarts = np.repeat(np.cumsum(vcount) - vcount, triangleCounts)
+    fanIndices = np.arange(triangleCounts.sum()) - np.repeat(np.cumsum(triangleCounts) - triangleCounts, triangleCounts) + 1
+    return corners[np.stack([polygonStarts, polygonStarts + fanIndices, polygonStarts + fanIndices + 1], axis=1)]
+
+def getFaceNormals(positions, faces):
+    """Returns each triangle's normal, whose length is twice its area"""
+    return np.cross(positions[faces[:, 1]] - positions[faces[:, 0]], positions[faces[:, 2]] - positions[faces[:, 0]])
+
+def getFaceQuadrics(positions, faces):
+    """Returns each vertex's quadric, the sum of the squared distances to the planes of its triangles weighted by their areas"""
+    normals = getFaceNormals(positions, faces)
+    areas = np.linalg.norm(normals, axis=1)
+    unitNormals = normals / np.where(areas > 0, areas, 1)[:, None]
+    planes = np.concatenate([unitNormals, -np.einsum("ij,ij->i", unitNormals, positions[faces[:, 0]])[:, None]], axis=1)
+    faceQuadrics = areas[:, None, None] * planes[:, :, None] * planes[:, None, :]
+    quadrics = np.zeros((positions.shape[0], 4, 4))
+    for corner in range(3):
+        np.add.at(quadrics, faces[:, corner], faceQuadrics)
+    return quadrics
+
+def getSkin(root, geometryId):
+    """Returns the <skin> of the geometry, or None if it is not skinned"""
+    for skin in root.iterfind(".//c:library_controllers/c:controller/c:skin", COLLADA_NAMESPACES):
+        if skin.get("source", "").lstrip("#") == geometryId:
+            return skin
+    return None
+
+def getSkinWeights(skin, vertexCount):
+    """Returns each vertex's weight per joint from the skin's <vertex_weights>"""
+    sources = {source.get("id"): source for source in skin.iterfind("c:source", COLLADA_NAMESPACES)}
+    vertexWeights = skin.find("c:vertex_weights", COLLADA_NAMESPACES)
+    inputs = getInputs(vertexWeights)
+    stride = max(offset for (_, _, offset) in inputs) + 1
+    jointOffset = next(offset for (semantic, _, offset) in inputs if semantic == "JOINT")
+    weightSourceId, weightOffset = next((sourceId, offset) for (semantic, sourceId, offset) in inputs if semantic == "WEIGHT")
+    weights = getSourceRows(sources[weightSourceId]).ravel().astype(np.float64)
+    vcount = getIntegers(vertexWeights.find("c:vcount", COLLADA_NAMESPACES))
+    influences = getIntegers(vertexWeights.find("c:v", COLLADA_NAMESPACES)).reshape(-1, stride)
+    jointIndices = influences[:, jointOffset]
+    #Index -1 binds to the bind shape instead of a joint, which gets its own column
+    skinWeights = np.zeros((vertexCount, int(jointIndices.max(initial=0)) + 2))
+    np.add.at(skinWeights, (np.repeat(np.arange(vcount.shape[0]), vcount), jointIndices), weights[influences[:, weightOffset]])
+    return skinWeights
+
+def keepSkinVertices(skin, keptVertices):
+    """Keeps only the keptVertices' rows of the skin's <vertex_weights>, in the order of keptVertices"""
+    vertexWeights = skin.find("c:vertex_weights", COLLADA_NAMESPACES)
+    stride = max(offset for (_, _, offset) in getInputs(vertexWeights)) + 1
+    vcountElement = vertexWeights.find("c:vcount", COLLADA_NAMESPACES)
+    influencesElement = vertexWeights.find("c:v", COLLADA_NAMESPACES)
+    vcount = getIntegers(vcountElement)
+    influences = getIntegers(influencesElement).reshape(-1, stride)
+    keptCounts = vcount[keptVertices]
+    keptStarts = np.repeat((np.cumsum(vcount) - vcount)[keptVertices], keptCounts)
+    rowIndices = keptStarts + np.arange(keptCounts.sum()) - np.repeat(np.cumsum(keptCounts) - keptCounts, keptCounts)
+    vcountElement.text = " ".join(map(str, keptCounts.tolist()))
+    influencesElement.text = " ".join(map(str, influences[rowIndices].ravel().tolist()))
+    vertexWeights.set("count", str(keptVertices.shape[0]))
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+class MeshSimplifier:
+    """The triangles of a <mesh>'s <triangles> and <polylist> elements, simplified towards smaller triangle counts.
+    Each corner of a triangle has a vertex and a wedge, the row of normal, UV and other indices it was read with"""
+    def __init__(self, root, geometry):
+        self.geometryId = geometry.get("id")
+        mesh = geometry.find("c:mesh", COLLADA_NAMESPACES)
+        sources = {source.get("id"): source for source in mesh.iterfind("c:source", COLLADA_NAMESPACES)}
+        vertices = mesh.find("c:vertices", COLLADA_NAMESPACES)
+        positionSourceId = next(sourceId for (semantic, sourceId, _) in getInputs(vertices) if semantic == "POSITION")
+        self.positions = getSourceRows(sources[positionSourceId]).astype(np.float64)
+        faces = []
+        wedges = []
+        self.facePrimitives = []
+        self.wedgeRows = [] #Each primitive's rows of indices other than the vertex's, one per wedge
+        self.wedgeStarts = [] #Each primitive's first wedge id
+        wedgeCount = 0
+        firstRowIndices = {} #Each source's index of the first row with the same values, per row
+        for (index, primitive) in enumerate(getPrimitives(mesh)):
+            inputs = getInputs(primitive)
+            stride = max(offset for (_, _, offset) in inputs) + 1
+            vertexOffset = next(offset for (semantic, _, offset) in inputs if semantic == "VERTEX")
+            corners = getTriangleCorners(primitive, stride)
+            #Mixamo writes a UV row per corner, so corners are merged by the values they index rather than the indices
+            for (semantic, sourceId, offset) in inputs:
+                if offset != vertexOffset and sourceId in sources and sum(1 for (_, _, otherOffset) in inputs if otherOffset == offset) == 1:
+                    if not sourceId in firstRowIndices:
+                        _, firstRows, rowValues = np.unique(getSourceRows(sources[sourceId]), axis=0, return_index=True, return_inverse=True)
+                        firstRowIndices[sourceId] = firstRows[rowValues.ravel()]
+                    corners[:, :, offset] = firstRowIndices[sourceId][corners[:, :, offset]]
+            wedgeColumns = [offset for offset in range(stride) if offset != vertexOffset]
+            rows, wedgeIds = np.unique(corners[:, :, wedgeColumns].reshape(-1, len(wedgeColumns)), axis=0, return_inverse=True)
+            faces.append(corners[:, :, vertexOffset])
+            wedges.append(wedgeIds.reshape(-1, 3) + wedgeCount)
+            self.facePrimitives.append(np.full(corners.shape[0], index))
+            self.wedgeRows.append(rows)
+            self.wedgeStarts.append(wedgeCount)
+            wedgeCount += rows.shape[0]
+        self.faces = np.concatenate(faces)
+        self.wedges = np.concatenate(wedges)
+        self.facePrimitives = np.concatenate(self.facePrimitives)
+        self.originalFaceCount = self.faces.shape[0]
+        self.quadrics = getFaceQuadrics(self.positions, self.faces)
+        skin = getSkin(root, self.geometryId)
+        self.skinWeights = getSkinWeights(skin, self.positions.shape[0]) if skin is not None else None
+        self.size = np.linalg.norm(self.positions.max(axis=0) - self.positions.min(axis=0)) if self.positions.shape[0] > 0 else 0
+        self.isLocked = self.getLockedVertices()
+        self.flippingCollapses = np.zeros(0, dtype=np.int64) #Collapses skipped for flipping a triangle, as vertex * vertex count + target
+
+    def getLockedVertices(self):
+        """Returns which vertices are on an open border, a UV seam or hard edge, or a material border"""
+        vertexCount = self.positions.shape[0]
+        isLocked = np.zeros(vertexCount, dtype=bool)
+        edges = np.sort(self.faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+        uniqueEdges, edgeCounts = np.unique(edges, axis=0, return_counts=True)
+        isLocked[uniqueEdges[edgeCounts != 2].ravel()] = True
+        for cornerValues in [self.wedges, np.repeat(self.facePrimitives[:, None], 3, axis=1)]:
+            vertexValues = np.unique(np.stack([self.faces.ravel(), cornerValues.ravel()], axis=1), axis=0)
+            isLocked |= np.bincount(vertexValues[:, 0], minlength=vertexCount) > 1
+        return isLocked
+
+    def getCollapseCandidates(self):
+        """Returns every (vertex, neighbor it can collapse into) sorted by cost"""
+        edges = np.unique(np.sort(self.faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1), axis=0)
+        vertices = np.concatenate([edges[:, 0], edges[:, 1]])
+        targets = np.concatenate([edges[:, 1], edges[:, 0]])
+        isRemovable = ~self.isLocked[vertices] & ~np.isin(vertices * self.positions.shape[0] + targets, self.flippingCollapses)
+        vertices, targets = vertices[isRemovable], targets[isRemovable]
+        targetPositions = np.concatenate([self.positions[targets], np.ones((targets.shape[0], 1))], axis=1)
+        costs = np.einsum("ki,kij,kj->k", targetPositions, self.quadrics[vertices] + self.quadrics[targets], targetPositions)
+        if self.skinWeights is not None:
+            weightDistances = np.square(self.skinWeights[vertices] - self.skinWeights[targets]).sum(axis=1) / 2
+            costs += np.square(LOD_SKIN_WEIGHT_COST * self.size) * weightDistances
+        order = np.argsort(costs, kind="stable")
+        return vertices[order], targets[order]
+
+    def selectCollapses(self, vertices, targets, maxCollapseCount):
+        """Returns the cheapest collapses whose triangles do not touch each other, so they can be applied together"""
+        cornerFaces = np.argsort(self.faces.ravel(), kind="stable") // 3
+        faceCounts = np.bincount(self.faces.ravel(), minlength=self.positions.shape[0])
+        faceStarts = np.cumsum(faceCounts) - faceCounts
+        isTouched = np.zeros(self.positions.shape[0], dtype=bool)
+        selectedVertices = []
+        selectedTargets = []
+        for (vertex, target) in zip(vertices.tolist(), targets.tolist()):
+            if isTouched[vertex] or isTouched[target]:
+                continue
+            isTouched[self.faces[cornerFaces[faceStarts[vertex]:faceStarts[vertex] + faceCounts[vertex]]].ravel()] = True
+            selectedVertices.append(vertex)
+            selectedTargets.append(target)
+            if len(selectedVertices) >= maxCollapseCount:
+                break
+        return np.array(selectedVertices, dtype=np.int64), np.array(selectedTargets, dtype=np.int64)
+
+    def applyCollapses(self, vertices, targets):
+        """Collapses each vertex into its target, skipping the collapses that would flip a triangle. Returns the number of collapses applied"""
+        collapsedInto = np.arange(self.positions.shape[0])
+        collapsedInto[vertices] = targets
+        #1. Skip the collapses flipping a triangle that remains
+        newFaces = collapsedInto[self.faces]
+        isDegenerate = (newFaces[:, 0] == newFaces[:, 1]) | (newFaces[:, 1] == newFaces[:, 2]) | (newFaces[:, 2] == newFaces[:, 0])
+        isCollapsedCorner = newFaces != self.faces
+        changedFaces = np.flatnonzero(isCollapsedCorner.any(axis=1) & ~isDegenerate)
+        oldNormals = getFaceNormals(self.positions, self.faces[changedFaces])
+        newNormals = getFaceNormals(self.positions, newFaces[changedFaces])
+        flippedFaces = changedFaces[np.einsum("ij,ij->i", oldNormals, newNormals) <= 0]
+        skippedVertices = np.unique(self.faces[flippedFaces][isCollapsedCorner[flippedFaces]])
+        self.flippingCollapses = np.concatenate([self.flippingCollapses, skippedVertices * self.positions.shape[0] + collapsedInto[skippedVertices]])
+        collapsedInto[skippedVertices] = skippedVertices
+        newFaces = collapsedInto[self.faces]
+        isDegenerate = (newFaces[:, 0] == newFaces[:, 1]) | (newFaces[:, 1] == newFaces[:, 2]) | (newFaces[:, 2] == newFaces[:, 0])
+        isCollapsedCorner = newFaces != self.faces
+        #2. A collapsed vertex takes its target's wedge from a triangle they shared, which is in the same UV chart since it is not on a seam
+        sharedFaces, collapsedCorners = np.nonzero(isCollapsedCorner & isDegenerate[:, None])
+        collapsedVertices = self.faces[sharedFaces, collapsedCorners]
+        targetCorners = np.argmax(self.faces[sharedFaces] == collapsedInto[collapsedVertices][:, None], axis=1)
+        newWedges = np.full(self.positions.shape[0], -1)
+        newWedges[collapsedVertices] = self.wedges[sharedFaces, targetCorners]
+        self.wedges = np.where(isCollapsedCorner, newWedges[self.faces], self.wedges)
+        #3. Drop the triangles that collapsed into edges and merge the collapsed vertices' quadrics into their targets
+        appliedVertices = np.flatnonzero(collapsedInto != np.arange(self.positions.shape[0]))
+        np.add.at(self.quadrics, collapsedInto[appliedVertices], self.quadrics[appliedVertices])
+        self.faces = newFaces[~isDegenerate]
+        self.wedges = self.wedges[~isDegenerate]
+        self.facePrimitives = self.facePrimitives[~isDegenerate]
+        return appliedVertices.shape[0]
+
+    def simplify(self, ratio):
+        """Collapses vertices until at most ratio of the original triangles remain, or no vertex can be removed"""
+        targetFaceCount = int(self.originalFaceCount * ratio)
+        for _ in range(LOD_MAX_ROUNDS):
+            faceCount = self.faces.shape[0]
+            if faceCount <= targetFaceCount:
+                break
+            vertices, targets = self.getCollapseCandidates()
+            #Each collapse removes about 2 triangles
+            vertices, targets = self.selectCollapses(vertices, targets, max(1, (faceCount - targetFaceCount + 1) // 2))
+            if len(vertices) == 0:
+                break
+            self.applyCollapses(vertices, targets)
+        return self.faces.shape[0]
+
+    def write(self, root):
+        """Replaces the geometry's vertices, triangles and skin weights in root, a new copy of the .dae it was read from"""
+        geometry = root.find(f".//c:library_geometries/c:geometry[@id='{self.geometryId}']", COLLADA_NAMESPACES)
+        mesh = geometry.find("c:mesh", COLLADA_NAMESPACES)
+        sources = {source.get("id"): source for source in mesh.iterfind("c:source", COLLADA_NAMESPACES)}
+        #1. Keep the rows of the used vertices in every source of <vertices>
+        keptVertices = np.unique(self.faces)
+        newVertexIndices = np.full(self.positions.shape[0], -1)
+        newVertexIndices[keptVertices] = np.arange(keptVertices.shape[0])
+        for (_, sourceId, _) in getInputs(mesh.find("c:vertices", COLLADA_NAMESPACES)):
+            setSourceRows(sources[sourceId], getSourceRows(sources[sourceId])[keptVertices])
+        #2. Rebuild each primitive's corners, then keep the used rows of the sources only indexed by them
+        primitives = getPrimitives(mesh)
+        primitiveCorners = []
+        usedRowsBySource = {}
+        sharedSourceIds = set()
+        for (index, primitive) in enumerate(primitives):
+            inputs = getInputs(primitive)
+            stride = max(offset for (_, _, offset) in inputs) + 1
+            vertexOffset = next(offset for (semantic, _, offset) in inputs if semantic == "VERTEX")
+            isPrimitiveFace = self.facePrimitives == index
+            corners = np.zeros((int(isPrimitiveFace.sum()) * 3, stride), dtype=np.int64)
+            corners[:, vertexOffset] = newVertexIndices[self.faces[isPrimitiveFace].ravel()]
+            wedgeColumns = [offset for offset in range(stride) if offset != vertexOffset]
+            corners[:, wedgeColumns] = self.wedgeRows[index][self.wedges[isPrimitiveFace].ravel() - self.wedgeStarts[index]]
+            primitiveCorners.append(corners)
+            for (semantic, sourceId, offset) in inputs:
+                if offset == vertexOffset:
+                    continue
+                #A source sharing its offset with another input keeps all of its rows, since their indices are the same column
+                if sum(1 for (_, _, otherOffset) in inputs if otherOffset == offset) > 1:
+                    sharedSourceIds.add(sourceId)
+                usedRowsBySource.setdefault(sourceId, []).append((index, offset))
+        for (sourceId, columns) in usedRowsBySource.items():
+            if sourceId in sharedSourceIds or not sourceId in sources:
+                continue
+            keptRows = np.unique(np.concatenate([primitiveCorners[index][:, offset] for (index, offset) in columns]))
+            rows = getSourceRows(sources[sourceId])
+            newRowIndices = np.full(rows.shape[0], -1)
+            newRowIndices[keptRows] = np.arange(keptRows.shape[0])
+            for (index, offset) in columns:
+                primitiveCorners[index][:, offset] = newRowIndices[primitiveCorners[index][:, offset]]
+            setSourceRows(sources[sourceId], rows[keptRows])
+        for (primitive, corners) in zip(primitives, primitiveCorners):
+            triangleCount = corners.shape[0] // 3
+            primitive.set("count", str(triangleCount))
+            primitive.find("c:p", COLLADA_NAMESPACES).text = " ".join(map(str, corners.ravel().tolist()))
+            vcount = primitive.find("c:vcount", COLLADA_NAMESPACES)
+            if vcount is not None:
+                vcount.text = " ".join(["3"] * triangleCount)
+        #3. Keep the skin weights of the used vertices
+        skin = getSkin(root, self.geometryId)
+        if skin is not None:
+            keepSkinVertices(skin, keptVertices)
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def getLodPaths(daePath, lodCount):
+    """Returns e.g. ["kim_lod1.dae", "kim_lod2.dae"] for kim.dae"""
+    basePath = daePath[:-len(".dae")] if daePath.endswith(".dae") else daePath
+    return [f"{basePath}{LOD_SUFFIX}{index}.dae" for index in range(1, lodCount + 1)]
+
+def generateDaeLods(daePath, ratios):
+    """Writes a LOD of the .dae next to it for each ratio of its triangles to keep, from the largest ratio to the smallest.
+    Each LOD continues simplifying the previous one. Returns the LODs' paths"""
+    requireNumpy("generate LODs")
+    root = readDae(daePath).getroot()
+    simplifiers = []
+    for geometry in root.iterfind(".//c:library_geometries/c:geometry", COLLADA_NAMESPACES):
+        mesh = geometry.find("c:mesh", COLLADA_NAMESPACES)
+        if mesh is None or len(getPrimitives(mesh)) == 0 or len(getPrimitives(mesh)) != len([child for child in mesh if getLocalName(child.tag) not in ["source", "vertices", "extra"]]):
+            LOGW(f"Not simplifying geometry {geometry.get('id')} of {daePath} because it is not only made of triangles and polylists")
+            continue
+        simplifiers.append(MeshSimplifier(root, geometry))
+    lodPaths = getLodPaths(daePath, len(ratios))
+    for (ratio, lodPath) in zip(sorted(ratios, reverse=True), lodPaths):
+        tree = readDae(daePath)
+        for simplifier in simplifiers:
+            faceCount = simplifier.simplify(ratio)
+            simplifier.write(tree.getroot())
+            LOG(f"Simplified {simplifier.geometryId} of {daePath} from {simplifier.originalFaceCount} to {faceCount} triangles for {lodPath}")
+        writeDae(tree, lodPath)
+    return lodPaths
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Main #######################################################
+#----------------------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    """
+    Execute by passing a character's .dae and the ratios of its triangles to keep in each LOD
+        python3 "daeLod.py" <path_to_dae> <ratios>
+        e.g. python3 "daeLod.py" '../iOS/FuFight/Resources/3DAssets.scnassets/Characters/Kim/assets/kim.dae' 0.5 0.25
+    """
+    if len(sys.argv) < 3:
+        LOGE("Error Usage: python3 daeLod.py <path_to_dae> <ratios>")
+        sys.exit(1)
+    generateDaeLods(sys.argv[1], [float(ratio) for ratio in sys.argv[2:]])
+    LOG(f"✅✅✅")
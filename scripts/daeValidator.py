@@ -0,0 +1,179 @@
+# Checks converted Collada (.dae) files for the corruptions that otherwise only show up when the game loads them
+#
+# Each .dae is streamed with iterparse and every element is cleared and removed from its parent once read, so memory stays bounded on large files. A .dae is valid if:
+# 1. Every <float_array>'s count matches the number of floats it contains
+# 2. Every <input>'s source, and every <channel>'s source and target node, points to an id in the file
+# 3. Every <image>'s <init_from> is a texture that exists under the fighter's assets folder, when the fighter's path is passed
+# 4. <library_animations> holds exactly one <animation> wrapper without nested animations, as the flattening leaves it
+
+import math
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+from Logger import *
+from assetCatalog import getLocalName
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+VALIDATE_JOBS = os.cpu_count() or 1 #Number of .dae files validated at the same time from the command line. Can be overridden with --jobs N
+MAX_ERRORS_PER_FILE = 20 #Errors listed for each invalid file, so a badly broken file does not flood the logs
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def getFloatArrayError(element):
+    """Returns why the <float_array>'s content does not match its count, or None"""
+    values = (element.text or "").split()
+    count = element.get("count")
+    if count is None or not count.isdigit() or int(count) != len(values):
+        return f"float_array {element.get('id')} has count {count} but contains {len(values)} floats"
+    for value in values:
+        try:
+            number = float(value)
+        except ValueError:
+            return f"float_array {element.get('id')} contains {value} which is not a float"
+        if not math.isfinite(number):
+            return f"float_array {element.get('id')} contains {value}"
+    return None
+
+def getTexturePathError(fighterPath, imagePath):
+    """Returns why the texture imagePath, relative to fighterPath, is not a file under fighterPath/assets, or None"""
+    imagePath = unquote(imagePath.strip())
+    if imagePath.startswith("file://"):
+        imagePath = imagePath[len("file://"):]
+    assetsPath = os.path.join(os.path.abspath(fighterPath), "assets")
+    texturePath = os.path.normpath(os.path.join(fighterPath, imagePath))
+    if os.path.commonpath([assetsPath, os.path.abspath(texturePath)]) != assetsPath:
+        return f"texture {imagePath} is not in the assets folder"
+    if not os.path.isfile(texturePath):
+        return f"texture {imagePath} does not exist"
+    return None
+
+def validateDaeInWorker(daePath, fighterPath):
+    """Returns the .dae's errors, flushing the logs of worker processes"""
+    try:
+        return getDaeErrors(daePath, fighterPath)
+    finally:
+        #Worker processes exit without flushing their buffered logs
+        flushLogs()
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def getDaeErrors(daePath, fighterPath = None):
+    """Streams through the .dae and returns the list of reasons it is invalid, empty if it is valid.
+    Pass fighterPath to also check that its textures exist in fighterPath/assets"""
+    errors = []
+    ids = set()
+    references = [] #Each (id, what refers to it) to resolve once every id was read
+    elementPath = [] #Open elements from the root, whose finished children are removed so memory stays bounded
+    animationCount = 0
+    try:
+        for (event, element) in ET.iterparse(daePath, events=("start", "end")):
+            tag = getLocalName(element.tag)
+            if event == "start":
+                parentTag = getLocalName(elementPath[-1].tag) if len(elementPath) > 0 else None
+                elementPath.append(element)
+                elementId = element.get("id")
+                if elementId is not None:
+                    ids.add(elementId)
+                if tag == "input" and element.get("source", "").startswith("#"):
+                    references.append((element.get("source")[1:], f"input {element.get('semantic')} of {parentTag}"))
+                elif tag == "channel":
+                    references.append((element.get("source", "").lstrip("#"), f"channel source {element.get('source')}"))
+                    references.append((element.get("target", "").split("/")[0], f"channel target {element.get('target')}"))
+                elif tag == "animation":
+                    if parentTag == "library_animations":
+                        animationCount += 1
+                    else:
+                        errors.append(f"animation {element.get('id')} is nested in {parentTag} instead of being flattened")
+                continue
+            elementPath.pop()
+            if tag == "float_array":
+                error = getFloatArrayError(element)
+                if error is not None:
+                    errors.append(error)
+            elif tag == "init_from" and len(elementPath) > 0 and getLocalName(elementPath[-1].tag) == "image" and fighterPath is not None:
+                error = getTexturePathError(fighterPath, element.text or "")
+                if error is not None:
+                    errors.append(error)
+            elif tag == "library_animations" and animationCount != 1:
+                errors.append(f"library_animations has {animationCount} animation wrappers instead of 1")
+            #Clearing the element alone would keep it attached to its parent, so every element read would stay in memory
+            element.clear()
+            if len(elementPath) > 0:
+                elementPath[-1].remove(element)
+    except ET.ParseError as e:
+        errors.append(f"is not valid xml. Reason: {e}")
+        return errors
+    for (referencedId, referrer) in references:
+        if not referencedId in ids:
+            errors.append(f"{referrer} points to the missing id {referencedId}")
+    return errors
+
+def validateDaeFile(daePath, fighterPath = None):
+    """Logs every reason the .dae is invalid and exits, so only the fighter or clip being converted fails"""
+    errors = getDaeErrors(daePath, fighterPath)
+    if len(errors) == 0:
+        LOGA(lambda: f"Validated {daePath}")
+        return
+    for error in errors[:MAX_ERRORS_PER_FILE]:
+        LOGE(f"Invalid {daePath}: {error}")
+    if len(errors) > MAX_ERRORS_PER_FILE:
+        LOGE(f"Invalid {daePath}: and {len(errors) - MAX_ERRORS_PER_FILE} more errors")
+    sys.exit(1)
+
+def getFighterPathOfCharacter(daePath):
+    """Returns the fighter's folder of a character .dae inside its assets folder, or None for animations"""
+    folderPath = os.path.dirname(os.path.abspath(daePath))
+    return os.path.dirname(folderPath) if os.path.basename(folderPath) == "assets" else None
+
+def validateDaeFiles(daePaths, jobs):
+    """Validates the .dae files using up to jobs processes. Characters inside an assets folder also get their textures checked.
+    Returns a dictionary of each invalid .dae's path and its errors"""
+    fighterPaths = [getFighterPathOfCharacter(daePath) for daePath in daePaths]
+    if jobs > 1 and len(daePaths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(validateDaeInWorker, daePaths, fighterPaths))
+    else:
+        results = list(map(getDaeErrors, daePaths, fighterPaths))
+    return {daePath: errors for (daePath, errors) in zip(daePaths, results) if len(errors) > 0}
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Main #######################################################
+#----------------------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    """
+    Execute by passing .dae files or folders, whose .dae files including subdirectories are all validated
+        python3 "daeValidator.py" <paths> <optional --jobs N>
+        e.g. python3 "daeValidator.py" '../iOS/FuFight/Resources/3DAssets.scnassets/Characters' --jobs 8
+    """
+    jobs = VALIDATE_JOBS
+    if "--jobs" in sys.argv:
+        index = sys.argv.index("--jobs")
+        jobs = int(sys.argv[index + 1])
+        del sys.argv[index:index + 2]
+    if len(sys.argv) < 2:
+        LOGE("Error Usage: python3 daeValidator.py <paths> <optional --jobs N>")
+        sys.exit(1)
+    daePaths = []
+    for path in sys.argv[1:]:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                daePaths += [os.path.join(root, file) for file in files if file.endswith(".dae")]
+        else:
+            daePaths.append(path)
+    invalidPaths = validateDaeFiles(sorted(daePaths), jobs)
+    for (daePath, errors) in invalidPaths.items():
+        for error in errors[:MAX_ERRORS_PER_FILE]:
+            LOGE(f"Invalid {daePath}: {error}")
+    LOG(f"RESULT: {len(daePaths) - len(invalidPaths)} of {len(daePaths)} .dae files are valid")
+    if len(invalidPaths) > 0:
+        sys.exit(1)
+    LOG(f"✅✅✅")
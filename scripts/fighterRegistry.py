@@ -0,0 +1,95 @@
+# Every fighter's Mixamo names and texture key, loaded once from fighterRegistry.json
+#
+# Add a fighter by adding an entry to fighterRegistry.json's "fighters", keyed by its FighterType name:
+# "type" is the fighter's value used in file names, "name" its folder's name in Characters, "mixamoFolderName" the start
+# of its downloaded zip's name, "mixamoName" its Mixamo character's name, and "hasMultipleTextureVersion" True if its
+# textures have 1001 and 1002 in their names. Fighters whose "mixamoFolderName" does not start with "Ch" need a "textureKey".
+# Set "isEnabled" to false to keep a fighter out of FighterType
+
+import json
+import os
+import re
+
+from enum import Enum
+from os.path import abspath
+
+from Logger import *
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+FIGHTER_REGISTRY_PATH = os.path.join(os.path.dirname(abspath(__file__)), "fighterRegistry.json")
+FIGHTER_REGISTRY_VERSION = 1
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def loadFighterEntries(registryPath):
+    """Returns the registry's enabled fighter entries keyed by their FighterType name, in the registry's order"""
+    with open(registryPath, "r") as file:
+        registry = json.load(file)
+    if registry.get("version") != FIGHTER_REGISTRY_VERSION:
+        raise ValueError(f"Unsupported fighter registry version {registry.get('version')} in {registryPath}")
+    return {key: entry for (key, entry) in registry["fighters"].items() if entry.get("isEnabled", True)}
+
+def getMixamoKeyFromFolderName(mixamoFolderName):
+    """Returns the "Ch02" in "Ch02_nonPBR" or "Prisoner B Styperek\""""
+    if mixamoFolderName.startswith("Ch"):
+        # If fighter's folder name contains Ch, then
+        # its key is the first 4 characters e.g. Ch02
+        return mixamoFolderName[:4]
+    return mixamoFolderName
+
+def getTextureKeyFromEntry(entry):
+    """Returns something like either "Ch17_100" or "Ch03_1001" or "prisoner\""""
+    mixamoKey = getMixamoKeyFromFolderName(entry["mixamoFolderName"])
+    if not mixamoKey.startswith("Ch"):
+        if not "textureKey" in entry:
+            LOGE(f"This texture's key might be unexpected: {mixamoKey}. Add a textureKey to {entry['type']} in the fighter registry")
+        return entry.get("textureKey", mixamoKey)
+    return mixamoKey + ("_100" if entry["hasMultipleTextureVersion"] else "_1001")
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+FIGHTER_ENTRIES = loadFighterEntries(FIGHTER_REGISTRY_PATH)
+FighterType = Enum("FighterType", [(key, entry["type"]) for (key, entry) in FIGHTER_ENTRIES.items()])
+
+class Fighter:
+    def __init__(self, fighterType):
+        entry = FIGHTER_ENTRIES[fighterType.name]
+        self.fighterType = fighterType
+        self.folderName = entry["mixamoFolderName"]
+        self.mixamoName = entry["mixamoName"]
+        self.mixamoKey = getMixamoKeyFromFolderName(self.folderName)
+        self.hasMultipleTextureVersion = entry["hasMultipleTextureVersion"]
+        self.textureName = getTextureKeyFromEntry(entry)
+        self.name = entry["name"]
+
+class FighterRegistry:
+    """Every fighter built once, with a single compiled pattern that finds the fighter of any downloaded file's name"""
+    def __init__(self):
+        self.fighters = {fighterType: Fighter(fighterType) for fighterType in FighterType}
+        self.fighterTypesByFolderName = {fighter.folderName: fighterType for (fighterType, fighter) in self.fighters.items()}
+        #Longest names first, so a name that starts another one never shadows it
+        folderNames = sorted(self.fighterTypesByFolderName, key=len, reverse=True)
+        self.folderNamePattern = re.compile("|".join(re.escape(folderName) for folderName in folderNames))
+
+    def getFighter(self, fighterType):
+        return self.fighters[fighterType]
+
+    def getFighterType(self, fileName):
+        """Returns the type of the fighter whose Mixamo folder name starts fileName, or None"""
+        match = self.folderNamePattern.match(fileName)
+        return self.fighterTypesByFolderName[match.group(0)] if match is not None else None
+
+FIGHTER_REGISTRY = FighterRegistry()
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def getFighter(fighterType):
+    """Returns the fighter of fighterType, which is only built once"""
+    return FIGHTER_REGISTRY.getFighter(fighterType)
@@ -0,0 +1,146 @@
+# Index of the folders the scripts look into, so each folder is listed once per run with os.scandir instead of
+# being walked and listed again by every step, which matters on network shares where each call is slow
+#
+# A folder is scanned the first time it is looked up, and each file's size and modification time are only read when first asked for.
+# Files moved, created or deleted through the index's record methods keep it up to date. Files changed by other code or other
+# processes, e.g. worker processes, must be invalidated so their folders are scanned again
+
+import os
+import threading
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+class FileEntry:
+    """A file or folder of the index. Its size and modification time are read once, from the scanned os.DirEntry if it has them"""
+    def __init__(self, path, isDir, dirEntry = None, stat = None):
+        self.path = path
+        self.isDir = isDir
+        self.dirEntry = dirEntry
+        self.stat = stat
+
+    def getStat(self):
+        if self.stat is None:
+            self.stat = self.dirEntry.stat(follow_symlinks=False) if self.dirEntry is not None else os.stat(self.path, follow_symlinks=False)
+        return self.stat
+
+    def getSize(self):
+        return self.getStat().st_size
+
+    def getModifiedTime(self):
+        return self.getStat().st_mtime_ns
+
+    def movedTo(self, newPath):
+        """Returns the entry at newPath after a move, which keeps the file's size and modification time"""
+        return FileEntry(newPath, self.isDir, stat=self.stat)
+
+class FileIndex:
+    """Each scanned folder's path to its entries keyed by name. Safe to use from the threads of a pipeline"""
+    def __init__(self):
+        self.folders = {}
+        self.lock = threading.RLock()
+
+    def getEntries(self, folderPath):
+        """Returns a copy of the folder's entries keyed by name, scanning it if it was not yet. Missing folders have no entries"""
+        folderPath = os.path.abspath(folderPath)
+        with self.lock:
+            entries = self.folders.get(folderPath)
+            if entries is None:
+                try:
+                    with os.scandir(folderPath) as scan:
+                        entries = {entry.name: FileEntry(entry.path, entry.is_dir(), entry) for entry in scan}
+                except (FileNotFoundError, NotADirectoryError):
+                    return {}
+                self.folders[folderPath] = entries
+            return dict(entries)
+
+    def getEntry(self, path):
+        """Returns the entry of path from its parent folder's scan, or None if it does not exist"""
+        path = os.path.abspath(path)
+        return self.getEntries(os.path.dirname(path)).get(os.path.basename(path))
+
+    def exists(self, path):
+        return self.getEntry(path) is not None
+
+    def isDir(self, path):
+        entry = self.getEntry(path)
+        return entry is not None and entry.isDir
+
+    def isFile(self, path):
+        entry = self.getEntry(path)
+        return entry is not None and not entry.isDir
+
+    def listNames(self, folderPath):
+        """Returns the sorted names in the folder"""
+        return sorted(self.getEntries(folderPath))
+
+    def walk(self, folderPath):
+        """Yields each (folder's path, folder names, file names) in folderPath including its subdirectories like os.walk"""
+        folderPaths = [folderPath]
+        while len(folderPaths) > 0:
+            currentPath = folderPaths.pop()
+            entries = self.getEntries(currentPath)
+            dirs = sorted(name for (name, entry) in entries.items() if entry.isDir)
+            files = sorted(name for (name, entry) in entries.items() if not entry.isDir)
+            yield currentPath, dirs, files
+            folderPaths += [os.path.join(currentPath, name) for name in reversed(dirs)]
+
+    def getFilePaths(self, folderPath, extension = None, isRecursive = False):
+        """Returns the sorted paths of the folder's files ending with extension, including its subdirectories if isRecursive"""
+        filePaths = []
+        for (root, dirs, files) in self.walk(folderPath):
+            filePaths += [os.path.join(root, file) for file in files if extension is None or file.endswith(extension)]
+            if not isRecursive:
+                break
+        return sorted(filePaths)
+
+    def recordMove(self, path, newPath):
+        """Updates the index after path was moved to newPath, including every scanned folder inside it"""
+        path = os.path.abspath(path)
+        newPath = os.path.abspath(newPath)
+        with self.lock:
+            entry = self.folders.get(os.path.dirname(path), {}).pop(os.path.basename(path), None)
+            self.recordRemoval(newPath)
+            newParentEntries = self.folders.get(os.path.dirname(newPath))
+            if newParentEntries is not None:
+                newEntry = entry.movedTo(newPath) if entry is not None else None
+                if newEntry is None:
+                    #The moved file was never scanned, so read what it is at its new path
+                    newEntry = FileEntry(newPath, os.path.isdir(newPath))
+                newParentEntries[os.path.basename(newPath)] = newEntry
+            for folderPath in [folderPath for folderPath in self.folders if folderPath == path or folderPath.startswith(path + os.sep)]:
+                entries = self.folders.pop(folderPath)
+                newFolderPath = newPath + folderPath[len(path):]
+                self.folders[newFolderPath] = {name: childEntry.movedTo(os.path.join(newFolderPath, name)) for (name, childEntry) in entries.items()}
+
+    def recordCreation(self, path, isDir = False):
+        """Updates the index after a file or folder was created or replaced at path. A created folder is scanned when first looked up"""
+        path = os.path.abspath(path)
+        with self.lock:
+            self.recordRemoval(path)
+            parentEntries = self.folders.get(os.path.dirname(path))
+            if parentEntries is not None:
+                parentEntries[os.path.basename(path)] = FileEntry(path, isDir)
+
+    def recordRemoval(self, path):
+        """Updates the index after path was deleted, including every scanned folder inside it"""
+        path = os.path.abspath(path)
+        with self.lock:
+            self.folders.get(os.path.dirname(path), {}).pop(os.path.basename(path), None)
+            for folderPath in [folderPath for folderPath in self.folders if folderPath == path or folderPath.startswith(path + os.sep)]:
+                del self.folders[folderPath]
+
+    def invalidate(self, path):
+        """Forgets path, its parent folder and every scanned folder inside it, so they are scanned again when looked up"""
+        path = os.path.abspath(path)
+        with self.lock:
+            self.folders.pop(os.path.dirname(path), None)
+            for folderPath in [folderPath for folderPath in self.folders if folderPath == path or folderPath.startswith(path + os.sep)]:
+                del self.folders[folderPath]
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+FILE_INDEX = FileIndex() #Index shared by every step of a run. Each worker process has its own copy
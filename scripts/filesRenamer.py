@@ -1,40 +1,198 @@
+import json
 import os
 import sys
 
+# Renames are planned before touching any file, so collisions stop the script before anything is renamed.
+# Each batch of renames is written to a journal and synced before it is applied, so a run that stops partway
+# can be undone with --undo <journal_path>
+
+RENAME_BATCH_SIZE = 256 # Number of renames written to the journal and applied at a time
+JOURNAL_NAME = ".filesRenamerJournal.jsonl" # Written in the current directory unless --journal is passed. Each run replaces it
+
 def split_path(path):
     #Splits a path and returns directory and name
     directory, filename = os.path.split(path)
     return directory, filename
 
-def replace_filenames_in_directory(directoryPath, nameToReplace, textToReplaceTo):
+def get_new_file_name(filename, nameToReplace, textToReplaceTo):
+    """Returns the file name with its first nameToReplace replaced, or None if it should not be renamed"""
+    if filename.startswith(textToReplaceTo) or not nameToReplace in filename:
+        # Do not convert file names that already begin with the textToReplaceTo
+        return None
+    # Number of nameToReplace in the path we replace
+    maximumOccurrence = 1
+    return filename.replace(nameToReplace, textToReplaceTo, maximumOccurrence)
+
+def scan_renames(directoryPath, nameToReplace, textToReplaceTo, isRecursive):
+    """Returns each (directory, old name, new name) to rename in directoryPath, and in its subdirectories if isRecursive,
+    deepest first so files are renamed before the folders containing them"""
+    renames = []
+    directoryPaths = [(directoryPath, 0)]
+    while len(directoryPaths) > 0:
+        currentPath, depth = directoryPaths.pop()
+        with os.scandir(currentPath) as entries:
+            for entry in entries:
+                if entry.name == JOURNAL_NAME:
+                    continue
+                if isRecursive and entry.is_dir(follow_symlinks=False):
+                    directoryPaths.append((entry.path, depth + 1))
+                newFileName = get_new_file_name(entry.name, nameToReplace, textToReplaceTo)
+                if newFileName is not None:
+                    renames.append((depth, currentPath, entry.name, newFileName))
+    renames.sort(key=lambda rename: (-rename[0], rename[1], rename[2]))
+    return [(directory, filename, newFileName) for (depth, directory, filename, newFileName) in renames]
+
+def plan_renames(renames):
+    """Orders the renames so no file is overwritten and returns the (old path, new path) steps and the collisions found.
+    A rename onto a name that is renamed away too waits for it, and cycles like a->b and b->a go through a temporary name"""
+    steps = []
+    collisions = []
+    renamesByDirectory = {}
+    for (directory, filename, newFileName) in renames:
+        renamesByDirectory.setdefault(directory, {})[filename] = newFileName
+    for (directory, newNames) in renamesByDirectory.items():
+        # Compare case insensitively because macOS's file system is
+        sourcesByTarget = {}
+        for (filename, newFileName) in newNames.items():
+            sourcesByTarget.setdefault(newFileName.lower(), []).append(filename)
+        for (target, sources) in sourcesByTarget.items():
+            if len(sources) > 1:
+                collisions.append(f"{', '.join(os.path.join(directory, source) for source in sorted(sources))} would all be renamed to {os.path.join(directory, newNames[sources[0]])}")
+        sourceNames = {filename.lower() for filename in newNames}
+        for (filename, newFileName) in newNames.items():
+            newPath = os.path.join(directory, newFileName)
+            # A case only rename finds its own file on a case insensitive file system
+            if os.path.lexists(newPath) and not newFileName.lower() in sourceNames and not os.path.samefile(os.path.join(directory, filename), newPath):
+                collisions.append(f"{os.path.join(directory, filename)} would overwrite {newPath}")
+        if len(collisions) > 0:
+            continue
+        # Each name has at most one rename onto it, so following the renames from a name either ends or comes back as a cycle
+        pendingNames = dict(newNames)
+        sourceNamesByLowerName = {filename.lower(): filename for filename in newNames}
+        for filename in sorted(newNames):
+            chain = []
+            currentName = filename
+            while currentName in pendingNames and not currentName in chain:
+                chain.append(currentName)
+                nextName = sourceNamesByLowerName.get(pendingNames[currentName].lower())
+                if nextName is None or nextName == currentName:
+                    break
+                currentName = nextName
+            if len(chain) == 0:
+                continue
+            isCycle = len(chain) > 1 and currentName == chain[0]
+            if isCycle:
+                # Free the first name of the cycle by moving it to a temporary name until the rest moved
+                temporaryName = f".{chain[0]}.renaming"
+                steps.append((os.path.join(directory, chain[0]), os.path.join(directory, temporaryName)))
+                pendingNames[temporaryName] = pendingNames.pop(chain[0])
+                chain[0] = temporaryName
+            # Rename the end of the chain first, so each target is free when its file gets renamed
+            for name in reversed(chain):
+                steps.append((os.path.join(directory, name), os.path.join(directory, pendingNames.pop(name))))
+    return steps, collisions
+
+def write_journal_entries(journalFile, steps):
+    # Absolute paths let --undo run from any directory
+    for (oldPath, newPath) in steps:
+        journalFile.write(json.dumps({"from": os.path.abspath(oldPath), "to": os.path.abspath(newPath)}) + "\n")
+    journalFile.flush()
+    os.fsync(journalFile.fileno())
+
+def apply_renames(steps, journalPath):
+    """Renames every step in batches, journaling each batch before applying it. Returns the number of renames"""
+    with open(journalPath, "w") as journalFile:
+        for batchIndex in range(0, len(steps), RENAME_BATCH_SIZE):
+            batch = steps[batchIndex:batchIndex + RENAME_BATCH_SIZE]
+            write_journal_entries(journalFile, batch)
+            for (oldPath, newPath) in batch:
+                os.rename(oldPath, newPath)
+            print(f"Renamed {batchIndex + len(batch)} of {len(steps)} files")
+    return len(steps)
+
+def get_journal_path(journalPath, path):
+    """Returns the absolute path of a journal entry. Journals written with relative paths are read from the journal's directory,
+    which is where the rename ran unless --journal was passed"""
+    return path if os.path.isabs(path) else os.path.join(os.path.dirname(os.path.abspath(journalPath)), path)
+
+def undo_renames(journalPath):
+    """Renames every journaled file back to its old name, latest first. Renames that were never applied are skipped.
+    The journal is only deleted when every rename was undone or never applied, otherwise it is kept and the other renames are listed.
+    Returns the number of renames that could not be undone"""
+    with open(journalPath, "r") as journalFile:
+        steps = [json.loads(line) for line in journalFile if line.strip()]
+    undoneCount = 0
+    skippedSteps = []
+    for step in reversed(steps):
+        oldPath = get_journal_path(journalPath, step["from"])
+        newPath = get_journal_path(journalPath, step["to"])
+        if os.path.lexists(newPath) and not os.path.lexists(oldPath):
+            os.rename(newPath, oldPath)
+            undoneCount += 1
+        elif not (os.path.lexists(oldPath) and not os.path.lexists(newPath)):
+            # Only a file still at its old name with nothing at its new name was clearly never renamed
+            skippedSteps.append((oldPath, newPath))
+    print(f"Undid {undoneCount} of {len(steps)} journaled renames from {journalPath}")
+    if len(skippedSteps) > 0:
+        for (oldPath, newPath) in skippedSteps:
+            print(f"ERROR: Could not undo the rename of {oldPath} to {newPath}")
+        print(f"ERROR: Kept the journal at {journalPath} because {len(skippedSteps)} renames could not be undone")
+        return len(skippedSteps)
+    os.remove(journalPath)
+    return 0
+
+def replace_filenames_in_directory(directoryPath, nameToReplace, textToReplaceTo, isRecursive = False, isDryRun = False, journalPath = None):
     # Check if the directory exists
     if not os.path.isdir(directoryPath):
         print(f"ERROR: The directory at {directoryPath} does not exist.")
         sys.exit(1)
         return
-    # Number of nameToReplace in the path we replace
-    maximumOccurrence = 1
-    # Iterate through each file in the directory
-    for count, filename in enumerate(os.listdir(directoryPath)):
-        if filename.startswith(textToReplaceTo):
-            # Do not convert file names that does not begin with the textToReplaceTo
-            continue
-        # Create the new file name
-        newFileName = f"{filename.replace(nameToReplace, textToReplaceTo, maximumOccurrence)}"
-        # Construct full file paths
-        old_file_path = os.path.join(directoryPath, filename)
-        new_file_path = os.path.join(directoryPath, newFileName)
+    renames = scan_renames(directoryPath, nameToReplace, textToReplaceTo, isRecursive)
+    steps, collisions = plan_renames(renames)
+    if len(collisions) > 0:
+        for collision in collisions:
+            print(f"ERROR: {collision}")
+        print(f"ERROR: Nothing was renamed because of {len(collisions)} collisions")
+        sys.exit(1)
+    if isDryRun:
+        for (count, (oldPath, newPath)) in enumerate(steps):
+            print(f"Would rename file #{count}: {oldPath} to {newPath}")
+        return 0
+    journalPath = os.path.abspath(journalPath or JOURNAL_NAME)
+    renamedCount = apply_renames(steps, journalPath)
+    print(f"Undo these renames with: python filesRenamer.py --undo '{journalPath}'")
+    return renamedCount
 
-        # Rename the file
-        os.rename(old_file_path, new_file_path)
-        print(f"Renamed file #{count}: {old_file_path} to {new_file_path}")
+def pop_option(option, hasValue = False):
+    """Removes option (and its value if hasValue) from sys.argv and returns its value, True, or None if it was not passed"""
+    if not option in sys.argv:
+        return None
+    index = sys.argv.index(option)
+    if not hasValue:
+        del sys.argv[index]
+        return True
+    if index + 1 >= len(sys.argv):
+        print(f"ERROR: Missing value for {option}")
+        sys.exit(1)
+    value = sys.argv[index + 1]
+    del sys.argv[index:index + 2]
+    return value
 
 # Example usage
 # /Users/samuelfolledo/Downloads/jeniffer/textures/Ch47
+# Rename every fighter's texture set at once, checking the plan first
+# python filesRenamer.py --recursive --dry-run '../iOS/FuFight/Resources/3DAssets.scnassets/Characters/Texture1' Texture2
 if __name__ == "__main__":
+    undoJournalPath = pop_option("--undo", hasValue=True)
+    if undoJournalPath is not None:
+        sys.exit(1 if undo_renames(undoJournalPath) > 0 else 0)
+    isRecursive = pop_option("--recursive") is not None
+    isDryRun = pop_option("--dry-run") is not None
+    journalPath = pop_option("--journal", hasValue=True)
     # Check if the correct number of arguments are provided
     if len(sys.argv) != 3:
-        print("Error Usage: python fileRenamer.py <directory_path_and_name> <new_file_name>")
+        print("Error Usage: python fileRenamer.py <directory_path_and_name> <new_file_name> <optional --recursive> <optional --dry-run> <optional --journal path>")
+        print("         or: python fileRenamer.py --undo <journal_path>")
         sys.exit(1)
 
     # Get the two inputs
@@ -45,7 +203,7 @@ if __name__ == "__main__":
     directoryPath, fileNameToReplace = split_path(fullPath)
 
     # Form the complete path
-    replace_filenames_in_directory(directoryPath, fileNameToReplace, textToReplaceTo)
+    replace_filenames_in_directory(directoryPath, fileNameToReplace, textToReplaceTo, isRecursive, isDryRun, journalPath)
 
     # Print the Directory and name to replace
     print(f"Finished replacing all files in path {directoryPath} with name starting in: {fileNameToReplace} into: {textToReplaceTo}")
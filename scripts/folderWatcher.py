@@ -0,0 +1,109 @@
+# Watches folders for zip files as they finish downloading and converts each one on a pool of worker processes
+# while the next downloads continue, instead of waiting for every download and converting the whole folder at the end
+
+import os
+import signal
+import time
+import zipfile
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from Logger import *
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+WATCH_POLL_SECONDS = 1 #How often the watched folders are listed
+WATCH_STABLE_SECONDS = 3 #How long a file's size and modification time must stay the same before it is considered downloaded
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def getFileSignature(path):
+    """Returns the file's size and modification time, or None if it no longer exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+def ignoreInterrupts():
+    """Lets worker processes finish their conversion when Ctrl+C stops the watch"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+def interruptWatch(signalNumber, frame):
+    """Stops the watch on SIGTERM the same way as Ctrl+C, e.g. when it runs as a launchd agent"""
+    raise KeyboardInterrupt
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+class FolderWatcher:
+    """Finds the files that getPaths returns once each stopped changing for stableSeconds and is a complete zip.
+    Each file is only returned again if it changes, e.g. when the same animation is downloaded again"""
+    def __init__(self, getPaths, stableSeconds = WATCH_STABLE_SECONDS):
+        self.getPaths = getPaths
+        self.stableSeconds = stableSeconds
+        self.pendingFiles = {} #Path of each file that is still changing to its signature and when that signature was first seen
+        self.readySignatures = {} #Path of each returned file to its signature when it was returned
+
+    def poll(self):
+        """Returns the sorted paths of the files that finished downloading since the last poll"""
+        now = time.monotonic()
+        paths = set(self.getPaths())
+        readyPaths = []
+        for path in paths:
+            signature = getFileSignature(path)
+            if signature is None or self.readySignatures.get(path) == signature:
+                continue
+            pendingSignature, firstSeenTime = self.pendingFiles.get(path, (None, None))
+            if pendingSignature != signature:
+                self.pendingFiles[path] = (signature, now)
+            elif now - firstSeenTime >= self.stableSeconds:
+                #A paused download keeps its size, but is missing the zip's central directory until it completes
+                if not zipfile.is_zipfile(path):
+                    continue
+                del self.pendingFiles[path]
+                self.readySignatures[path] = signature
+                readyPaths.append(path)
+        #Forget deleted files so a new download with the same name gets converted
+        for path in list(self.pendingFiles) + list(self.readySignatures):
+            if not path in paths:
+                self.pendingFiles.pop(path, None)
+                self.readySignatures.pop(path, None)
+        return sorted(readyPaths)
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def watchAndConvert(watcher, convert, onConverted, jobs, shouldConvert = lambda path: True):
+    """Until interrupted with Ctrl+C, converts each file the watcher finds with convert(path) using up to jobs processes.
+    convert must be picklable, e.g. a module level function or a functools.partial of one.
+    onConverted(path, result) is called in this process as each conversion finishes, so it can update the manifest and catalog.
+    Files that shouldConvert returns False for, e.g. ones that are up to date in the build manifest, are skipped"""
+    LOG(f"Watching for downloads with {jobs} jobs. Press Ctrl+C to stop")
+    signal.signal(signal.SIGTERM, interruptWatch)
+    runningPaths = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=ignoreInterrupts) as executor:
+        try:
+            while True:
+                for path in watcher.poll():
+                    if path in runningPaths.values() or not shouldConvert(path):
+                        continue
+                    LOG(f"Converting downloaded {path}")
+                    runningPaths[executor.submit(convert, path)] = path
+                flushLogs()
+                if len(runningPaths) == 0:
+                    time.sleep(WATCH_POLL_SECONDS)
+                    continue
+                doneFutures, _ = wait(runningPaths, timeout=WATCH_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for future in doneFutures:
+                    onConverted(runningPaths.pop(future), future.result())
+        except KeyboardInterrupt:
+            LOG(f"Stopped watching. Waiting for {len(runningPaths)} conversions to finish")
+            for (future, path) in runningPaths.items():
+                onConverted(path, future.result())
+            flushLogs()
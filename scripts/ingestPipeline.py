@@ -0,0 +1,126 @@
+# Passes items through a chain of stages connected by bounded queues, e.g. reading zip files, decompressing them,
+# transforming and writing their .dae files, so the disk and the CPUs stay busy at the same time
+#
+# Each stage runs on its own number of threads, or processes for the stages that keep the CPU busy in Python.
+# A stage waits when the queue after it is full, so at most queueSize items wait between each stage and memory stays capped.
+# An item that fails a stage skips the remaining stages, without stopping the other items
+
+import queue
+import threading
+
+from concurrent.futures import ProcessPoolExecutor
+
+from Logger import *
+from pipelineProfiler import *
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+END_OF_ITEMS = object() #Put in a queue once per thread of the next stage after its last item
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+class PipelineStage:
+    """A step of a pipeline calling function(value) on up to jobs threads, or processes if isProcess.
+    Its returned value is passed to the next stage. A process stage's function must be picklable, e.g. a module level function"""
+    def __init__(self, name, function, jobs = 1, isProcess = False):
+        self.name = name
+        self.function = function
+        self.jobs = max(1, jobs)
+        self.isProcess = isProcess
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def runStageInWorker(function, value, isProfiling = False):
+    """Runs a process stage's function. Returns its result, its error message if it failed, and the spans recorded while running it"""
+    setProfiling(isProfiling)
+    #Forked worker processes start with a copy of the main process' spans
+    spanCount = len(SPANS)
+    try:
+        return function(value), None, popSpans(spanCount)
+    except SystemExit:
+        return None, "Failed", popSpans(spanCount)
+    except Exception as e:
+        return None, f"Failed. Reason: {e}", popSpans(spanCount)
+    finally:
+        #Worker processes exit without flushing their buffered logs
+        flushLogs()
+
+def runStage(stage, value, executor):
+    """Returns the stage's result for value, and its error message if it failed"""
+    if stage.isProcess:
+        result, error, spans = executor.submit(runStageInWorker, stage.function, value, isProfilingEnabled()).result()
+        SPANS.extend(spans)
+        return result, error
+    try:
+        return stage.function(value), None
+    except SystemExit:
+        return None, "Failed"
+    except Exception as e:
+        return None, f"Failed. Reason: {e}"
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def runPipeline(items, stages, queueSize):
+    """Passes every item of items, which can be a generator discovering them, through each stage in order.
+    Up to queueSize items wait between 2 stages. Returns each item with its last stage's result and its error message if a stage failed,
+    in the order they finished"""
+    queues = [queue.Queue(maxsize=queueSize) for _ in stages] + [queue.Queue()]
+    remainingThreads = [stage.jobs for stage in stages]
+    lock = threading.Lock()
+    executors = [ProcessPoolExecutor(max_workers=stage.jobs) if stage.isProcess else None for stage in stages]
+
+    def discoverItems():
+        try:
+            for item in items:
+                queues[0].put((item, item, None))
+        except Exception as e:
+            LOGE(f"Failed to discover every item. Reason: {e}")
+        finally:
+            for _ in range(stages[0].jobs):
+                queues[0].put(END_OF_ITEMS)
+
+    def runStageThread(index):
+        stage = stages[index]
+        while True:
+            job = queues[index].get()
+            if job is END_OF_ITEMS:
+                break
+            item, value, error = job
+            if error is None:
+                value, error = runStage(stage, value, executors[index])
+                if error is not None:
+                    error = f"{stage.name} failed for {item}. {error}"
+            queues[index + 1].put((item, value, error))
+        with lock:
+            remainingThreads[index] -= 1
+            isLastThread = remainingThreads[index] == 0
+        if isLastThread:
+            nextThreadCount = stages[index + 1].jobs if index + 1 < len(stages) else 1
+            for _ in range(nextThreadCount):
+                queues[index + 1].put(END_OF_ITEMS)
+
+    threads = [threading.Thread(target=discoverItems, daemon=True)]
+    for (index, stage) in enumerate(stages):
+        threads += [threading.Thread(target=runStageThread, args=(index,), daemon=True) for _ in range(stage.jobs)]
+    for thread in threads:
+        thread.start()
+    results = []
+    try:
+        while True:
+            job = queues[-1].get()
+            if job is END_OF_ITEMS:
+                break
+            results.append(job)
+        for thread in threads:
+            thread.join()
+    finally:
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown()
+    return results
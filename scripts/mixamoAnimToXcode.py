@@ -1,9 +1,12 @@
+import functools
+import io
 import os
 import shutil
 import subprocess
 import sys
 import zipfile
 
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 from os.path import abspath, expanduser
 
@@ -15,12 +18,23 @@ except ImportError:
 
 # Custom Files
 from mixamoToXcode import *
+from daeAnimation import *
+from animationPack import buildAnimationPack
+from ingestPipeline import *
 from Logger import *
 
 #----------------------------------------------------------------------------------------------------------------
 ############################################### CUSTOMIZABLE SETTINGS ###########################################
 #----------------------------------------------------------------------------------------------------------------
 DELETE_TEXTURES = True #When True, it will delete animations with textures
+REDUCE_KEYFRAMES = False #When True, keyframes that linear interpolation reproduces within the tolerances below are dropped. Requires NumPy
+KEYFRAME_POSITION_TOLERANCE = 0.05 #Maximum translation error in the .dae's units (centimeters for Mixamo)
+KEYFRAME_ROTATION_TOLERANCE = 0.001 #Maximum error of each rotation matrix value
+SKELETON_ONLY = False #When True, animations only keep their joints and keyframes. Can be enabled with --skeleton-only
+MIRROR_ANIMATIONS = False #When True, each converted animation also gets a mirrored "-m" version hitting with the other side. Requires NumPy
+MIRRORED_SUFFIX = "-m" #Added to the mirrored animation's name e.g. idleFight-m.dae. Animations already ending with it are not mirrored again
+BUILD_ANIMATION_PACKS = False #When True, each character with converted animations gets its animations compiled into an animations.fuclips pack. Requires NumPy
+JOBS = 1 #Number of zip files converted at the same time. Can be overridden with --jobs N
 
 #----------------------------------------------------------------------------------------------------------------
 #################################################### Objects ####################################################
@@ -31,9 +45,12 @@ DELETE_TEXTURES = True #When True, it will delete animations with textures
 #################################################### Methods ####################################################
 #----------------------------------------------------------------------------------------------------------------
 def validateAndGetInput():
-    """Validates inputs and returns the path to convert and new animation name"""
-    if len(sys.argv) < 2:
-        LOGE("Error Usage: python3 mixamoAnimToXcode.py <list_of_files> <optional_new_animation_name>")
+    """Validates inputs and returns the path to convert, new animation name, number of jobs, and if animations are skeleton only"""
+    isSkeletonOnly = SKELETON_ONLY or popArgument("--skeleton-only") is not None
+    jobs = popArgument("--jobs", hasValue=True)
+    jobs = JOBS if jobs is None else int(jobs)
+    if len(sys.argv) < 2 or jobs < 1:
+        LOGE("Error Usage: python3 mixamoAnimToXcode.py <list_of_files> <optional_new_animation_name> <optional --jobs N> <optional --skeleton-only> <optional --force> <optional --profile> <optional --trace path> <optional --cprofile path> <optional --log-json path> <optional --watch>")
         LOGW("Running this script requires 1-2 additional parameters")
         sys.exit(1)
     # Defaults to converting user's Downloads folder if path is not provided
@@ -47,29 +64,87 @@ def validateAndGetInput():
             if (isFolder(arg) or isFile(arg)) and exist(arg):
                 pathsToConvert.append(arg)
             else:
-                LOGD(f"New animation name is found: {arg}")
+                LOGD(lambda: f"New animation name is found: {arg}")
                 newAnimationName = arg
         else:
             pathsToConvert.append(arg)
-    LOGA(f"Converting paths: {pathsToConvert} and optionally renaming zip file to {newAnimationName}")
-    return pathsToConvert, newAnimationName
+    LOGA(lambda: f"Converting paths: {pathsToConvert} with {jobs} jobs and optionally renaming zip file to {newAnimationName}")
+    return pathsToConvert, newAnimationName, jobs, isSkeletonOnly
 
-def prepareDaeAnimation(daePath, newAnimationName):
-    """Unzips daePath and returns the unzipped dae file's path"""
+def getAnimationSettings(newAnimationName, isSkeletonOnly):
+    """Returns the settings that changes how an animation's zip file gets converted"""
+    return {
+        "DELETE_TEXTURES": DELETE_TEXTURES,
+        "newAnimationName": newAnimationName,
+        "isSkeletonOnly": isSkeletonOnly,
+        "MINIFY_DAE": MINIFY_DAE,
+        "FLOAT_PRECISIONS": FLOAT_PRECISIONS,
+        "REDUCE_KEYFRAMES": REDUCE_KEYFRAMES,
+        "KEYFRAME_POSITION_TOLERANCE": KEYFRAME_POSITION_TOLERANCE,
+        "KEYFRAME_ROTATION_TOLERANCE": KEYFRAME_ROTATION_TOLERANCE,
+        "MIRROR_ANIMATIONS": MIRROR_ANIMATIONS,
+    }
+
+def getFinalDaePath(zipPath, newAnimationName):
+    """Returns the path of the zip file's converted .dae, named newAnimationName if it is not empty"""
+    daeName = getNameFromPath(zipPath) if len(newAnimationName) == 0 else newAnimationName
+    return f"{getFolderFromPath(zipPath)}/{daeName}.dae"
+
+def getMirroredDaePath(daePath):
+    """Returns the path of the .dae's mirrored animation, or None if it should not be mirrored"""
+    daeName = getNameFromPath(daePath)
+    if not MIRROR_ANIMATIONS or daeName.endswith(MIRRORED_SUFFIX):
+        return None
+    return f"{getFolderFromPath(daePath)}/{daeName}{MIRRORED_SUFFIX}.dae"
+
+def getConvertedDaePaths(daePath):
+    """Returns the converted .dae and its mirrored animation if it has one"""
+    mirroredDaePath = getMirroredDaePath(daePath)
+    return [daePath] if mirroredDaePath is None else [daePath, mirroredDaePath]
+
+def validateConvertedDae(zipPath, daePath, writtenDaePaths = []):
+    """Validates the .dae converted from zipPath. An invalid .dae is deleted along with writtenDaePaths, the outputs already written from the same zip,
+    so Xcode never bundles a broken clip. The zip is kept so the clip can be converted again"""
+    try:
+        with ProfileSpan("prepareDaeAnimation validate", zipPath, inputPath=daePath):
+            validateDaeFile(daePath)
+    except SystemExit:
+        for path in [daePath] + writtenDaePaths:
+            if exist(path):
+                deleteAllFromPath(path)
+                LOGE(f"Deleted {path} because a .dae converted from {zipPath} is invalid")
+        raise
+
+def mirrorConvertedDae(zipPath, daePath):
+    """Writes the mirrored animation of the converted daePath next to it if MIRROR_ANIMATIONS is True"""
+    mirroredDaePath = getMirroredDaePath(daePath)
+    if mirroredDaePath is None:
+        return
+    with ProfileSpan("prepareDaeAnimation mirror", zipPath, inputPath=daePath, outputPath=mirroredDaePath):
+        mirrorDaeAnimation(daePath, mirroredDaePath)
+    if VALIDATE_DAE:
+        validateConvertedDae(zipPath, mirroredDaePath, [daePath])
+
+def prepareDaeAnimation(daePath, newAnimationName, isSkeletonOnly = False):
+    """Unzips daePath and returns the unzipped dae file's path. 
+    Set isSkeletonOnly to True to remove everything except the joints and animations"""
     if not getExtensionFromPath(daePath) == ".zip":
         LOGE(f"Failed to unzip path: {daePath}")
-    destinationPath = unzipFile(daePath, isAnimation=True)
-    folderName = getFolderFromPath(daePath)
-    isNewNameEmpty = len(newAnimationName) == 0
     zipName = getNameFromPath(daePath)
-    daeName = zipName if isNewNameEmpty else newAnimationName
+    daeName = getNameFromPath(getFinalDaePath(daePath, newAnimationName))
+    if DELETE_TEXTURES:
+        return extractDaeAnimation(daePath, getFinalDaePath(daePath, newAnimationName), isSkeletonOnly)
+    with ProfileSpan("prepareDaeAnimation unzip", daePath, inputPath=daePath) as span:
+        destinationPath = unzipFile(daePath, isAnimation=True)
+        span.outputPath = destinationPath
     unzippedDaePath = f"{destinationPath}/{zipName}.dae"
     # LOG(f"DATA are {destinationPath}\t{newAnimationName}={zipName}={daeName} ISSS {unzippedDaePath}")
     if zipName != daeName:
         #Rename animation name
         tempPath = f"{destinationPath}/{daeName}.dae"
         LOG(f"Renaming .dae file from {unzippedDaePath} to a custom name: {tempPath}")
-        moveFile(unzippedDaePath, tempPath)
+        with ProfileSpan("prepareDaeAnimation rename", daePath, movedPath=tempPath):
+            moveFile(unzippedDaePath, tempPath)
         unzippedDaePath = tempPath
     elif not exist(unzippedDaePath):
         #It will go here if zip file was renamed. It does not work due to extracting 
@@ -80,7 +155,7 @@ def prepareDaeAnimation(daePath, newAnimationName):
                 filePath = os.path.join(root, file)
                 if getExtensionFromPath(filePath) == ".dae":
                     # unzippedDaePath = filePath
-                    LOGD(f"Found the animation file at {filePath} and renaming to {unzippedDaePath}")
+                    LOGD(lambda: f"Found the animation file at {filePath} and renaming to {unzippedDaePath}")
                     moveFile(filePath, unzippedDaePath)
                     break
             break
@@ -88,41 +163,259 @@ def prepareDaeAnimation(daePath, newAnimationName):
     if not exist(unzippedDaePath):
         LOGE(f"Missing dae file {unzippedDaePath} from {daePath}")
         sys.exit(1)
-    #Handle animations with textures
-    LOGA(f"Unzipped .dae file has textures for {unzippedDaePath}. Deleting unneeded texture files = {DELETE_TEXTURES}")
-    if DELETE_TEXTURES:
-        # Move .dae file to the parent folder and delete the folder
-        finalDaePath = f"{folderName}/{daeName}.dae"
-        moveFile(unzippedDaePath, finalDaePath)
-        # Delete unneeded folder and zip file
-        deleteAllFromPath(f"{folderName}/{zipName}")
-        deleteAllFromPath(f"{folderName}/{zipName}.zip")
-        LOGD(f"Finished moving unzipped .dae from {unzippedDaePath} into {finalDaePath} and deleted unneeded files")
-        unzippedDaePath = finalDaePath            
-    executeConvertToXcodeColladaWorkflow(unzippedDaePath)
+    with ProfileSpan("prepareDaeAnimation flatten", daePath, inputPath=unzippedDaePath, outputPath=unzippedDaePath):
+        executeConvertToXcodeColladaWorkflow(unzippedDaePath)
+    if isSkeletonOnly:
+        with ProfileSpan("prepareDaeAnimation prune to skeleton", daePath, inputPath=unzippedDaePath, outputPath=unzippedDaePath):
+            pruneDaeToSkeleton(unzippedDaePath)
+    if MINIFY_DAE:
+        with ProfileSpan("prepareDaeAnimation minify", daePath, inputPath=unzippedDaePath, outputPath=unzippedDaePath):
+            minifyDaeFile(unzippedDaePath, FLOAT_PRECISIONS)
+    if REDUCE_KEYFRAMES:
+        with ProfileSpan("prepareDaeAnimation reduce keyframes", daePath, inputPath=unzippedDaePath, outputPath=unzippedDaePath):
+            reduceDaeKeyframes(unzippedDaePath, KEYFRAME_POSITION_TOLERANCE, KEYFRAME_ROTATION_TOLERANCE)
+    if VALIDATE_DAE:
+        validateConvertedDae(daePath, unzippedDaePath)
+    mirrorConvertedDae(daePath, unzippedDaePath)
     LOG(f"Finished preparing dae animations from {daePath} into {unzippedDaePath}")
     return unzippedDaePath
 
-def handleZippedDae(path, newAnimationName):
+def getDaeLineTransforms(isSkeletonOnly, counter):
+    """Returns the transforms an animation's .dae lines go through while extracted: flattening its animations,
+    pruning it to its skeleton if isSkeletonOnly is True and minifying it if MINIFY_DAE is True, counting bytes in counter"""
+    lineTransforms = [flattenAnimationLines]
+    if isSkeletonOnly:
+        lineTransforms.append(pruneToSkeletonLines)
+    if MINIFY_DAE:
+        lineTransforms.append(lambda lines: minifyDaeLines(lines, FLOAT_PRECISIONS, counter))
+    return lineTransforms
+
+def finishDaeAnimation(daePath, finalDaePath, counter):
+    """Reduces the keyframes of the extracted finalDaePath, validates and mirrors it based on the settings, then deletes the zip at daePath"""
+    if MINIFY_DAE:
+        LOG(f"Minified {finalDaePath} from {counter['bytesRead']} to {counter['bytesWritten']} bytes, saving {counter['bytesRead'] - counter['bytesWritten']} bytes")
+    if REDUCE_KEYFRAMES:
+        with ProfileSpan("prepareDaeAnimation reduce keyframes", daePath, inputPath=finalDaePath, outputPath=finalDaePath):
+            reduceDaeKeyframes(finalDaePath, KEYFRAME_POSITION_TOLERANCE, KEYFRAME_ROTATION_TOLERANCE)
+    if VALIDATE_DAE:
+        validateConvertedDae(daePath, finalDaePath)
+    mirrorConvertedDae(daePath, finalDaePath)
+    with ProfileSpan("prepareDaeAnimation delete zip", daePath, movedPath=daePath):
+        deleteAllFromPath(daePath)
+    LOG(f"Finished preparing dae animations from {daePath} into {finalDaePath}")
+    return finalDaePath
+
+def extractDaeAnimation(daePath, finalDaePath, isSkeletonOnly = False):
+    """Streams only the .dae out of the zip at daePath into finalDaePath through getDaeLineTransforms, then finishes it with finishDaeAnimation.
+    Textures and __MACOSX files are never written to disk"""
+    counter = {"bytesRead": 0, "bytesWritten": 0}
+    with ProfileSpan("prepareDaeAnimation extract", daePath, inputPath=daePath, outputPath=finalDaePath):
+        extractedDaePath = extractDaeFromZip(daePath, finalDaePath, getDaeLineTransforms(isSkeletonOnly, counter))
+    if extractedDaePath is None:
+        LOGE(f"Missing dae file from {daePath}")
+        sys.exit(1)
+    return finishDaeAnimation(daePath, finalDaePath, counter)
+
+def readZippedDae(zipPath):
+    """Pipeline stage reading the whole zip file ahead of the stages needing the CPU"""
+    with ProfileSpan("prepareDaeAnimation read", zipPath, inputPath=zipPath):
+        with open(zipPath, "rb") as file:
+            return zipPath, file.read()
+
+def decompressZippedDae(value):
+    """Pipeline stage decompressing only the .dae out of the read zip file"""
+    zipPath, zipData = value
+    with ProfileSpan("prepareDaeAnimation decompress", zipPath):
+        with zipfile.ZipFile(io.BytesIO(zipData), 'r') as zip_ref:
+            zipinfo = getDaeMemberFromZip(zip_ref, f"{getNameFromPath(zipPath)}.dae")
+            if zipinfo is None:
+                LOGE(f"Missing dae file from {zipPath}")
+                sys.exit(1)
+            return zipPath, zip_ref.read(zipinfo)
+
+def transformZippedDae(value, isSkeletonOnly = False):
+    """Pipeline stage passing the decompressed .dae's lines through getDaeLineTransforms"""
+    zipPath, daeData = value
+    counter = {"bytesRead": 0, "bytesWritten": 0}
+    with ProfileSpan("prepareDaeAnimation transform", zipPath):
+        lines = io.BytesIO(daeData)
+        for lineTransform in getDaeLineTransforms(isSkeletonOnly, counter):
+            lines = lineTransform(lines)
+        return zipPath, b"".join(lines), counter
+
+def writeZippedDae(value, newAnimationName = ""):
+    """Pipeline stage writing the transformed .dae next to its zip file"""
+    zipPath, daeData, counter = value
+    finalDaePath = getFinalDaePath(zipPath, newAnimationName)
+    with ProfileSpan("prepareDaeAnimation write", zipPath, outputPath=finalDaePath):
+        writeLinesAtomically([daeData], finalDaePath)
+    return zipPath, finalDaePath, counter
+
+def finishZippedDae(value):
+    """Pipeline stage finishing the written .dae with finishDaeAnimation and returning its path"""
+    zipPath, finalDaePath, counter = value
+    return finishDaeAnimation(zipPath, finalDaePath, counter)
+
+def ingestZippedDaes(zipPaths, newAnimationName, jobs, isSkeletonOnly = False):
+    """Extracts the .dae of every zipped dae like extractDaeAnimation, with each step running on its own threads or processes
+    while the other steps work on the next zip files. The transforming and finishing steps use up to jobs processes.
+    Returns each zip path with its converted dae's path and its error message if it failed"""
+    isProcess = jobs > 1
+    stages = [
+        PipelineStage("read", readZippedDae, INGEST_READ_JOBS),
+        PipelineStage("decompress", decompressZippedDae, INGEST_DECOMPRESS_JOBS),
+        PipelineStage("transform", functools.partial(transformZippedDae, isSkeletonOnly=isSkeletonOnly), jobs, isProcess),
+        PipelineStage("write", functools.partial(writeZippedDae, newAnimationName=newAnimationName), INGEST_WRITE_JOBS),
+        PipelineStage("finish", finishZippedDae, jobs, isProcess),
+    ]
+    return runPipeline(zipPaths, stages, INGEST_QUEUE_SIZE)
+
+def handleZippedDae(path, newAnimationName, isSkeletonOnly = False):
     # Handle zip file
     if getExtensionFromPath(path) == ".zip":
-        prepareDaeAnimation(path, newAnimationName)
-        print("\n\n")
+        return prepareDaeAnimation(path, newAnimationName, isSkeletonOnly)
+    return None
+
+def getZippedDaesInAnimationsFolder(path):
+    """Returns all zipped dae files including its subdirectories"""
+    return FILE_INDEX.getFilePaths(path, ".zip", isRecursive=True)
+
+def getZippedDaesToConvert(pathToConvert):
+    """Returns the sorted zipped dae files to convert based on the kind of path passed"""
+    zipPaths = []
+    if FILE_INDEX.isDir(pathToConvert):
+        if getNameFromPath(pathToConvert) == "Characters":
+            #Get all of the paths that contains "animations" folder and run the same thing as "animations" folders
+            #Each folder is only scanned once, so walking the animations folders again is free
+            for root, dirs, files in FILE_INDEX.walk(pathToConvert):
+                for dir in dirs:
+                    if dir == "animations":
+                        animationsPath = os.path.join(root, dir)
+                        zipPaths += getZippedDaesInAnimationsFolder(animationsPath)
+        elif getNameFromPath(pathToConvert) == "animations":
+            zipPaths += getZippedDaesInAnimationsFolder(pathToConvert)
+        else:
+            #Handle zipped files in current directory only
+            zipPaths += FILE_INDEX.getFilePaths(pathToConvert, ".zip")
+    elif getExtensionFromPath(pathToConvert) == ".zip":
+        zipPaths.append(pathToConvert)
+    return sorted(zipPaths)
+
+def convertZippedDae(path, newAnimationName, isSkeletonOnly, isProfiling = False):
+    """Converts a zipped dae and returns the converted dae's path, the error message if it failed, 
+    and the spans recorded while converting it if isProfiling"""
+    setProfiling(isProfiling)
+    #Forked worker processes start with a copy of the main process' spans
+    spanCount = len(SPANS)
+    try:
+        return handleZippedDae(path, newAnimationName, isSkeletonOnly), None, popSpans(spanCount)
+    except SystemExit:
+        return None, f"Failed to convert {path}", popSpans(spanCount)
+    except Exception as e:
+        return None, f"Failed to convert {path}. Reason: {e}", popSpans(spanCount)
+    finally:
+        #Worker processes exit without flushing their buffered logs
+        flushLogs()
+
+def getZipPathsToConvert(zipPaths, settings, manifest):
+    """Yields the zip paths that are not up to date in the manifest. Up to date ones are deleted if DELETE_TEXTURES is True"""
+    for zipPath in zipPaths:
+        with ProfileSpan("check build cache", zipPath, inputPath=zipPath):
+            isUpToDate = manifest.isUpToDate(zipPath, settings)
+        if isUpToDate:
+            if DELETE_TEXTURES:
+                deleteAllFromPath(zipPath)
+        else:
+            yield zipPath
+
+def convertZippedDaes(zipPaths, newAnimationName, jobs, manifest, isSkeletonOnly = False):
+    """Converts each zipped dae using up to jobs processes, skipping the ones that are up to date in the manifest.
+    If DELETE_TEXTURES is True, the zip files are streamed through ingestZippedDaes, else each one is converted by convertZippedDae.
+    Returns the number of converted zip files, a dictionary of failed paths and their errors, and the converted dae paths"""
+    settings = getAnimationSettings(newAnimationName, isSkeletonOnly)
+    zipPathsToConvert = getZipPathsToConvert(zipPaths, settings, manifest)
+    if DELETE_TEXTURES:
+        results = ingestZippedDaes(zipPathsToConvert, newAnimationName, jobs, isSkeletonOnly)
+    else:
+        zipPathsToConvert = list(zipPathsToConvert)
+        newAnimationNames = [newAnimationName] * len(zipPathsToConvert)
+        isSkeletonOnlyList = [isSkeletonOnly] * len(zipPathsToConvert)
+        isProfilingList = [isProfilingEnabled()] * len(zipPathsToConvert)
+        if jobs > 1 and len(zipPathsToConvert) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                convertedResults = list(executor.map(convertZippedDae, zipPathsToConvert, newAnimationNames, isSkeletonOnlyList, isProfilingList))
+        else:
+            convertedResults = list(map(convertZippedDae, zipPathsToConvert, newAnimationNames, isSkeletonOnlyList, isProfilingList))
+        results = []
+        for (zipPath, (daePath, error, spans)) in zip(zipPathsToConvert, convertedResults):
+            SPANS.extend(spans)
+            results.append((zipPath, daePath, error))
+    failedPaths = {}
+    daePaths = []
+    for (zipPath, daePath, error) in sorted(results, key=lambda result: result[0]):
+        if error is not None:
+            failedPaths[zipPath] = error
+        elif daePath is not None:
+            manifest.record(zipPath, settings, getConvertedDaePaths(daePath))
+            daePaths += getConvertedDaePaths(daePath)
+    manifest.save()
+    return len(results), failedPaths, daePaths
+
+def watchZippedDaes(pathsToConvert, newAnimationName, jobs, manifest, isSkeletonOnly = False):
+    """Converts each zipped dae as soon as it finishes downloading into pathsToConvert, until interrupted with Ctrl+C.
+    Zip files that are up to date in the manifest are skipped. Each converted dae is recorded right away in the manifest, 
+    asset catalog and its character's animation pack. Returns the number of converted zip files and a dictionary of failed paths and their errors"""
+    settings = getAnimationSettings(newAnimationName, isSkeletonOnly)
+    assetCatalog = AssetCatalog(ASSET_CATALOG_PATH, isEnabled=UPDATE_ASSET_CATALOG)
+    convertedPaths = []
+    failedPaths = {}
+    def getZipPaths():
+        #List the folders again on every poll to find new downloads
+        for pathToConvert in pathsToConvert:
+            FILE_INDEX.invalidate(pathToConvert)
+        return [zipPath for pathToConvert in pathsToConvert for zipPath in getZippedDaesToConvert(pathToConvert)]
+    def shouldConvert(zipPath):
+        return not manifest.isUpToDate(zipPath, settings)
+    def onConverted(zipPath, result):
+        daePath, error, spans = result
+        SPANS.extend(spans)
+        if error is not None:
+            LOGE(error)
+            failedPaths[zipPath] = error
+            return
+        manifest.record(zipPath, settings, getConvertedDaePaths(daePath))
+        manifest.save()
+        for convertedDaePath in getConvertedDaePaths(daePath):
+            assetCatalog.updateDae(convertedDaePath)
+        assetCatalog.save()
+        if BUILD_ANIMATION_PACKS:
+            buildAnimationPacks([daePath])
+        convertedPaths.append(zipPath)
+    convert = functools.partial(convertZippedDae, newAnimationName=newAnimationName, isSkeletonOnly=isSkeletonOnly, isProfiling=isProfilingEnabled())
+    watchAndConvert(FolderWatcher(getZipPaths), convert, onConverted, jobs, shouldConvert)
+    return len(convertedPaths), failedPaths
+
+def getAnimationsFolderPath(daePath):
+    """Returns the path of the "animations" folder containing daePath, or None if it is not in one"""
+    folderPath = os.path.dirname(os.path.abspath(daePath))
+    while getNameFromPath(folderPath) != "animations":
+        parentPath = os.path.dirname(folderPath)
+        if parentPath == folderPath:
+            return None
+        folderPath = parentPath
+    return folderPath
 
-def handleAnimationsFolder(path):
-    """Unzipped and convert all zipped dae files including its subdirectories"""
-    for root, dirs, files in os.walk(path):
-        for file in files:
-            filePath = os.path.join(root, file)
-            handleZippedDae(filePath, newAnimationName)
+def buildAnimationPacks(daePaths):
+    """Rebuilds the animation pack of every character that has a .dae in daePaths"""
+    animationsPaths = sorted(set(filter(None, [getAnimationsFolderPath(daePath) for daePath in daePaths])))
+    for animationsPath in animationsPaths:
+        buildAnimationPack(animationsPath)
 
 #----------------------------------------------------------------------------------------------------------------
 #################################################### Main #######################################################
 #----------------------------------------------------------------------------------------------------------------
 if __name__ == "__main__":
     """
-    Must have ConvertToXcodeCollada in Desktop/StreamCodes/scripts/ConvertToXcodeCollada/ConvertToXcodeCollada.workflow
-
     Execute by
     1. If zip file is passed, unzip and convert into a usable .dae file
         python3 "mixamoAnimToXcode.py" <path_to_zip> <optional_new_name>
@@ -133,25 +426,50 @@ if __name__ == "__main__":
 
         a. If the folder's name is "animations", then the script will convert .zip files including subdirectories
         b. Any other names of a folder will not convert subdirectories
+    3. Pass --jobs N to convert N zip files at the same time
+        e.g. python3 "mixamoAnimToXcode.py" '~/Downloads/Characters' --jobs 8
+    4. Pass --force to convert zip files even if the build manifest shows they did not change
+    5. Pass --skeleton-only to remove the skin, geometries, materials and images, keeping only the joints and animations
+    6. Converted animations are added to the asset catalog at ASSET_CATALOG_PATH if UPDATE_ASSET_CATALOG is True
+    7. Set BUILD_ANIMATION_PACKS to True to also compile each character's animations into an animations.fuclips pack
+    8. Pass --profile to log how long each phase took for each clip, --trace path to also write the phases as trace events
+       that chrome://tracing or https://ui.perfetto.dev can open, and --cprofile path to write the main process' cProfile stats
+    9. Pass --log-json path to also append every log, including the worker processes' logs, to path as json lines
+    10. Pass --watch to keep running and convert each zip file as soon as it finishes downloading into the paths, until stopped with Ctrl+C
+        e.g. python3 "mixamoAnimToXcode.py" '~/Downloads/Characters' --watch --jobs 4
+    11. Set DEDUPE_ASSETS to True to list the duplicated animations and textures of CHARACTERS_PATH in DEDUPE_REPORT_PATH
+    12. Set MIRROR_ANIMATIONS to True to also write each converted animation's mirrored version, e.g. idleFight-m.dae for idleFight.dae
+    13. Set VALIDATE_DAE to False to skip checking each converted clip for corruptions, which fails only that clip
     """
-    pathsToConvert, newAnimationName = validateAndGetInput()
-    for pathToConvert in pathsToConvert:
-        if isFolder(pathToConvert):
-            if getNameFromPath(pathToConvert) == "Characters":
-                #Get all of the paths that contains "animations" folder and run the same thing as "animations" folders
-                animationsPaths = []
-                for root, dirs, files in os.walk(pathToConvert):
-                    for dir in dirs:
-                        if dir == "animations":
-                            animationsPath = os.path.join(root, dir)
-                            handleAnimationsFolder(animationsPath)
-            elif getNameFromPath(pathToConvert) == "animations":
-                handleAnimationsFolder(pathToConvert)
-            else:
-                #Handle zipped files in current directory only
-                for filename in os.listdir(pathToConvert):
-                    filePath = os.path.join(pathToConvert, filename)
-                    handleZippedDae(filePath, newAnimationName)
-        else:
-            handleZippedDae(pathToConvert, newAnimationName)
+    setLogOptions()
+    tracePath, cProfilePath, profiler = getProfilingOptions()
+    manifest = getBuildManifest()
+    isWatching = popArgument("--watch") is not None
+    pathsToConvert, newAnimationName, jobs, isSkeletonOnly = validateAndGetInput()
+    if isWatching:
+        convertedCount, failedPaths = watchZippedDaes(pathsToConvert, newAnimationName, jobs, manifest, isSkeletonOnly)
+        finishProfiling(tracePath, cProfilePath, profiler)
+        LOG(f"RESULT: Converted {convertedCount} downloaded zip files with {jobs} jobs. {len(failedPaths)} failed")
+    else:
+        zipPaths = []
+        for pathToConvert in pathsToConvert:
+            zipPaths += getZippedDaesToConvert(pathToConvert)
+        convertedCount, failedPaths, daePaths = convertZippedDaes(zipPaths, newAnimationName, jobs, manifest, isSkeletonOnly)
+        assetCatalog = AssetCatalog(ASSET_CATALOG_PATH, isEnabled=UPDATE_ASSET_CATALOG)
+        for daePath in daePaths:
+            with ProfileSpan("update asset catalog", daePath, inputPath=daePath):
+                assetCatalog.updateDae(daePath)
+        assetCatalog.save()
+        if BUILD_ANIMATION_PACKS:
+            with ProfileSpan("build animation packs", f"{len(daePaths)} clips"):
+                buildAnimationPacks(daePaths)
+        if DEDUPE_ASSETS and len(daePaths) > 0:
+            with ProfileSpan("dedupe assets", f"{len(daePaths)} clips"):
+                dedupeAssets(CHARACTERS_PATH, DEDUPE_REPORT_PATH, DEDUPE_HARD_LINKS)
+        finishProfiling(tracePath, cProfilePath, profiler)
+        for (path, error) in failedPaths.items():
+            LOGE(error)
+        LOG(f"RESULT: Converted {convertedCount - len(failedPaths)} of {len(zipPaths)} zip files with {jobs} jobs. Skipped {len(zipPaths) - convertedCount} unchanged zip files")
+    if len(failedPaths) > 0:
+        sys.exit(1)
     LOG(f"✅✅✅")
@@ -2,141 +2,73 @@
 # This will do the following
 # 1. Unzip files and properly rename its files and folders
 # 2. Update the .dae file's texture
-# 3. Run the ConvertToXcodeCollada script to the .dae files
-
+# 3. Flatten the .dae files' animations the same way the ConvertToXcodeCollada workflow did
+# 4. Optionally recompress the textures losslessly
+# 5. Record the converted fighters in the asset catalog
+# 6. Optionally report and hard link the duplicated animations and textures
+# 7. Validate every converted .dae, so corrupted files fail the conversion instead of crashing the game
+
+import functools
+import io
 import os
 import shutil
-import subprocess
 import sys
 import zipfile
 
-from enum import Enum
 from os.path import abspath, expanduser
 
 from Logger import *
-
-try:
-    from subprocess import DEVNULL  # python3
-except ImportError:
-    DEVNULL = open(os.devnull, 'wb')
+from buildCache import *
+from daeHelpers import *
+from textureOptimizer import *
+from assetCatalog import *
+from pipelineProfiler import *
+from fighterRegistry import *
+from folderWatcher import *
+from assetDeduper import *
+from taskGraph import *
+from ingestPipeline import *
+from fileIndex import *
+from daeValidator import *
+from daeLod import *
+from textureTiers import *
 
 #----------------------------------------------------------------------------------------------------------------
 ############################################### CUSTOMIZABLE SETTINGS ###########################################
 #----------------------------------------------------------------------------------------------------------------
 SHOULDUNZIP = True
+VALIDATE_DAE = True #When True, every converted .dae is checked for corruptions, failing only the fighter or clip it belongs to
+MINIFY_DAE = False #When True, converted .dae files are minified by dropping whitespaces, comments and extra float digits
+FLOAT_PRECISIONS = {"transform": 5, "time": 4, "uv": 5, "default": 4} #Decimals kept per <float_array> semantic when minifying
+GENERATE_LODS = False #When True, each fighter's .dae is also simplified into <fighter>_lod1.dae, <fighter>_lod2.dae... next to it. Requires NumPy
+LOD_RATIOS = [0.5, 0.25] #Ratio of the fighter's triangles kept in each LOD, from lod1 to the last
 
 USERDOWNLOADSFOLDER = abspath(expanduser("~/") + '/Downloads')
-WORKFLOWPATH_ConvertToXcodeCollada = abspath(expanduser("~/") + '/Desktop/StreamCodes/scripts/ConvertToXcodeCollada/ConvertToXcodeCollada.workflow')
-#----------------------------------------------------------------------------------------------------------------
-#################################################### Objects ####################################################
-#----------------------------------------------------------------------------------------------------------------
-
-class Fighter:
-    def __init__(self, fighterType):
-        self.fighterType = fighterType
-        self.folderName = MIXAMO_FOLDERNAMES[fighterType]
-        self.mixamoName = MIXAMO_NAMES[fighterType]
-        self.textureName = getTextureKey(fighterType)
-        self.name = FIGHTER_NAMES[fighterType]
-
-class FighterType(Enum):
-    samuel = "samuel"
-    clara = "clara"
-    kim = "kim"
-    deeJay = "deejay"
-    jad = "jad"
-    # olivia = "olivia" #corrupted .dae
-    ruby = "ruby"
-    cain = "cain"
-    andrew = "andrew"
-    corey = "corey"
-    alexis = "alexis"
-    marco = "marco" #stopped using because his hair is not getting rendered properly on the back of his head
-    jennifer = "jennifer" #unused for now
-    neverRight = "neverRight"
-    eve = "eve" #the ".Gonzales" in zip file name's "Eve By J.Gonzales.zip" us causing the character's folder to be named as "Eve By J"
-
+USE_BUILD_CACHE = True #When True, zip files that were already converted and did not change are skipped. Can be disabled with --force
+BUILD_MANIFEST_PATH = abspath(os.path.dirname(abspath(__file__)) + '/../iOS/FuFight/Resources/mixamoBuildManifest.json')
+OPTIMIZE_TEXTURES = False #When True, the fighters' .png textures are recompressed losslessly into their smallest color type. Requires Pillow
+TEXTURE_JOBS = os.cpu_count() or 1 #Number of textures optimized at the same time
+TEXTURE_MANIFEST_PATH = abspath(os.path.dirname(abspath(__file__)) + '/../iOS/FuFight/Resources/textureBuildManifest.json')
+TEXTURE_REPORT_PATH = abspath(os.path.dirname(abspath(__file__)) + '/../iOS/FuFight/Resources/textureOptimizationReport.json')
+GENERATE_TEXTURE_TIERS = False #When True, half and quarter size variants of the fighters' textures are written next to them with a textureTiers.json. Requires Pillow and NumPy
+TEXTURE_TIER_BUILD_MANIFEST_PATH = abspath(os.path.dirname(abspath(__file__)) + '/../iOS/FuFight/Resources/textureTierBuildManifest.json')
+CHARACTERS_PATH = abspath(os.path.dirname(abspath(__file__)) + '/../iOS/FuFight/Resources/3DAssets.scnassets/Characters')
+UPDATE_ASSET_CATALOG = True #When True, every converted fighter and animation is added to the asset catalog below
+ASSET_CATALOG_PATH = f'{CHARACTERS_PATH}/{ASSET_CATALOG_NAME}'
+DEDUPE_ASSETS = False #When True, duplicated animations and textures in CHARACTERS_PATH are listed in the report below after converting
+DEDUPE_HARD_LINKS = False #When True, the deduplication also replaces files with the same bytes with hard links to a single copy
+DEDUPE_REPORT_PATH = abspath(os.path.dirname(abspath(__file__)) + '/../iOS/FuFight/Resources/dedupeReport.json')
+INGEST_QUEUE_SIZE = 4 #Number of zip files waiting between 2 steps of the ingest pipelines, which caps how many are held in memory
+INGEST_READ_JOBS = 2 #Number of threads reading zip files ahead of the other steps
+INGEST_DECOMPRESS_JOBS = 2 #Number of threads decompressing the read zip files
+INGEST_WRITE_JOBS = 2 #Number of threads writing the extracted files
+FIGHTER_JOBS = os.cpu_count() or 1 #Number of fighters' steps run at the same time, or of downloaded fighters converted at the same time with --watch. Can be overridden with --jobs N
 #----------------------------------------------------------------------------------------------------------------
 #################################################### Constants ##################################################
 #----------------------------------------------------------------------------------------------------------------
 
 ANIMATION_CATEGORIES = ["dodge", "hit", "idle", "kick", "kill", "punch", "others"]
 
-#Can get after downloading the .dae zipped files
-MIXAMO_FOLDERNAMES = {
-    FighterType.samuel: "samuel", 
-    FighterType.clara: "clara",
-    FighterType.kim: "Ch02_nonPBR",
-    FighterType.deeJay: "Ch03_nonPBR",
-    FighterType.jad: "Ch08_nonPBR",
-    # FighterType.olivia: "Ch11_nonPBR",
-    FighterType.ruby: "Ch13_nonPBR",
-    FighterType.cain: "Ch16_nonPBR",
-    FighterType.andrew: "Ch17_nonPBR",
-    FighterType.corey: "Ch28_nonPBR",
-    FighterType.alexis: "Ch37_nonPBR",
-    FighterType.marco: "Ch42_nonPBR",
-    FighterType.jennifer: "Ch47_nonPBR",
-    FighterType.neverRight: "Prisoner B Styperek",
-    FighterType.eve: "Eve By J.Gonzales",
-}
-
-MIXAMO_NAMES = {
-    FighterType.samuel: "fiverr-samuel",
-    FighterType.clara: "fiverr-clara",
-    FighterType.kim: "Sophie",
-    FighterType.deeJay: "Michelle",
-    FighterType.jad: "Adam",
-    # FighterType.olivia: "Olivia",
-    FighterType.ruby: "Roth",
-    FighterType.alexis: "Jody",
-    FighterType.cain: "Chad",
-    FighterType.andrew: "Pete",
-    FighterType.corey: "David",
-    FighterType.marco: "Bryce",
-    FighterType.jennifer: "Jennifer",
-    FighterType.neverRight: "Prisoner B Styperek",
-    FighterType.eve: "Eve By J.Gonzales",
-}
-
-FIGHTER_NAMES = {
-    FighterType.samuel: "Samuel",
-    FighterType.clara: "Clara",
-    FighterType.kim: "Kim",
-    FighterType.deeJay: "Dee Jay",
-    FighterType.jad: "Jad",
-    # FighterType.olivia: "Olivia",
-    FighterType.ruby: "Ruby",
-    FighterType.cain: "Cain",
-    FighterType.andrew: "Andrew",
-    FighterType.corey: "Corey",
-    FighterType.alexis: "Alexis",
-    FighterType.marco: "Marco",
-    FighterType.jennifer: "Jennifer",
-    FighterType.neverRight: "Never Right",
-    FighterType.eve: "Eve",
-}
-
-# Set to true if after downloading .dae zipped files, and the textures 
-# folder has 1001 and 1002 in the image names
-MIXAMO_HAS_MULTIPLE_TEXTURE_VERSION = {
-    FighterType.samuel: False,
-    FighterType.clara: False,
-    FighterType.kim: True,
-    FighterType.deeJay: False,
-    FighterType.jad: True,
-    # FighterType.olivia: True,
-    FighterType.ruby: True,
-    FighterType.cain: True,
-    FighterType.andrew: True,
-    FighterType.corey: False,
-    FighterType.alexis: True,
-    FighterType.marco: True,
-    FighterType.jennifer: True,
-    FighterType.neverRight: False,
-    FighterType.eve: False,
-}
-
 #----------------------------------------------------------------------------------------------------------------
 #################################################### Helper Methods #############################################
 #----------------------------------------------------------------------------------------------------------------
@@ -149,9 +81,11 @@ def getNameFromPath(path, withExtension = False):
 def moveFile(path, newPath):
     # os.rename(path, newPath)
     shutil.move(path, newPath)
+    FILE_INDEX.recordMove(path, newPath)
 
 def createFolder(path):
     os.mkdir(path)
+    FILE_INDEX.recordCreation(path, isDir=True)
 
 def getFolderFromPath(path):
     return os.path.dirname(path)
@@ -168,8 +102,13 @@ def isFile(path):
 def isFolder(path):
     return os.path.isdir(path)
 
+def getFilePathsInFolder(path):
+    """Returns the paths of every file in path including its subdirectories"""
+    return FILE_INDEX.getFilePaths(path, isRecursive=True)
+
 def getFileCount(path):
-    return len([name for name in os.listdir(path) if os.path.isfile(name)])
+    """Returns the number of files directly inside path"""
+    return len(FILE_INDEX.getFilePaths(path))
 
 def deleteAllFromPath(path):
     if exist(path):
@@ -180,68 +119,27 @@ def deleteAllFromPath(path):
                 shutil.rmtree(path)
         except Exception as e:
             LOGE('Failed to delete %s. Reason: %s' % (path, e))
+        FILE_INDEX.recordRemoval(path)
 
 def renamePath(path, newPath):
     if exist(newPath):
         deleteAllFromPath(newPath)
     # os.rename(path, newPath) #causes unexpected bugs like a file not getting unzipped but will override existing newPath
     shutil.move(path, newPath) #fails if newPath already exist
+    FILE_INDEX.recordMove(path, newPath)
 
 def getMixamoKey(fighterType):
     # Returns the "Ch02" in "Ch02_nonPBR" or "Prisoner B Styperek"
-    mixamoKey = MIXAMO_FOLDERNAMES[fighterType]
-    if mixamoKey.startswith("Ch"):
-        # If fighter's folder name contains Ch, then 
-        # its key is the first 4 characters e.g. Ch02
-        mixamoKey = mixamoKey[:4]
-    LOGA(f"Mixamo key for {fighterType.value} is {mixamoKey}")
-    return mixamoKey
+    return getFighter(fighterType).mixamoKey
 
 def getTextureKey(fighterType):
     """Returns something like either "Ch17_100" or "Ch03_1001" or "prisoner\""""
-    textureName = getMixamoKey(fighterType)
-    hasMultipleVersion = MIXAMO_HAS_MULTIPLE_TEXTURE_VERSION[fighterType]
-    if not textureName.startswith("Ch"):
-        if fighterType == FighterType.samuel:
-            textureName = FighterType.samuel.value
-        elif fighterType == FighterType.clara:
-            textureName = FighterType.clara.value
-        elif fighterType == FighterType.neverRight:
-            textureName = "prisoner"
-        elif fighterType == FighterType.eve:
-            textureName = "SpacePirate"
-        else:
-            LOGE(f"This texture's key might be unexpected: {textureName}")
-    else:
-        if hasMultipleVersion:
-            textureName += "_100"
-        else:
-            textureName += "_1001"
-    return textureName
+    return getFighter(fighterType).textureName
 
 def getTextureOldName(fighterType, filePath):
     """Returns something like "Ch17_1002_Normal.png\""""
-    textureName = getMixamoKey(fighterType)
-    folderPath = getFolderFromPath(filePath)
-    hasMultipleVersion = MIXAMO_HAS_MULTIPLE_TEXTURE_VERSION[fighterType]
-    LOGD(f"texture name is {textureName} at {filePath}")
-    if not textureName.startswith("Ch"):
-        if fighterType == FighterType.samuel:
-            textureName = FighterType.samuel.value
-        elif fighterType == FighterType.clara:
-            textureName = FighterType.clara.value
-        elif fighterType == FighterType.neverRight:
-            textureName = "prisoner"
-        elif fighterType == FighterType.eve:
-            textureName = "SpacePirate"
-    else:
-        if hasMultipleVersion:
-            textureName += "_100"
-        else:
-            textureName += "_1001"
-
-    fighter = Fighter(fighterType)
-    LOGA(f"Texture's OLD name for {fighter.name} from {filePath} IS {textureName}")
+    textureName = getTextureKey(fighterType)
+    LOGA(lambda: f"Texture's OLD name for {getFighter(fighterType).name} from {filePath} IS {textureName}")
     return textureName
 
 def getTextureNewName(fighterType, filePath):
@@ -249,11 +147,63 @@ def getTextureNewName(fighterType, filePath):
     oldTextureKeyToReplace = getTextureKey(fighterType)
     currentTextureName = os.path.basename(filePath)
     textureName = currentTextureName.replace(oldTextureKeyToReplace, f"{fighterType.value}Texture")
-    LOGA(f"Texture's NEW name for {fighterType.value} with old key {oldTextureKeyToReplace} is {textureName}")
+    LOGA(lambda: f"Texture's NEW name for {fighterType.value} with old key {oldTextureKeyToReplace} is {textureName}")
     return textureName
 
+def popArgument(option, hasValue = False):
+    """Removes option (and its value if hasValue) from sys.argv.
+    Returns the option's value, True if the option has no value, or None if option was not passed"""
+    if not option in sys.argv:
+        return None
+    index = sys.argv.index(option)
+    if not hasValue:
+        del sys.argv[index]
+        return True
+    if index + 1 >= len(sys.argv):
+        LOGE(f"Missing value for {option}")
+        sys.exit(1)
+    value = sys.argv[index + 1]
+    del sys.argv[index:index + 2]
+    return value
+
+def getBuildManifest(manifestPath = BUILD_MANIFEST_PATH):
+    """Returns the build manifest, which is disabled if USE_BUILD_CACHE is False or --force is passed"""
+    isForced = popArgument("--force") is not None
+    return BuildManifest(manifestPath, isEnabled=USE_BUILD_CACHE and not isForced)
+
+def getProfilingOptions():
+    """Pops --profile, --trace path and --cprofile path from the arguments and starts profiling if any of them was passed.
+    Returns the trace's path, the cProfile's path and the running cProfile.Profile to pass to finishProfiling"""
+    isProfiling = popArgument("--profile") is not None
+    tracePath = popArgument("--trace", hasValue=True)
+    cProfilePath = popArgument("--cprofile", hasValue=True)
+    profiler = startProfiling(isProfiling or tracePath is not None, cProfilePath)
+    return tracePath, cProfilePath, profiler
+
+def setLogOptions():
+    """Pops --log-json path from the arguments and appends every log to it as json lines if it was passed"""
+    jsonLogPath = popArgument("--log-json", hasValue=True)
+    if jsonLogPath is not None:
+        setJsonLogPath(jsonLogPath)
+
+def getFighterSettings(fighterType):
+    """Returns the settings that changes how a fighter's zip file gets converted"""
+    return {
+        "ANIMATION_CATEGORIES": ANIMATION_CATEGORIES,
+        "MIXAMO_FOLDERNAMES": getFighter(fighterType).folderName,
+        "MIXAMO_NAMES": getFighter(fighterType).mixamoName,
+        "FIGHTER_NAMES": getFighter(fighterType).name,
+        "MIXAMO_HAS_MULTIPLE_TEXTURE_VERSION": getFighter(fighterType).hasMultipleTextureVersion,
+        "MINIFY_DAE": MINIFY_DAE,
+        "FLOAT_PRECISIONS": FLOAT_PRECISIONS,
+        "OPTIMIZE_TEXTURES": OPTIMIZE_TEXTURES,
+        "GENERATE_TEXTURE_TIERS": GENERATE_TEXTURE_TIERS,
+        "GENERATE_LODS": GENERATE_LODS,
+        "LOD_RATIOS": LOD_RATIOS,
+    }
+
 def check_path_contains_files_with_type(path, file_type):
-    for filename in os.listdir(path):
+    for filename in FILE_INDEX.listNames(path):
         if filename.endswith(file_type):
             return True
     return False
@@ -269,7 +219,7 @@ def unzipFile(path, isAnimation = False):
         #If path already exist, delete previous folder contents before unzipping
         if unzippedPath != path and exist(unzippedPath):
             deleteAllFromPath(unzippedPath)
-            LOGA(f"Fighter's folder already exist. Deleting old folder {unzippedPath}")
+            LOGA(lambda: f"Fighter's folder already exist. Deleting old folder {unzippedPath}")
         destinationPath = ""
         if isAnimation:
             # if len(zip_ref.namelist()) > 2: #>2 to ignore weird file: '__MACOSX/._medium.dae 
@@ -280,7 +230,7 @@ def unzipFile(path, isAnimation = False):
             #     # LOGA(f"RESULT2 Zip file only has 1 valid file at: {daeFolderName}")
             #     destinationPath = daeFolderName
             destinationPath = f"{daeFolderName}/{zipName}"
-            LOGA(f"Unzipping animation file from {path} TO {destinationPath}")
+            LOGA(lambda: f"Unzipping animation file from {path} TO {destinationPath}")
             # for zipinfo in zip_ref.infolist():
             #     # This will do the renaming
             #     # LOGD(f"Unzipping {zipinfo.filename} AND {getExtensionFromPath(zipinfo.filename)}")
@@ -297,8 +247,33 @@ def unzipFile(path, isAnimation = False):
             destinationPath = unzippedPath
 
         zip_ref.extractall(destinationPath)
-        LOGA(f"DONE Unzipping file from {path} to \t\t {destinationPath}")
+        FILE_INDEX.recordCreation(destinationPath, isDir=True)
+        LOGA(lambda: f"DONE Unzipping file from {path} to \t\t {destinationPath}")
         return destinationPath
+
+def getDaeMemberFromZip(zip_ref, preferredDaeName = None):
+    """Returns the zip's .dae member named preferredDaeName if it exist, else the first .dae outside of __MACOSX"""
+    daeMembers = [zipinfo for zipinfo in zip_ref.infolist() 
+                  if not zipinfo.is_dir() and getExtensionFromPath(zipinfo.filename) == ".dae" and not "__MACOSX" in zipinfo.filename]
+    for zipinfo in daeMembers:
+        if getNameFromPath(zipinfo.filename, withExtension=True) == preferredDaeName:
+            return zipinfo
+    return daeMembers[0] if len(daeMembers) > 0 else None
+
+def extractDaeFromZip(path, daePath, lineTransforms = []):
+    """Streams only the .dae inside the zip at path into daePath, passing its lines through each lineTransforms on the way. 
+    Nothing else in the zip is written to disk. Returns daePath, or None if the zip has no .dae"""
+    with zipfile.ZipFile(path, 'r') as zip_ref:
+        zipinfo = getDaeMemberFromZip(zip_ref, f"{getNameFromPath(path)}.dae")
+        if zipinfo is None:
+            return None
+        with zip_ref.open(zipinfo) as file:
+            lines = file
+            for lineTransform in lineTransforms:
+                lines = lineTransform(lines)
+            writeLinesAtomically(lines, daePath)
+        LOGA(lambda: f"DONE Extracting {zipinfo.filename} from {path} to \t\t {daePath}")
+        return daePath
 #----------------------------------------------------------------------------------------------------------------
 #################################################### Methods ####################################################
 #----------------------------------------------------------------------------------------------------------------
@@ -309,166 +284,349 @@ def getPathToConvert():
     pathToConvert = ""
     if len(sys.argv) == 2:
         pathToConvert = sys.argv[1]
-    if len(sys.argv) == 1:
+    elif len(sys.argv) == 1:
         pathToConvert = USERDOWNLOADSFOLDER
     else:
-        LOGE("Error Usage: python mixamoToXcode.py <optional_directory_path>")
+        LOGE("Error Usage: python mixamoToXcode.py <optional_directory_path> <optional --force> <optional --watch> <optional --jobs N> <optional --profile> <optional --trace path> <optional --cprofile path> <optional --log-json path>")
         LOGW("""WARNING: Executing this script will default to converting files downloaded in 
               your Downloads folder if a path is not provided""")
         sys.exit(1)
     return pathToConvert
 
-def getFighterPaths(fromPath):
-    fighterPathsDic = {}
+def getFighterZipPathsToUnzip(fromPath, fighterPathsDic, manifest = None):
+    """Yields the fighters' zip files in fromPath that are not up to date in the manifest,
+    adding the fighters' folders that are already unzipped into fighterPathsDic"""
     # Iterate over files in directory
-    for filePath in os.scandir(fromPath):
-        fileName = os.path.basename(filePath)
-        fullPath = os.path.join(fromPath, filePath)
+    for (name, entry) in sorted(FILE_INDEX.getEntries(fromPath).items()):
+        fighterType = FIGHTER_REGISTRY.getFighterType(name)
+        if fighterType is None:
+            continue
+        fullPath = os.path.join(fromPath, name)
         #if path is a folder and contains a .dae file...
-        if os.path.isdir(filePath):
+        if entry.isDir:
             if check_path_contains_files_with_type(fullPath, ".dae"):
-                for fighterType, mixamoFolderName in MIXAMO_FOLDERNAMES.items():
-                    if fileName.startswith(mixamoFolderName):
-                        fighterPathsDic[fighterType] = fullPath
-        else:
-            if SHOULDUNZIP:
-                #Handle expected zipped file names. Else skip
-                for fighterType, mixamoFolderName in MIXAMO_FOLDERNAMES.items():
-                    if fileName.startswith(mixamoFolderName):
-                        if fullPath.endswith(".zip"):
-                            LOGA(f"Unzipping file at {fullPath}")
-                            unzipFile(fullPath)
-                            #Add path to the new unzipped file
-                            unzippedPath = f"{getFolderFromPath(fullPath)}/{getNameFromPath(fullPath)}"
-                            if check_path_contains_files_with_type(unzippedPath, ".dae"):
-                                fighterPathsDic[fighterType] = unzippedPath
+                fighterPathsDic[fighterType] = fullPath
+        elif SHOULDUNZIP and fullPath.endswith(".zip"):
+            #Handle expected zipped file names. Else skip
+            with ProfileSpan("getFighterPaths check build cache", fighterType.value, inputPath=fullPath):
+                isUpToDate = manifest is not None and manifest.isUpToDate(fullPath, getFighterSettings(fighterType))
+            if not isUpToDate:
+                yield fullPath
+
+def readFighterZip(zipPath):
+    """Pipeline stage reading the whole fighter's zip file ahead of the other stages"""
+    with ProfileSpan("getFighterPaths read", getFighterTypeFromPath(zipPath).value, inputPath=zipPath):
+        with open(zipPath, "rb") as file:
+            return zipPath, file.read()
+
+def decompressFighterZip(value):
+    """Pipeline stage decompressing every file of the read fighter's zip file"""
+    zipPath, zipData = value
+    with ProfileSpan("getFighterPaths decompress", getFighterTypeFromPath(zipPath).value):
+        with zipfile.ZipFile(io.BytesIO(zipData), 'r') as zip_ref:
+            return zipPath, [(zipinfo.filename, zip_ref.read(zipinfo)) for zipinfo in zip_ref.infolist() if not zipinfo.is_dir()]
+
+def writeFighterZip(value):
+    """Pipeline stage writing the decompressed files into a folder named like the zip file, replacing the folder if it exists.
+    Returns the unzipped folder's path"""
+    zipPath, files = value
+    unzippedPath = f"{getFolderFromPath(zipPath)}/{getNameFromPath(zipPath)}"
+    with ProfileSpan("getFighterPaths write", getFighterTypeFromPath(zipPath).value, outputPath=unzippedPath):
+        if exist(unzippedPath):
+            deleteAllFromPath(unzippedPath)
+            LOGA(lambda: f"Fighter's folder already exist. Deleting old folder {unzippedPath}")
+        for (fileName, data) in files:
+            #Like zipfile's extractall, never write outside of the unzipped folder
+            pathComponents = [component for component in fileName.replace("\\", "/").split("/") if not component in ["", ".", ".."]]
+            if len(pathComponents) == 0:
+                continue
+            filePath = os.path.join(unzippedPath, *pathComponents)
+            os.makedirs(os.path.dirname(filePath), exist_ok=True)
+            with open(filePath, "wb") as file:
+                file.write(data)
+    FILE_INDEX.recordCreation(unzippedPath, isDir=True)
+    LOGA(lambda: f"DONE Unzipping file from {zipPath} to \t\t {unzippedPath}")
+    return unzippedPath
+
+def getFighterPaths(fromPath, manifest = None):
+    """Returns the fighters' unzipped paths. Zip files that are up to date in the manifest are skipped.
+    The zip files are found, read, decompressed and written by a pipeline, so reading the next zip files overlaps with writing the previous ones"""
+    fighterPathsDic = {}
+    stages = [
+        PipelineStage("read", readFighterZip, INGEST_READ_JOBS),
+        PipelineStage("decompress", decompressFighterZip, INGEST_DECOMPRESS_JOBS),
+        PipelineStage("write", writeFighterZip, INGEST_WRITE_JOBS),
+    ]
+    results = runPipeline(getFighterZipPathsToUnzip(fromPath, fighterPathsDic, manifest), stages, INGEST_QUEUE_SIZE)
+    for (zipPath, unzippedPath, error) in sorted(results, key=lambda result: result[0]):
+        if error is not None:
+            LOGE(error)
+        elif check_path_contains_files_with_type(unzippedPath, ".dae"):
+            fighterPathsDic[getFighterTypeFromPath(zipPath)] = unzippedPath
     return fighterPathsDic
 
+def getFighterTypeFromPath(path):
+    """Returns the type of the fighter whose mixamo folder name starts the path's name, or None"""
+    return FIGHTER_REGISTRY.getFighterType(os.path.basename(path))
+
+def getFighterZipPaths(fromPath):
+    """Returns the paths of the fighters' zip files in fromPath. The folder is listed again on every call to find new downloads"""
+    return [entry.path for entry in os.scandir(fromPath) if entry.is_file() and entry.name.endswith(".zip") and getFighterTypeFromPath(entry.path) is not None]
+
 def updateDaeFile(fighterType, daePath):
     """
-    Update the fighter's .dae to the renamed textures
+    Update the fighter's .dae to the renamed textures. Returns the number of texture paths updated.
+    Exits if none were updated, so the fighter fails instead of being recorded as converted with the Mixamo texture names
     """
     if not exist(daePath):
-        return
-    fighter = Fighter(fighterType)
-    # Read in the file
-    with open(daePath, 'r') as file:
-        filedata = file.read()
-        # Replace the target string
-        textToReplace = f"textures/{getTextureKey(fighter.fighterType)}"
-        filedata = filedata.replace(textToReplace, f"assets/{fighterType.value}Texture")
-        # Write the file out again
-        with open(daePath, 'w') as file:
-            file.write(filedata)
-            LOGA(f"Finished updating dae file in {daePath}. Replacing all contents from {textToReplace} into {fighterType.value}Texture")
+        return 0
+    fighter = getFighter(fighterType)
+    textToReplace = f"textures/{getTextureKey(fighter.fighterType)}"
+    replacedCount = replaceInFile(daePath, textToReplace, f"assets/{fighterType.value}Texture")
+    if replacedCount == 0:
+        LOGE(f"No texture in {daePath} starts with {textToReplace}. Texture key for {fighterType.value} might be wrong")
+        sys.exit(1)
+    LOGA(lambda: f"Finished updating dae file in {daePath}. Replaced {replacedCount} contents from {textToReplace} into {fighterType.value}Texture")
+    return replacedCount
 
 def executeConvertToXcodeColladaWorkflow(daePath):
-    """Executes ConvertXcodeCollada workflow and to the dae path, then deletes the unneeded .dae file"""
-    if not exist(WORKFLOWPATH_ConvertToXcodeCollada):
-        LOGE(f"File missing for ConvertToXcodeCollada {WORKFLOWPATH_ConvertToXcodeCollada}")
+    """Flattens the .dae's animations in place like the ConvertToXcodeCollada workflow, without running Automator or leaving a .dae-e file"""
     if not exist(daePath):
         LOGE(f"File missing for dae to convert {daePath}")
     try:
-        # Execute the workflow
-        proc = subprocess.check_output(["/usr/bin/automator", "-i", daePath, WORKFLOWPATH_ConvertToXcodeCollada],                                
-                                        stderr=DEVNULL)
-        #Remove unneeded .dae file the workflow generated
-        uneededDaeFileName = f"{getNameFromPath(daePath, withExtension=True)}-e"
-        uneededDaePath = f"{getFolderFromPath(daePath)}/{uneededDaeFileName}"
-        os.remove(uneededDaePath)
-        LOGA(f"Executed ConvertToXcodeCollada to daePath: {daePath} and deleted {uneededDaeFileName}")
-    except subprocess.CalledProcessError as e:
-        LOGE(f"Failed to execute script at path: {daePath}\n\tWith error code: {e.returncode} \tand output: {e.output}")
-        # LOGE('Python Error executing ConvertToXcodeCollada workflow with error: [%d]\n{!r}'.format(e.returncode, e.output))
+        flattenDaeAnimations(daePath)
+        LOGA(lambda: f"Executed ConvertToXcodeCollada to daePath: {daePath}")
+    except OSError as e:
+        LOGE(f"Failed to execute script at path: {daePath}\n\tWith error: {e}")
         sys.exit(1)
 
-def updateFighters(fighterType, fighterPath):
-    """
-    1. Update the .dae's name in fighterPath
-    2. Update the textures folder to assets in fighterPath
-    3. Create an animations folder and more folders for each categories
-    4. Update the name of the .png files in fighterPath/assets
-    5. Rename the root fighter's path to its name
-    6. Delete old fighterPath
-    7. Update .dae file's contents to still point to the updated assets
-    8. Run the script ConvertToXcodeCollada on the .dae file
-    """
-    LOGA(f"Updating fighterType: {fighterType.value}")
-
-    if not os.path.isdir(fighterPath) or not check_path_contains_files_with_type(fighterPath, ".dae"):
-        LOGE(f"Path is invalid: {fighterPath}")
-        return
-    fighter = Fighter(fighterType)
-    newDaeFilePath = None
-    for filePath in os.scandir(fighterPath):
-        fileName = os.path.basename(filePath)
-        fullPath = os.path.join(fighterPath, filePath)
-        if fileName.endswith(".dae"):
-            #1. Update the .dae's name
-            daePath = f"{fighterPath}/{fileName}"
-            newDaeFilePath = f"{fighterPath}/{fighter.fighterType.value}.dae"
-            renamePath(daePath, newDaeFilePath)
-            LOGA(f"Renamed .dae file from {fileName} to {fighter.fighterType.value}.dae")
-        elif fileName == "textures":
-            #2. Update the textures folder to assets
-            newFolderName = os.path.join(fighterPath, "assets")
-            renamePath(fullPath, newFolderName)
-            LOGA(f"Renamed textures to assets {fullPath}")
-    
-    #3. Create an animations folder and more folders for each categories
+def createAnimationFolders(fighterPath):
+    """Creates an animations folder in fighterPath and a folder for each of its categories"""
     animationsPath = f"{fighterPath}/animations"
     createFolder(animationsPath)
     for categories in ANIMATION_CATEGORIES:
         createFolder(f"{animationsPath}/{categories}")
 
-    #4. Update the name of the .png files in assets
+def renameTextureFiles(fighterType, assetsPath):
+    """Renames every .png file in assetsPath like "kimTexture2_Diffuse.png\""""
+    #Listed without the file index, whose copy in a task graph worker process can be older than the folder
+    for filePath in os.scandir(assetsPath):
+        fullPath = filePath.path
+        newPath = f"{assetsPath}/{getTextureNewName(fighterType, filePath)}"
+        renamePath(fullPath, newPath)
+        LOGA(lambda: f"Finished renaming image from {fullPath} to {newPath}")
+
+def generateFighterLods(daePath, fighterPath, ratios, isValidating):
+    """Writes the fighter's LODs next to its .dae, then validates them if isValidating.
+    The settings are passed in since a task graph worker process may not share the main process' settings"""
+    for lodPath in generateDaeLods(daePath, ratios):
+        FILE_INDEX.recordCreation(lodPath)
+        if isValidating:
+            validateDaeFile(lodPath, fighterPath)
+
+def getFighterTasks(fighterType, fighterPath):
+    """Returns the tasks converting the unzipped fighter at fighterPath and the fighter's new path.
+    The textures' steps and the .dae's steps do not depend on each other, and renaming the fighter's folder waits for both:
+    1. Update the .dae's name in fighterPath
+    7. Update .dae file's contents to still point to the updated assets
+    8. Flatten the .dae file's animations like the ConvertToXcodeCollada script, then minify it if MINIFY_DAE is True
+    2. Update the textures folder to assets in fighterPath
+    4. Update the name of the .png files in fighterPath/assets
+    3. Create an animations folder and more folders for each categories
+    8.5 Move the .dae inside the assets folder once 4. and 8. finished
+    8.6 Validate the .dae and its textures if VALIDATE_DAE is True
+    8.7 Generate and validate the .dae's LODs if GENERATE_LODS is True
+    5. Rename the root fighter's path to its name once every other step finished
+    6. Delete old fighterPath
+    """
+    fighter = getFighter(fighterType)
+    groupName = fighterType.value
+    daeFileName = next(name for name in FILE_INDEX.listNames(fighterPath) if name.endswith(".dae"))
+    daePath = f"{fighterPath}/{fighterType.value}.dae"
+    texturesPath = f"{fighterPath}/textures"
     assetsPath = f"{fighterPath}/assets"
-    if exist(assetsPath):
-        for filePath in os.scandir(assetsPath):
-            fullPath = os.path.join(fighterPath, filePath)
-            newName = getTextureNewName(fighterType, filePath)
-            newPath = f"{assetsPath}/{newName}"
-            renamePath(fullPath, newPath)
-            LOGA(f"Finished renaming image from {fullPath} to {newPath}")
+    daeInAssetsPath = f"{assetsPath}/{fighterType.value}.dae"
+    newFighterPath = f"{getFolderFromPath(fighterPath)}/{getNameFromPath(fighterPath).replace(fighter.folderName, fighter.name)}"
+    tasks = [
+        Task("updateFighters 1. Rename .dae", groupName, renamePath, (f"{fighterPath}/{daeFileName}", daePath), movedPath=daePath),
+        Task("updateFighters 7. Update .dae's textures", groupName, updateDaeFile, (fighterType, daePath), ["updateFighters 1. Rename .dae"], inputPath=daePath, outputPath=daePath),
+        Task("updateFighters 8. Flatten .dae", groupName, executeConvertToXcodeColladaWorkflow, (daePath,), ["updateFighters 7. Update .dae's textures"], inputPath=daePath, outputPath=daePath),
+        Task("updateFighters 3. Create animations folders", groupName, createAnimationFolders, (fighterPath,)),
+    ]
+    daeTaskName = "updateFighters 8. Flatten .dae"
+    if MINIFY_DAE:
+        tasks.append(Task("updateFighters 8.1 Minify .dae", groupName, minifyDaeFile, (daePath, FLOAT_PRECISIONS), [daeTaskName], inputPath=daePath, outputPath=daePath))
+        daeTaskName = "updateFighters 8.1 Minify .dae"
+    textureTaskNames = []
+    if FILE_INDEX.isDir(texturesPath):
+        tasks.append(Task("updateFighters 2. Rename textures", groupName, renamePath, (texturesPath, assetsPath), movedPath=assetsPath))
+        textureTaskNames = ["updateFighters 2. Rename textures"]
+    if FILE_INDEX.isDir(texturesPath) or FILE_INDEX.isDir(assetsPath):
+        tasks.append(Task("updateFighters 4. Rename textures' files", groupName, renameTextureFiles, (fighterType, assetsPath), textureTaskNames, movedPath=assetsPath))
+        textureTaskNames = ["updateFighters 4. Rename textures' files"]
     else:
-        print(f"TODO: Handle or manually convert assets for fighter: {fighterType.value}")
-
-    #5. Rename the root fighter's path to its name
-    pathName = getNameFromPath(fighterPath)
-    pathDir = getFolderFromPath(fighterPath)
-    newName = pathName.replace(fighter.folderName, fighter.name)
-    newFighterPath = f"{pathDir}/{newName}"
-    renamePath(fighterPath, newFighterPath)
-
-    #6. Delete old fighterPath
-    deleteAllFromPath(fighterPath)
-
-    #7. Update .dae's file content to correct texture
-    daePath = os.path.join(newFighterPath, f"{fighterType.value}.dae")
-    updateDaeFile(fighterType, daePath)
-
-    #8. Execute ConvertXcodeCollada and delete the unneeded .dae file
-    executeConvertToXcodeColladaWorkflow(daePath)
-
-    #8.5 Move .dae inside assets folder
-    if exist(daePath):
-        LOGD("Moving .dae character to assets folder")
-        daeInAssetsPath = f"{getFolderFromPath(daePath)}/assets/{getNameFromPath(daePath, withExtension=True)}"
-        moveFile(daePath, daeInAssetsPath)
-        daePath = daeInAssetsPath
-    
+        LOGW(f"Not renaming {fighterType.value}'s textures because {fighterPath} has no textures or assets folder. Add its textures to its assets folder manually")
+    tasks += [
+        Task("updateFighters 8.5 Move .dae to assets", groupName, moveFile, (daePath, daeInAssetsPath), [daeTaskName] + textureTaskNames, movedPath=daeInAssetsPath),
+    ]
+    daeTaskName = "updateFighters 8.5 Move .dae to assets"
+    if VALIDATE_DAE:
+        tasks.append(Task("updateFighters 8.6 Validate .dae", groupName, validateDaeFile, (daeInAssetsPath, fighterPath), [daeTaskName], inputPath=daeInAssetsPath))
+        daeTaskName = "updateFighters 8.6 Validate .dae"
+    if GENERATE_LODS:
+        tasks.append(Task("updateFighters 8.7 Generate LODs", groupName, generateFighterLods, (daeInAssetsPath, fighterPath, LOD_RATIOS, VALIDATE_DAE), [daeTaskName], inputPath=daeInAssetsPath))
+        daeTaskName = "updateFighters 8.7 Generate LODs"
+    tasks += [
+        Task("updateFighters 5. Rename fighter's folder", groupName, renamePath, (fighterPath, newFighterPath), [daeTaskName, "updateFighters 3. Create animations folders"], movedPath=newFighterPath),
+        Task("updateFighters 6. Delete old folder", groupName, deleteAllFromPath, (fighterPath,), ["updateFighters 5. Rename fighter's folder"], movedPath=fighterPath),
+    ]
+    return tasks, newFighterPath
+
+def updateFightersConcurrently(fighterPathsDic, jobs):
+    """Converts every unzipped fighter in fighterPathsDic by running their steps from getFighterTasks up to jobs at the same time,
+    so the roster takes about as long as its slowest fighter's steps. A failed step only stops the steps of its fighter.
+    Each step is timed with a ProfileSpan when profiling
+    Returns the new path of each fighter that was converted"""
+    tasks = []
+    newFighterPathsDic = {}
+    for (fighterType, fighterPath) in fighterPathsDic.items():
+        LOGA(lambda: f"Updating fighterType: {fighterType.value}")
+        if not FILE_INDEX.isDir(fighterPath) or not check_path_contains_files_with_type(fighterPath, ".dae"):
+            LOGE(f"Path is invalid: {fighterPath}")
+            continue
+        fighterTasks, newFighterPathsDic[fighterType] = getFighterTasks(fighterType, fighterPath)
+        tasks += fighterTasks
+    results, failedGroups = runTaskGraph(tasks, jobs)
+    #The steps may have moved the fighters' files in worker processes
+    for (fighterType, newFighterPath) in newFighterPathsDic.items():
+        FILE_INDEX.invalidate(fighterPathsDic[fighterType])
+        FILE_INDEX.invalidate(newFighterPath)
+    for fighterType in list(newFighterPathsDic):
+        if fighterType.value in failedGroups:
+            LOGE(f"Failed to convert fighter {fighterType.name} in path {fighterPathsDic[fighterType]}")
+            del newFighterPathsDic[fighterType]
+    return newFighterPathsDic
+
+def updateFighters(fighterType, fighterPath):
+    """Converts the unzipped fighter at fighterPath in this process with the steps from getFighterTasks.
+    Returns the fighter's new path, or None if it failed"""
+    return updateFightersConcurrently({fighterType: fighterPath}, 1).get(fighterType)
+
+def recordConvertedFighters(fighterPathsDic, newFighterPathsDic, manifest):
+    """Optimizes the converted fighters' textures if OPTIMIZE_TEXTURES is True and generates their tiers if GENERATE_TEXTURE_TIERS is True,
+    then records their zip files in the build manifest and their .dae files in the asset catalog"""
+    if OPTIMIZE_TEXTURES and len(newFighterPathsDic) > 0:
+        #Optimize every fighter's textures in one pool before recording their hashes
+        texturePaths = []
+        for newFighterPath in newFighterPathsDic.values():
+            texturePaths += getTexturePaths(f"{newFighterPath}/assets")
+        textureManifest = BuildManifest(TEXTURE_MANIFEST_PATH, isEnabled=manifest.isEnabled)
+        with ProfileSpan("optimizeTextures", f"{len(texturePaths)} textures"):
+            optimizeTextures(texturePaths, TEXTURE_JOBS, textureManifest, TEXTURE_REPORT_PATH)
+    if GENERATE_TEXTURE_TIERS and len(newFighterPathsDic) > 0:
+        #Generated after optimizing, so the tiers are resized from the textures that get recorded
+        tierManifest = BuildManifest(TEXTURE_TIER_BUILD_MANIFEST_PATH, isEnabled=manifest.isEnabled)
+        with ProfileSpan("generateTextureTiers", f"{len(newFighterPathsDic)} fighters"):
+            generateFightersTextureTiers(list(newFighterPathsDic.values()), TEXTURE_JOBS, tierManifest)
+        for newFighterPath in newFighterPathsDic.values():
+            FILE_INDEX.invalidate(f"{newFighterPath}/assets")
+    assetCatalog = AssetCatalog(ASSET_CATALOG_PATH, isEnabled=UPDATE_ASSET_CATALOG)
+    for (fighterType, newFighterPath) in newFighterPathsDic.items():
+        zipPath = f"{fighterPathsDic[fighterType]}.zip"
+        with ProfileSpan("record build cache", fighterType.value, inputPath=zipPath):
+            if exist(zipPath):
+                manifest.record(zipPath, getFighterSettings(fighterType), getFilePathsInFolder(f"{newFighterPath}/assets"))
+        with ProfileSpan("update asset catalog", fighterType.value, inputPath=f"{newFighterPath}/assets"):
+            assetCatalog.updateFighter(newFighterPath)
+    manifest.save()
+    assetCatalog.save()
+
+def convertFighterZip(zipPath, isProfiling = False):
+    """Unzips and converts a downloaded fighter's zip file in a --watch worker process.
+    Returns the fighter's new path, the error message if it failed, and the spans recorded while converting it if isProfiling"""
+    setProfiling(isProfiling)
+    #Forked worker processes start with a copy of the main process' spans
+    spanCount = len(SPANS)
+    fighterType = getFighterTypeFromPath(zipPath)
+    unzippedPath = f"{getFolderFromPath(zipPath)}/{getNameFromPath(zipPath)}"
+    try:
+        with ProfileSpan("getFighterPaths unzip", fighterType.value, inputPath=zipPath, outputPath=unzippedPath):
+            unzipFile(zipPath)
+        newFighterPath = updateFighters(fighterType, unzippedPath)
+        if newFighterPath is None:
+            return None, f"Failed to convert {zipPath}", popSpans(spanCount)
+        return newFighterPath, None, popSpans(spanCount)
+    except SystemExit:
+        return None, f"Failed to convert {zipPath}", popSpans(spanCount)
+    except Exception as e:
+        return None, f"Failed to convert {zipPath}. Reason: {e}", popSpans(spanCount)
+    finally:
+        #Worker processes exit without flushing their buffered logs
+        flushLogs()
+
+def watchFighters(fromPath, jobs, manifest):
+    """Converts each fighter's zip file as soon as it finishes downloading into fromPath, until interrupted with Ctrl+C.
+    Zip files that are up to date in the manifest are skipped. Returns the number of converted fighters and a dictionary of failed paths and their errors"""
+    convertedPaths = []
+    failedPaths = {}
+    def shouldConvert(zipPath):
+        return not manifest.isUpToDate(zipPath, getFighterSettings(getFighterTypeFromPath(zipPath)))
+    def onConverted(zipPath, result):
+        newFighterPath, error, spans = result
+        SPANS.extend(spans)
+        if error is not None:
+            LOGE(error)
+            failedPaths[zipPath] = error
+            return
+        fighterType = getFighterTypeFromPath(zipPath)
+        recordConvertedFighters({fighterType: os.path.splitext(zipPath)[0]}, {fighterType: newFighterPath}, manifest)
+        convertedPaths.append(zipPath)
+        LOG(f"Finished converting downloaded {zipPath} into {newFighterPath}")
+    convert = functools.partial(convertFighterZip, isProfiling=isProfilingEnabled())
+    watchAndConvert(FolderWatcher(lambda: getFighterZipPaths(fromPath)), convert, onConverted, jobs, shouldConvert)
+    return len(convertedPaths), failedPaths
+
 #----------------------------------------------------------------------------------------------------------------
 #################################################### Main #######################################################
 #----------------------------------------------------------------------------------------------------------------
 if __name__ == "__main__":
     """
-    Must have ConvertToXcodeCollada in Desktop/StreamCodes/scripts/ConvertToXcodeCollada/ConvertToXcodeCollada.workflow
+    Execute by
+    1. Pass the folder containing the downloaded zip files, which defaults to the Downloads folder
+        python3 "mixamoToXcode.py" <optional_directory_path>
+    2. Pass --force to convert zip files even if the build manifest shows they did not change
+    3. Pass --profile to log how long each step took for each fighter, --trace path to also write the steps as trace events
+       that chrome://tracing or https://ui.perfetto.dev can open, and --cprofile path to write cProfile stats
+    4. Pass --log-json path to also append every log to path as json lines
+    5. Pass --jobs N to run up to N of the fighters' steps at the same time instead of FIGHTER_JOBS
+    6. Pass --watch to keep running and convert each fighter's zip file as soon as it finishes downloading, 
+       using up to FIGHTER_JOBS or --jobs N processes, until stopped with Ctrl+C
+        e.g. python3 "mixamoToXcode.py" --watch --jobs 4
+    7. Set DEDUPE_ASSETS to True to list the duplicated animations and textures of CHARACTERS_PATH in DEDUPE_REPORT_PATH
+    8. Set VALIDATE_DAE to False to skip checking each converted .dae and its textures for corruptions, which fails only that fighter
+    9. Set GENERATE_LODS to True to also write each fighter's simplified <fighter>_lod1.dae, <fighter>_lod2.dae... for LOD_RATIOS
+    10. Set GENERATE_TEXTURE_TIERS to True to also write half and quarter size variants of each fighter's textures and their textureTiers.json
     """
+    setLogOptions()
+    tracePath, cProfilePath, profiler = getProfilingOptions()
+    manifest = getBuildManifest()
+    isWatching = popArgument("--watch") is not None
+    jobs = popArgument("--jobs", hasValue=True)
+    jobs = FIGHTER_JOBS if jobs is None else int(jobs)
     pathToConvert = getPathToConvert()
-    fighterPathsDic = getFighterPaths(pathToConvert)
-    for (index, (fighterType, fighterPath)) in enumerate(fighterPathsDic.items()):
-        updateFighters(fighterType, fighterPath)
-        LOGA(f"Finished converting fighter#{index+1} in path {fighterPath} to {fighterType.name}")
-    
-    LOG(f"RESULT: Total converted paths in <{pathToConvert}> is {len(fighterPathsDic)}")
+    if isWatching:
+        convertedCount, failedPaths = watchFighters(pathToConvert, jobs, manifest)
+    else:
+        fighterPathsDic = getFighterPaths(pathToConvert, manifest)
+        newFighterPathsDic = updateFightersConcurrently(fighterPathsDic, jobs)
+        recordConvertedFighters(fighterPathsDic, newFighterPathsDic, manifest)
+        if DEDUPE_ASSETS and len(newFighterPathsDic) > 0:
+            with ProfileSpan("dedupe assets", f"{len(newFighterPathsDic)} fighters"):
+                dedupeAssets(CHARACTERS_PATH, DEDUPE_REPORT_PATH, DEDUPE_HARD_LINKS)
+        convertedCount = len(newFighterPathsDic)
+        failedPaths = {fighterPath: "Failed to convert" for (fighterType, fighterPath) in fighterPathsDic.items() if not fighterType in newFighterPathsDic}
+    finishProfiling(tracePath, cProfilePath, profiler)
+    LOG(f"RESULT: Total converted paths in <{pathToConvert}> is {convertedCount}")
+    if len(failedPaths) > 0:
+        sys.exit(1)
     LOG(f"✅✅✅")
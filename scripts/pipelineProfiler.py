@@ -0,0 +1,144 @@
+# Timing spans around each step of the scripts, recording the wall time, bytes read and written, and number of files of every fighter and clip
+
+import cProfile
+import json
+import os
+import time
+
+from Logger import *
+from daeHelpers import writeLinesAtomically
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+IS_PROFILING = False #Set with setProfiling. Worker processes need it passed explicitly
+SPANS = [] #Every recorded span of this process
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def setProfiling(isProfiling):
+    global IS_PROFILING
+    IS_PROFILING = isProfiling
+
+def isProfilingEnabled():
+    return IS_PROFILING
+
+def popSpans(startIndex = 0):
+    """Returns and removes the spans recorded in this process since there were startIndex spans,
+    e.g. to send them from a worker process to the main process"""
+    spans = SPANS[startIndex:]
+    del SPANS[startIndex:]
+    return spans
+
+def getPathSizeAndFileCount(path):
+    """Returns the size of the file at path or of every file in the folder at path, and the number of files"""
+    if path is None or not os.path.exists(path):
+        return 0, 0
+    if os.path.isfile(path):
+        return os.path.getsize(path), 1
+    size = 0
+    fileCount = 0
+    for root, dirs, files in os.walk(path):
+        for file in files:
+            size += os.path.getsize(os.path.join(root, file))
+            fileCount += 1
+    return size, fileCount
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+class ProfileSpan:
+    """Records how long its with block took for itemName, with the size of inputPath before the block
+    and the size and file count of outputPath after it. outputPath can be set inside the block once it is known.
+    Files that are only moved are passed as movedPath, which counts them without counting their bytes"""
+    def __init__(self, stageName, itemName, inputPath = None, outputPath = None, movedPath = None):
+        self.stageName = stageName
+        self.itemName = itemName
+        self.inputPath = inputPath
+        self.outputPath = outputPath
+        self.movedPath = movedPath
+
+    def __enter__(self):
+        if IS_PROFILING:
+            self.bytesRead, _ = getPathSizeAndFileCount(self.inputPath)
+            self.startTime = time.time()
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exceptionType, exception, traceback):
+        if not IS_PROFILING:
+            return False
+        duration = time.perf_counter() - self.start
+        bytesWritten, fileCount = getPathSizeAndFileCount(self.outputPath)
+        fileCount += getPathSizeAndFileCount(self.movedPath)[1]
+        SPANS.append({
+            "stage": self.stageName,
+            "item": self.itemName,
+            "startTime": self.startTime,
+            "duration": duration,
+            "bytesRead": self.bytesRead,
+            "bytesWritten": bytesWritten,
+            "fileCount": fileCount,
+            "pid": os.getpid(),
+            "failed": exceptionType is not None,
+        })
+        return False
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def getProfileSummary(spans):
+    """Returns a table of each stage's number of spans, total and mean seconds, bytes read and written, and files, slowest stage first"""
+    stages = {}
+    for span in spans:
+        stage = stages.setdefault(span["stage"], {"count": 0, "duration": 0, "bytesRead": 0, "bytesWritten": 0, "fileCount": 0})
+        stage["count"] += 1
+        for key in ["duration", "bytesRead", "bytesWritten", "fileCount"]:
+            stage[key] += span[key]
+    totalDuration = sum(stage["duration"] for stage in stages.values()) or 1
+    lines = [f"{'STAGE':<44} {'COUNT':>6} {'TOTAL(s)':>10} {'MEAN(s)':>9} {'%':>6} {'READ(MB)':>10} {'WRITTEN(MB)':>12} {'FILES':>7}"]
+    for (stageName, stage) in sorted(stages.items(), key=lambda item: item[1]["duration"], reverse=True):
+        lines.append(f"{stageName:<44} {stage['count']:>6} {stage['duration']:>10.3f} {stage['duration'] / stage['count']:>9.3f} {stage['duration'] / totalDuration:>6.1%} "
+                     f"{stage['bytesRead'] / 1e6:>10.2f} {stage['bytesWritten'] / 1e6:>12.2f} {stage['fileCount']:>7}")
+    return "\n".join(lines)
+
+def writeTraceEvents(spans, tracePath):
+    """Writes the spans in the Trace Event Format, which chrome://tracing and https://ui.perfetto.dev can open"""
+    startTime = min([span["startTime"] for span in spans], default=0)
+    traceEvents = [{
+        "name": span["stage"],
+        "cat": "pipeline",
+        "ph": "X",
+        "ts": int((span["startTime"] - startTime) * 1e6),
+        "dur": int(span["duration"] * 1e6),
+        "pid": span["pid"],
+        "tid": span["pid"],
+        "args": {key: span[key] for key in ["item", "bytesRead", "bytesWritten", "fileCount", "failed"]},
+    } for span in spans]
+    writeLinesAtomically([json.dumps({"traceEvents": traceEvents}).encode("utf-8")], tracePath)
+    LOG(f"Wrote {len(traceEvents)} trace events to {tracePath}")
+
+def startProfiling(isProfiling, cProfilePath = None):
+    """Starts recording spans if isProfiling, and every function call with cProfile if cProfilePath is passed.
+    Returns the running cProfile.Profile or None"""
+    setProfiling(isProfiling or cProfilePath is not None)
+    if cProfilePath is None:
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def finishProfiling(tracePath = None, cProfilePath = None, profiler = None):
+    """Logs the summary of every span, then writes the trace events and the cProfile's stats if their paths were passed"""
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(cProfilePath)
+        LOG(f"Wrote cProfile stats of the main process to {cProfilePath}")
+    if not IS_PROFILING:
+        return
+    LOG(f"Profile of {len(SPANS)} spans:\n{getProfileSummary(SPANS)}")
+    if tracePath is not None:
+        writeTraceEvents(SPANS, tracePath)
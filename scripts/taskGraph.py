@@ -0,0 +1,110 @@
+# Runs tasks as soon as the tasks they depend on finished, using up to a number of processes at the same time.
+# Tasks are grouped, e.g. by fighter, so a failed task only cancels the tasks of its own group
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from Logger import *
+from pipelineProfiler import *
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Objects ####################################################
+#----------------------------------------------------------------------------------------------------------------
+
+class Task:
+    """A step of a group calling function(*args) once every task named in dependencies finished.
+    inputPath is what the step reads, outputPath what it writes and movedPath what it only moves, which are recorded in its ProfileSpan.
+    function must be picklable, e.g. a module level function"""
+    def __init__(self, name, groupName, function, args = (), dependencies = [], inputPath = None, outputPath = None, movedPath = None):
+        self.name = name
+        self.groupName = groupName
+        self.function = function
+        self.args = args
+        self.dependencies = dependencies
+        self.inputPath = inputPath
+        self.outputPath = outputPath
+        self.movedPath = movedPath
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def getTaskId(task):
+    return (task.groupName, task.name)
+
+def runTask(task, isProfiling = False):
+    """Runs the task, in a worker process when there is more than 1 job.
+    Returns the task's result, its error message if it failed, and the spans recorded while running it if isProfiling"""
+    setProfiling(isProfiling)
+    #Forked worker processes start with a copy of the main process' spans
+    spanCount = len(SPANS)
+    try:
+        with ProfileSpan(task.name, task.groupName, inputPath=task.inputPath, outputPath=task.outputPath, movedPath=task.movedPath):
+            result = task.function(*task.args)
+        return result, None, popSpans(spanCount)
+    except SystemExit:
+        return None, f"{task.name} failed for {task.groupName}", popSpans(spanCount)
+    except Exception as e:
+        return None, f"{task.name} failed for {task.groupName}. Reason: {e}", popSpans(spanCount)
+    finally:
+        #Worker processes exit without flushing their buffered logs
+        flushLogs()
+
+def getTasksByDependencies(tasks):
+    """Returns each task's id to the tasks depending on it, and each task's id to its number of unfinished dependencies"""
+    tasksById = {getTaskId(task): task for task in tasks}
+    dependentTasksDic = {taskId: [] for taskId in tasksById}
+    dependencyCounts = {}
+    for task in tasks:
+        dependencyIds = [(task.groupName, dependency) for dependency in task.dependencies]
+        for dependencyId in dependencyIds:
+            if not dependencyId in tasksById:
+                raise ValueError(f"{task.name} of {task.groupName} depends on the missing task {dependencyId[1]}")
+            dependentTasksDic[dependencyId].append(task)
+        dependencyCounts[getTaskId(task)] = len(dependencyIds)
+    return dependentTasksDic, dependencyCounts
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def runTaskGraph(tasks, jobs):
+    """Runs every task once its dependencies finished, up to jobs at the same time, in worker processes if jobs is more than 1.
+    When a task fails, the tasks of its group that did not start yet are cancelled while the other groups keep running.
+    Returns each task's result keyed by its group and name, and each failed group's error message"""
+    dependentTasksDic, dependencyCounts = getTasksByDependencies(tasks)
+    readyTasks = [task for task in tasks if dependencyCounts[getTaskId(task)] == 0]
+    results = {}
+    failedGroups = {}
+    isProfiling = isProfilingEnabled()
+    def finishTask(task, result):
+        value, error, spans = result
+        SPANS.extend(spans)
+        if error is not None:
+            LOGE(error)
+            failedGroups.setdefault(task.groupName, error)
+            return
+        results[getTaskId(task)] = value
+        LOGA(lambda: f"Finished {task.name} for {task.groupName}")
+        for dependentTask in dependentTasksDic[getTaskId(task)]:
+            dependencyCounts[getTaskId(dependentTask)] -= 1
+            if dependencyCounts[getTaskId(dependentTask)] == 0:
+                readyTasks.append(dependentTask)
+    def popReadyTasks():
+        #Tasks of a failed group are never started
+        tasksToRun = [task for task in readyTasks if not task.groupName in failedGroups]
+        readyTasks.clear()
+        return tasksToRun
+    if jobs <= 1:
+        while len(readyTasks) > 0:
+            for task in popReadyTasks():
+                finishTask(task, runTask(task, isProfiling))
+        return results, failedGroups
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        runningTasks = {}
+        while True:
+            for task in popReadyTasks():
+                runningTasks[executor.submit(runTask, task, isProfiling)] = task
+            if len(runningTasks) == 0:
+                break
+            doneFutures, _ = wait(runningTasks, return_when=FIRST_COMPLETED)
+            for future in doneFutures:
+                finishTask(runningTasks.pop(future), future.result())
+    return results, failedGroups
@@ -0,0 +1,16 @@
+# The scripts import each other by module name, so the tests import them from the scripts folder the same way
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Logger import flushLogs
+
+@pytest.fixture(autouse=True)
+def flushBufferedLogs():
+    """Writes each test's buffered logs while pytest still captures them, instead of at exit once the captured output is closed"""
+    yield
+    flushLogs()
@@ -0,0 +1,149 @@
+import os
+import struct
+import xml.etree.ElementTree as ET
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from animationPack import CLIP_ALIGNMENT, CLIP_ENTRY_STRUCT, HEADER_STRUCT, JOINT_ENTRY_STRUCT, AnimationPack, buildAnimationPack
+
+COLLADA_NAMESPACES = {"c": "http://www.collada.org/2005/11/COLLADASchema"}
+
+#Each clip's joints and their (time, translation) keyframes, written as flattened .dae files like the converted animations
+CLIPS = {
+    "idle/idleFight": {
+        "mixamorig_Hips": [(0.0, (0.0, 100.0, 0.0)), (0.033333, (0.5, 100.25, -0.125)), (0.066667, (1.0, 100.5, -0.25))],
+        "mixamorig_LeftHand": [(0.0, (12.345678, 1.0, 2.0)), (0.066667, (12.0, 1.5, 2.5))],
+    },
+    "punch/jab": {
+        "mixamorig_RightHand": [(0.0, (-3.0, 2.0, 1.0)), (0.1, (-3.5, 2.5, 9.876543)), (0.2, (-4.0, 3.0, 1.0)), (0.3, (-4.5, 3.5, 1.0))],
+    },
+}
+
+def getTransform(translation, index):
+    """Returns a row-major 4x4 matrix rotated a little more at each keyframe, so every value of a joint's keyframes differs"""
+    angle = 0.1 * (index + 1)
+    return [np.cos(angle), -np.sin(angle), 0, translation[0], np.sin(angle), np.cos(angle), 0, translation[1], 0, 0, 1, translation[2], 0, 0, 0, 1]
+
+def formatValues(values):
+    return " ".join(f"{value:.6f}" for value in values)
+
+def writeFlattenedDae(daePath, joints):
+    animations = []
+    for (jointName, keyframes) in joints.items():
+        times = [time for (time, _) in keyframes]
+        transforms = [value for (index, (_, translation)) in enumerate(keyframes) for value in getTransform(translation, index)]
+        animations.append(f"""
+      <source id="{jointName}-input"><float_array id="{jointName}-input-array" count="{len(times)}">{formatValues(times)}</float_array>
+        <technique_common><accessor source="#{jointName}-input-array" count="{len(times)}"><param name="TIME" type="float"/></accessor></technique_common></source>
+      <source id="{jointName}-output"><float_array id="{jointName}-output-array" count="{len(transforms)}">{formatValues(transforms)}</float_array>
+        <technique_common><accessor source="#{jointName}-output-array" count="{len(times)}" stride="16"><param name="TRANSFORM" type="float4x4"/></accessor></technique_common></source>
+      <source id="{jointName}-interpolation"><Name_array id="{jointName}-interpolation-array" count="{len(times)}">{" ".join(["LINEAR"] * len(times))}</Name_array>
+        <technique_common><accessor source="#{jointName}-interpolation-array" count="{len(times)}"><param name="INTERPOLATION" type="name"/></accessor></technique_common></source>
+      <sampler id="{jointName}-sampler">
+        <input semantic="INPUT" source="#{jointName}-input"/>
+        <input semantic="OUTPUT" source="#{jointName}-output"/>
+        <input semantic="INTERPOLATION" source="#{jointName}-interpolation"/>
+      </sampler>
+      <channel source="#{jointName}-sampler" target="{jointName}/transform"/>""")
+    os.makedirs(os.path.dirname(daePath), exist_ok=True)
+    with open(daePath, "w") as file:
+        file.write(f"""<?xml version="1.0" encoding="utf-8"?>
+<COLLADA xmlns="{COLLADA_NAMESPACES['c']}" version="1.4.1">
+  <library_animations>
+    <animation>{"".join(animations)}
+    </animation>
+  </library_animations>
+</COLLADA>
+""")
+
+def readDaeKeyframes(daePath):
+    """Returns each joint's float32 times and 4x4 transforms parsed straight from the .dae's XML"""
+    root = ET.parse(daePath).getroot()
+    arrays = {floatArray.get("id"): floatArray.text.split() for floatArray in root.iterfind(".//c:float_array", COLLADA_NAMESPACES)}
+    keyframes = {}
+    for channel in root.iterfind(".//c:channel", COLLADA_NAMESPACES):
+        jointName = channel.get("target").split("/")[0]
+        times = np.array(arrays[f"{jointName}-input-array"], dtype="<f4")
+        transforms = np.array(arrays[f"{jointName}-output-array"], dtype="<f4").reshape(-1, 16)
+        keyframes[jointName] = (times, transforms)
+    return keyframes
+
+def readPackIndex(packPath):
+    """Returns the pack's bytes and each clip's index entry, unpacked without the pack reader"""
+    with open(packPath, "rb") as file:
+        data = file.read()
+    magic, version, clipCount = HEADER_STRUCT.unpack_from(data, 0)
+    assert magic == b"FUCLIPS\0"
+    entries = {}
+    for index in range(clipCount):
+        name, offset, length, jointCount, keyframeCount, duration, reserved = CLIP_ENTRY_STRUCT.unpack_from(data, HEADER_STRUCT.size + index * CLIP_ENTRY_STRUCT.size)
+        entries[name.rstrip(b"\0").decode("utf-8")] = (offset, length, jointCount, keyframeCount, duration)
+    return data, entries
+
+@pytest.fixture
+def packPaths(tmp_path):
+    animationsPath = str(tmp_path / "Kim" / "animations")
+    for (clipName, joints) in CLIPS.items():
+        writeFlattenedDae(os.path.join(animationsPath, f"{clipName}.dae"), joints)
+    return buildAnimationPack(animationsPath), animationsPath
+
+def test_buildAnimationPack_indexesEveryClip(packPaths):
+    packPath, animationsPath = packPaths
+    data, entries = readPackIndex(packPath)
+    assert sorted(entries) == sorted(CLIPS)
+    for (clipName, joints) in CLIPS.items():
+        offset, length, jointCount, keyframeCount, duration = entries[clipName]
+        assert offset % CLIP_ALIGNMENT == 0
+        assert jointCount == len(joints)
+        assert keyframeCount == max(len(keyframes) for keyframes in joints.values())
+        assert duration == pytest.approx(max(keyframes[-1][0] for keyframes in joints.values()), abs=1e-6)
+        keyframesLength = sum(len(keyframes) * (4 + 16 * 4) for keyframes in joints.values())
+        assert length == jointCount * JOINT_ENTRY_STRUCT.size + keyframesLength
+        assert offset + length <= len(data)
+
+def test_buildAnimationPack_storesDaeKeyframes(packPaths):
+    packPath, animationsPath = packPaths
+    data, entries = readPackIndex(packPath)
+    for clipName in CLIPS:
+        offset = entries[clipName][0]
+        daeKeyframes = readDaeKeyframes(os.path.join(animationsPath, f"{clipName}.dae"))
+        for index in range(entries[clipName][2]):
+            name, keyframeCount, timesOffset, transformsOffset, reserved = JOINT_ENTRY_STRUCT.unpack_from(data, offset + index * JOINT_ENTRY_STRUCT.size)
+            times, transforms = daeKeyframes[name.rstrip(b"\0").decode("utf-8")]
+            assert keyframeCount == times.shape[0]
+            assert np.array_equal(np.frombuffer(data, dtype="<f4", count=keyframeCount, offset=offset + timesOffset), times)
+            assert np.array_equal(np.frombuffer(data, dtype="<f4", count=keyframeCount * 16, offset=offset + transformsOffset).reshape(-1, 16), transforms)
+
+def test_animationPack_readsSameKeyframesFromMmap(packPaths):
+    packPath, animationsPath = packPaths
+    animationPack = AnimationPack(packPath)
+    data, entries = readPackIndex(packPath)
+    for clipName in CLIPS:
+        offset, length, jointCount, keyframeCount, duration = entries[clipName]
+        clip = animationPack.clips[clipName]
+        assert (clip["offset"], clip["length"], clip["jointCount"], clip["keyframeCount"], clip["duration"]) == (offset, length, jointCount, keyframeCount, duration)
+        daeKeyframes = readDaeKeyframes(os.path.join(animationsPath, f"{clipName}.dae"))
+        joints = animationPack.getClip(clipName)
+        assert sorted(joints) == sorted(daeKeyframes)
+        for (jointName, (times, transforms)) in joints.items():
+            #Views of the memory-mapped pack rather than copies
+            assert not times.flags.owndata and not transforms.flags.owndata
+            assert np.array_equal(times, daeKeyframes[jointName][0])
+            assert np.array_equal(transforms, daeKeyframes[jointName][1])
+
+def test_buildAnimationPack_skipsResourceForksAndUnparseableClips(tmp_path):
+    animationsPath = str(tmp_path / "Kim" / "animations")
+    writeFlattenedDae(os.path.join(animationsPath, "idle", "idleFight.dae"), CLIPS["idle/idleFight"])
+    #Resource forks Mixamo zips carry next to their .dae, which are not XML
+    for forkPath in [os.path.join(animationsPath, "idle", "__MACOSX", "._idleFight.dae"), os.path.join(animationsPath, "idle", "._idleFight.dae")]:
+        os.makedirs(os.path.dirname(forkPath), exist_ok=True)
+        with open(forkPath, "wb") as file:
+            file.write(b"\x00\x05\x16\x07")
+    with open(os.path.join(animationsPath, "idle", "truncated.dae"), "w") as file:
+        file.write("<COLLADA><library_animations>")
+    packPath = buildAnimationPack(animationsPath)
+    data, entries = readPackIndex(packPath)
+    assert sorted(entries) == ["idle/idleFight"]
+    assert sorted(AnimationPack(packPath).getClip("idle/idleFight")) == sorted(CLIPS["idle/idleFight"])
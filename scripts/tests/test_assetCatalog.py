@@ -0,0 +1,26 @@
+from assetCatalog import getDaeMetadata
+
+def test_getDaeMetadata_readsKeyframesOfEverySource(tmp_path):
+    daePath = tmp_path / "idleFight.dae"
+    daePath.write_text("""<?xml version="1.0" encoding="utf-8"?>
+<COLLADA xmlns="http://www.collada.org/2005/11/COLLADASchema" version="1.4.1">
+  <library_animations>
+    <animation>
+      <source id="hips-input"><float_array id="hips-input-array" count="3">0 0.033333 0.066667</float_array>
+        <technique_common><accessor source="#hips-input-array" count="3"><param name="TIME" type="float"/></accessor></technique_common></source>
+      <source id="hips-output"><float_array id="hips-output-array" count="2">5 6</float_array>
+        <technique_common><accessor source="#hips-output-array" count="2"><param name="X" type="float"/></accessor></technique_common></source>
+      <source id="hand-input"><float_array id="hand-input-array" count="4">0 0.1 0.2 0.3</float_array>
+        <technique_common><accessor source="#hand-input-array" count="4"><param name="TIME" type="float"/></accessor></technique_common></source>
+    </animation>
+  </library_animations>
+  <library_visual_scenes>
+    <visual_scene id="scene">
+      <node id="hips" type="JOINT"><node id="hand" type="JOINT"/></node>
+      <node id="mesh" type="NODE"/>
+    </visual_scene>
+  </library_visual_scenes>
+</COLLADA>
+""")
+    metadata = getDaeMetadata(str(daePath))
+    assert metadata == {"duration": 0.3, "frameCount": 4, "jointCount": 2, "size": daePath.stat().st_size}
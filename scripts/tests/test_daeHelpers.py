@@ -0,0 +1,56 @@
+from daeHelpers import minifyDaeLines, replaceInChunks, replaceInFile
+
+PRECISIONS = {"transform": 5, "time": 2, "uv": 5, "default": 3}
+
+def minify(chunks):
+    counter = {"bytesRead": 0, "bytesWritten": 0}
+    minifiedData = b"".join(minifyDaeLines(chunks, PRECISIONS, counter))
+    assert counter["bytesRead"] == sum(len(chunk) for chunk in chunks)
+    assert counter["bytesWritten"] == len(minifiedData)
+    return minifiedData
+
+def test_minifyDaeLines_keepsMarkupAfterSelfClosingFloatArray():
+    daeData = b"""    <source id="x-output">
+      <float_array id="x-output-array" count="0"/>
+    </source>
+    <node id="hips" name="hips" type="JOINT"><float_array id="y-array" count="1">1.23456</float_array></node>
+"""
+    assert minify([daeData]) == b"""<source id="x-output">
+<float_array id="x-output-array" count="0"/>
+</source>
+<node id="hips" name="hips" type="JOINT"><float_array id="y-array" count="1">1.235</float_array></node>
+"""
+
+def test_minifyDaeLines_formatsFloatArraySplitAcrossChunksAndLines():
+    daeData = b"""  <float_array id="hips-animation-input-array" count="5">0.000000 0.033333
+    0.066667 0.100000
+    0.133333</float_array>
+  <!-- 1.987654 --><float_array id="hips-array" count="2">1.987654 -0.000001</float_array>
+"""
+    expectedData = b"""<float_array id="hips-animation-input-array" count="5">0 0.03
+0.07 0.1
+0.13</float_array>
+<float_array id="hips-array" count="2">1.988 0</float_array>
+"""
+    assert minify([daeData]) == expectedData
+    #Every split point, including the middle of a number, a tag and a comment
+    for index in range(1, len(daeData)):
+        assert minify([daeData[:index], daeData[index:]]) == expectedData
+    assert minify([daeData[index:index + 3] for index in range(0, len(daeData), 3)]) == expectedData
+
+def test_replaceInChunks_replacesMatchesAcrossChunkBoundaries():
+    #The second match follows a partial match, which must not hide it when both span a boundary
+    data = b'<init_from>textures/Ch02_1001_Diffuse.png</init_from><init_from>textures/Ch0textures/Ch02_1002_Normal.png</init_from>'
+    expectedData = b'<init_from>assets/kimTexture_1001_Diffuse.png</init_from><init_from>textures/Ch0assets/kimTexture_1002_Normal.png</init_from>'
+    for chunkSize in range(1, len(data) + 1):
+        counter = {"count": 0}
+        chunks = [data[index:index + chunkSize] for index in range(0, len(data), chunkSize)]
+        assert b"".join(replaceInChunks(chunks, b"textures/Ch02", b"assets/kimTexture", counter)) == expectedData
+        assert counter["count"] == 2
+
+def test_replaceInFile_replacesMatchesAcrossChunkBoundaries(tmp_path):
+    daePath = tmp_path / "kim.dae"
+    daePath.write_bytes(b"<init_from>textures/Ch02_1001_Diffuse.png</init_from>\n" * 3)
+    #Chunks of 16 bytes split the first and last matches
+    assert replaceInFile(str(daePath), "textures/Ch02", "assets/kimTexture", chunkSize=16) == 3
+    assert daePath.read_bytes() == b"<init_from>assets/kimTexture_1001_Diffuse.png</init_from>\n" * 3
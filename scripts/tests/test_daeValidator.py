@@ -0,0 +1,44 @@
+import os
+
+from daeValidator import getDaeErrors
+
+def writeDae(daePath, body):
+    with open(daePath, "w") as file:
+        file.write(f"""<?xml version="1.0" encoding="utf-8"?>
+<COLLADA xmlns="http://www.collada.org/2005/11/COLLADASchema" version="1.4.1">{body}</COLLADA>
+""")
+
+def test_getDaeErrors_checksElementsByTheirParents(tmp_path):
+    fighterPath = tmp_path / "Kim"
+    os.makedirs(fighterPath / "assets")
+    (fighterPath / "assets" / "kimTexture2_Diffuse.png").write_bytes(b"")
+    daePath = str(fighterPath / "assets" / "kim.dae")
+    writeDae(daePath, """
+  <library_images>
+    <image id="diffuse"><init_from>assets/kimTexture2_Diffuse.png</init_from></image>
+    <image id="normal"><init_from>assets/kimTexture2_Normal.png</init_from></image>
+  </library_images>
+  <library_animations>
+    <animation><animation id="nested"/></animation>
+  </library_animations>""")
+    errors = getDaeErrors(daePath, str(fighterPath))
+    assert len(errors) == 2
+    assert "kimTexture2_Normal.png" in errors[0]
+    assert "nested is nested in animation" in errors[1]
+
+def test_getDaeErrors_resolvesReferencesToRemovedElements(tmp_path):
+    daePath = str(tmp_path / "idleFight.dae")
+    writeDae(daePath, """
+  <library_animations>
+    <animation>
+      <source id="hips-input"><float_array id="hips-input-array" count="2">0 0.033333</float_array></source>
+      <source id="hips-output"><float_array id="hips-output-array" count="3">1 2</float_array></source>
+      <sampler id="hips-sampler"><input semantic="INPUT" source="#hips-input"/><input semantic="OUTPUT" source="#hips-missing"/></sampler>
+      <channel source="#hips-sampler" target="hips/transform"/>
+    </animation>
+  </library_animations>
+  <library_visual_scenes><visual_scene id="scene"><node id="hips"/></visual_scene></library_visual_scenes>""")
+    errors = getDaeErrors(daePath)
+    assert len(errors) == 2
+    assert "hips-output-array has count 3 but contains 2 floats" in errors[0]
+    assert "points to the missing id hips-missing" in errors[1]
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from filesRenamer import JOURNAL_NAME, apply_renames, plan_renames, replace_filenames_in_directory, undo_renames
+
+FILES_RENAMER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "filesRenamer.py")
+
+def write_files(directory, contentsByPath):
+    for (path, contents) in contentsByPath.items():
+        filePath = os.path.join(directory, path)
+        os.makedirs(os.path.dirname(filePath), exist_ok=True)
+        with open(filePath, "w") as file:
+            file.write(contents)
+
+def read_files(directory):
+    """Returns the contents of every file in directory keyed by their path relative to it"""
+    contentsByPath = {}
+    for (root, dirs, files) in os.walk(directory):
+        for filename in files:
+            with open(os.path.join(root, filename), "r") as file:
+                contentsByPath[os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, "/")] = file.read()
+    return contentsByPath
+
+def test_plan_renames_swapsCyclesThroughTemporaryNames(tmp_path):
+    directory = str(tmp_path / "textures")
+    write_files(directory, {"a.png": "a", "b.png": "b", "c.png": "c", "d.png": "d", "e.png": "e"})
+    journalPath = str(tmp_path / JOURNAL_NAME)
+    #a->b->a and c->d->e->c
+    steps, collisions = plan_renames([(directory, "a.png", "b.png"), (directory, "b.png", "a.png"),
+                                      (directory, "c.png", "d.png"), (directory, "d.png", "e.png"), (directory, "e.png", "c.png")])
+    assert collisions == []
+    assert apply_renames(steps, journalPath) == len(steps)
+    assert read_files(directory) == {"b.png": "a", "a.png": "b", "d.png": "c", "e.png": "d", "c.png": "e"}
+    assert undo_renames(journalPath) == 0
+    assert read_files(directory) == {"a.png": "a", "b.png": "b", "c.png": "c", "d.png": "d", "e.png": "e"}
+    assert not os.path.exists(journalPath)
+
+def test_plan_renames_findsCaseInsensitiveCollisions(tmp_path):
+    directory = str(tmp_path / "textures")
+    write_files(directory, {"a.png": "a", "c.png": "c"})
+    steps, collisions = plan_renames([(directory, "a.png", "B.png"), (directory, "c.png", "b.png")])
+    assert len(collisions) == 1
+    assert "would all be renamed to" in collisions[0]
+
+def test_replace_filenames_in_directory_renamesNothingOnCollision(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    directory = str(tmp_path / "textures")
+    files = {"Ch02_1001_Diffuse.png": "mixamo diffuse", "Ch02_1001_Normal.png": "normal", "kim_1001_Diffuse.png": "kim diffuse"}
+    write_files(directory, files)
+    with pytest.raises(SystemExit):
+        replace_filenames_in_directory(directory, "Ch02", "kim")
+    assert read_files(directory) == files
+    assert not os.path.exists(tmp_path / JOURNAL_NAME)
+
+def test_replace_filenames_in_directory_renamesFoldersAfterTheirFiles(tmp_path):
+    directory = str(tmp_path / "Characters")
+    files = {"Ch02/Ch02_1001_Diffuse.png": "diffuse", "Ch02/animations/Ch02_idle.dae": "idle", "Ch02.dae": "character", "other.txt": "other"}
+    write_files(directory, files)
+    journalPath = str(tmp_path / JOURNAL_NAME)
+    assert replace_filenames_in_directory(directory, "Ch02", "kim", isRecursive=True, journalPath=journalPath) == 4
+    assert read_files(directory) == {"kim/kim_1001_Diffuse.png": "diffuse", "kim/animations/kim_idle.dae": "idle", "kim.dae": "character", "other.txt": "other"}
+    assert undo_renames(journalPath) == 0
+    assert read_files(directory) == files
+
+def test_undo_renames_fromAnotherWorkingDirectory(tmp_path, monkeypatch):
+    directory = tmp_path / "textures"
+    files = {"Ch02_1001_Diffuse.png": "diffuse", "Ch02_1001_Normal.png": "normal"}
+    write_files(str(directory), files)
+    #Renamed from the textures' directory with a relative path and the default journal, like the usage example
+    monkeypatch.chdir(directory)
+    replace_filenames_in_directory(".", "Ch02", "kim")
+    journalPath = str(directory / JOURNAL_NAME)
+    with open(journalPath, "r") as journalFile:
+        assert all(os.path.isabs(path) for line in journalFile for path in json.loads(line).values())
+    otherPath = tmp_path / "other"
+    os.makedirs(otherPath)
+    result = subprocess.run([sys.executable, FILES_RENAMER_PATH, "--undo", journalPath], cwd=otherPath, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout
+    assert read_files(str(directory)) == files
+    assert not os.path.exists(journalPath)
+
+def test_undo_renames_keepsJournalWhenARenameCannotBeUndone(tmp_path):
+    directory = str(tmp_path / "textures")
+    write_files(directory, {"Ch02_1001_Diffuse.png": "diffuse", "Ch02_1001_Normal.png": "normal"})
+    journalPath = str(tmp_path / JOURNAL_NAME)
+    replace_filenames_in_directory(directory, "Ch02", "kim", journalPath=journalPath)
+    #A renamed file that was moved away since can neither be undone nor was clearly never renamed
+    os.remove(os.path.join(directory, "kim_1001_Normal.png"))
+    assert undo_renames(journalPath) == 1
+    assert read_files(directory) == {"Ch02_1001_Diffuse.png": "diffuse"}
+    assert os.path.exists(journalPath)
+
+def test_undo_option_requiresAValue(tmp_path):
+    result = subprocess.run([sys.executable, FILES_RENAMER_PATH, "--undo"], cwd=tmp_path, capture_output=True, text=True)
+    assert result.returncode == 1
+    assert "Missing value for --undo" in result.stdout
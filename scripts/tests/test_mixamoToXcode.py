@@ -0,0 +1,16 @@
+import pytest
+
+from mixamoToXcode import FighterType, getTextureKey, updateDaeFile
+
+def test_updateDaeFile_pointsTexturesToAssets(tmp_path):
+    fighterType = FighterType.kim
+    daePath = tmp_path / "kim.dae"
+    daePath.write_text(f"<init_from>textures/{getTextureKey(fighterType)}_1001_Diffuse.png</init_from>\n")
+    assert updateDaeFile(fighterType, str(daePath)) == 1
+    assert daePath.read_text() == "<init_from>assets/kimTexture_1001_Diffuse.png</init_from>\n"
+
+def test_updateDaeFile_failsWithoutMixamoTextures(tmp_path):
+    daePath = tmp_path / "kim.dae"
+    daePath.write_text("<init_from>assets/kimTexture_1001_Diffuse.png</init_from>\n")
+    with pytest.raises(SystemExit):
+        updateDaeFile(FighterType.kim, str(daePath))
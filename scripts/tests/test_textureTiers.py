@@ -0,0 +1,42 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+from textureTiers import Image, generateTextureTiers, getTierPath, isNormalMap
+
+def writeBumpyNormalMap(path, size = 64):
+    """Writes a normal map whose neighboring normals point in different directions, so averaging their colors shortens them"""
+    normals = np.random.default_rng(0).normal(size=(size, size, 3))
+    normals[:, :, 2] = np.abs(normals[:, :, 2]) + 0.3
+    normals /= np.linalg.norm(normals, axis=2, keepdims=True)
+    Image.fromarray(np.round((normals + 1) / 2 * 255).astype(np.uint8)).save(path)
+
+def getNormalLengths(path):
+    with Image.open(path) as image:
+        normals = np.asarray(image.convert("RGB"), dtype=np.float32) / 255 * 2 - 1
+    return np.linalg.norm(normals, axis=2)
+
+def test_isNormalMap_matchesSuffixInAnyCase():
+    assert isNormalMap("Kim/assets/kimTexture2_Normal.png")
+    assert isNormalMap("Never Right/assets/neverRightTexture_normal.png")
+    assert not isNormalMap("Kim/assets/kimTexture2_Diffuse.png")
+    assert not isNormalMap("Never Right/assets/neverRightTexture_specular.png")
+
+def test_generateTextureTiers_keepsLowercaseNormalMapsUnitLength(tmp_path):
+    texturePath = str(tmp_path / "neverRightTexture_normal.png")
+    writeBumpyNormalMap(texturePath)
+    report = generateTextureTiers(texturePath)
+    assert report["error"] is None
+    for (tierName, size) in [("half", 32), ("quarter", 16)]:
+        with Image.open(getTierPath(texturePath, tierName)) as image:
+            assert image.size == (size, size)
+        lengths = getNormalLengths(getTierPath(texturePath, tierName))
+        #Within the rounding of 8 bit colors
+        assert np.abs(lengths - 1).max() < 0.02
+
+def test_generateTextureTiers_filtersOtherMapsAsColors(tmp_path):
+    texturePath = str(tmp_path / "neverRightTexture_diffuse.png")
+    writeBumpyNormalMap(texturePath)
+    assert generateTextureTiers(texturePath)["error"] is None
+    assert getNormalLengths(getTierPath(texturePath, "half")).mean() < 0.9
@@ -0,0 +1,157 @@
+# Recompresses the fighters' .png textures losslessly, storing each one in the smallest PNG color type that keeps every pixel
+
+import io
+import json
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+from Logger import *
+from buildCache import *
+from daeHelpers import writeLinesAtomically
+
+try:
+    from PIL import Image, ImageChops
+except ImportError:
+    Image = None
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+TEXTURE_SETTINGS = {"version": 1, "compress_level": 9, "optimize": True} #Bump the version when the optimizer's output changes
+OPTIMIZABLE_MODES = {"1", "L", "LA", "P", "RGB", "RGBA"} #16 bit and float images are left untouched
+PALETTE_COLOR_LIMIT = 256
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def requirePillow(stageName):
+    if Image is None:
+        LOGE(f"Pillow is required to {stageName}. Install it with: pip3 install pillow")
+        sys.exit(1)
+
+def getTexturePaths(path):
+    """Returns the sorted paths of every .png in path including its subdirectories"""
+    texturePaths = []
+    for root, dirs, files in os.walk(path):
+        for file in files:
+            if file.lower().endswith(".png"):
+                texturePaths.append(os.path.join(root, file))
+    return sorted(texturePaths)
+
+def isGrayscale(image):
+    """Returns True if every pixel of the RGB or RGBA image has the same red, green and blue values"""
+    red, green, blue = image.split()[:3]
+    return ImageChops.difference(red, green).getbbox() is None and ImageChops.difference(green, blue).getbbox() is None
+
+def getCandidateImages(image):
+    """Returns every color type the image could be stored as, from its RGBA pixels.
+    Candidates are not guaranteed to be lossless and must be checked with isSamePixels"""
+    hasAlpha = image.getextrema()[3] != (255, 255)
+    candidate = image if hasAlpha else image.convert("RGB")
+    if isGrayscale(image):
+        candidate = image.convert("LA") if hasAlpha else image.convert("L")
+    candidates = [candidate]
+    colors = image.getcolors(PALETTE_COLOR_LIMIT)
+    if colors is not None:
+        #Fewer colors let the palette use 1, 2 or 4 bits per pixel
+        if hasAlpha:
+            candidates.append(image.quantize(colors=len(colors), method=Image.Quantize.FASTOCTREE))
+        else:
+            candidates.append(image.convert("RGB").convert("P", palette=Image.Palette.ADAPTIVE, colors=len(colors)))
+    return candidates
+
+def encodePng(image):
+    """Returns the image as .png bytes without any ancillary chunk like text, XMP, dpi, gamma or ICC profile.
+    Textures are treated as sRGB, which is what every fighter texture's sRGB and gAMA chunks declare"""
+    output = io.BytesIO()
+    image.save(output, format="PNG", icc_profile=None, **{key: value for (key, value) in TEXTURE_SETTINGS.items() if key != "version"})
+    return output.getvalue()
+
+def isSamePixels(pngData, pixels):
+    with Image.open(io.BytesIO(pngData)) as image:
+        return image.convert("RGBA").tobytes() == pixels
+
+def optimizeTexture(texturePath):
+    """Rewrites the .png at texturePath with its smallest lossless encoding if it is smaller than the original.
+    Returns a report of the texture's sizes and color type, or its error"""
+    report = {"path": texturePath, "originalSize": os.path.getsize(texturePath), "optimizedSize": None, "mode": None, "isSkipped": False, "error": None}
+    try:
+        with Image.open(texturePath) as image:
+            report["mode"] = image.mode
+            if not image.mode in OPTIMIZABLE_MODES:
+                report["optimizedSize"] = report["originalSize"]
+                return report
+            image = image.convert("RGBA")
+        pixels = image.tobytes()
+        bestData = None
+        for candidate in getCandidateImages(image):
+            pngData = encodePng(candidate)
+            if (bestData is None or len(pngData) < len(bestData)) and isSamePixels(pngData, pixels):
+                bestData = pngData
+                report["mode"] = candidate.mode
+        if bestData is not None and len(bestData) < report["originalSize"]:
+            writeLinesAtomically([bestData], texturePath)
+        report["optimizedSize"] = os.path.getsize(texturePath)
+    except Exception as e:
+        report["error"] = f"Failed to optimize {texturePath}. Reason: {e}"
+    #Worker processes exit without flushing their buffered logs
+    flushLogs()
+    return report
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def optimizeTextures(texturePaths, jobs, manifest, reportPath = None):
+    """Optimizes each texture using up to jobs processes, skipping the ones the manifest shows were already optimized.
+    Writes every texture's before and after sizes into reportPath and returns the reports"""
+    requirePillow("optimize textures")
+    texturePathsToOptimize = [texturePath for texturePath in texturePaths if not manifest.isUpToDate(texturePath, TEXTURE_SETTINGS)]
+    if jobs > 1 and len(texturePathsToOptimize) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            reports = list(executor.map(optimizeTexture, texturePathsToOptimize))
+    else:
+        reports = list(map(optimizeTexture, texturePathsToOptimize))
+    originalSize = 0
+    optimizedSize = 0
+    for report in reports:
+        if report["error"] is not None:
+            LOGE(report["error"])
+            continue
+        #Record the optimized file, whose hash differs from the one read before optimizing it
+        manifest.refreshInputHash(report["path"])
+        manifest.record(report["path"], TEXTURE_SETTINGS, [])
+        originalSize += report["originalSize"]
+        optimizedSize += report["optimizedSize"]
+        LOGA(lambda: f"Optimized {report['path']} as {report['mode']} from {report['originalSize']} to {report['optimizedSize']} bytes")
+    manifest.save()
+    if reportPath is not None:
+        optimizedPaths = set(texturePathsToOptimize)
+        skippedReports = [{"path": texturePath, "originalSize": os.path.getsize(texturePath), "optimizedSize": os.path.getsize(texturePath), "mode": None, "isSkipped": True, "error": None}
+                          for texturePath in texturePaths if not texturePath in optimizedPaths]
+        writeLinesAtomically([json.dumps(sorted(reports + skippedReports, key=lambda report: report["path"]), indent=2).encode("utf-8")], reportPath)
+    LOG(f"Optimized {len(reports)} textures from {originalSize} to {optimizedSize} bytes, saving {originalSize - optimizedSize} bytes. Skipped {len(texturePaths) - len(texturePathsToOptimize)} unchanged textures")
+    return reports
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Main #######################################################
+#----------------------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    """
+    Execute by passing the folder of the textures to optimize, including its subdirectories
+        python3 "textureOptimizer.py" <path_to_folder> <optional --jobs N> <optional --force>
+        e.g. python3 "textureOptimizer.py" '../iOS/FuFight/Resources/3DAssets.scnassets/Characters' --jobs 8
+    """
+    from mixamoToXcode import TEXTURE_JOBS, TEXTURE_MANIFEST_PATH, TEXTURE_REPORT_PATH, getBuildManifest, popArgument
+    manifest = getBuildManifest(TEXTURE_MANIFEST_PATH)
+    jobs = popArgument("--jobs", hasValue=True)
+    jobs = TEXTURE_JOBS if jobs is None else int(jobs)
+    if len(sys.argv) != 2 or not os.path.isdir(sys.argv[1]) or jobs < 1:
+        LOGE("Error Usage: python3 textureOptimizer.py <path_to_folder> <optional --jobs N> <optional --force>")
+        sys.exit(1)
+    reports = optimizeTextures(getTexturePaths(sys.argv[1]), jobs, manifest, TEXTURE_REPORT_PATH)
+    if any(report["error"] is not None for report in reports):
+        sys.exit(1)
+    LOG(f"✅✅✅")
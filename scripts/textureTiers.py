@@ -0,0 +1,174 @@
+# Writes half and quarter size variants of the fighters' textures next to them, e.g. kimTexture2_Diffuse_half.png,
+# along with a textureTiers.json in each assets folder listing every tier's textures, so the app can load the smallest set that fits a device
+#
+# Normal maps are downscaled by averaging their unit normals and normalizing them again, since filtering their colors
+# would shorten and bend the normals. Every other map is downscaled with bilinear filtering
+
+import io
+import json
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+from Logger import *
+from buildCache import *
+from daeHelpers import writeLinesAtomically
+from daeAnimation import np, requireNumpy
+from textureOptimizer import Image, getTexturePaths, requirePillow
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Constants ##################################################
+#----------------------------------------------------------------------------------------------------------------
+
+TEXTURE_TIERS = {"half": 2, "quarter": 4} #Each tier's name, added to its textures' names, and how many times smaller it is
+TEXTURE_TIER_SETTINGS = {"version": 2, "tiers": TEXTURE_TIERS, "compress_level": 6} #Bump the version when the tiers' output changes
+TEXTURE_TIER_MANIFEST_NAME = "textureTiers.json"
+TEXTURE_TIER_MANIFEST_VERSION = 1 #Bump when the tier manifest's format changes
+NORMAL_MAP_SUFFIX = "_normal" #Ends the name of the normal maps in any case, e.g. kimTexture2_Normal.png or neverRightTexture_normal.png
+RESIZABLE_MODES = {"L", "LA", "RGB", "RGBA"} #Other modes like palettes are converted to RGBA before resizing
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Helper Methods #############################################
+#----------------------------------------------------------------------------------------------------------------
+def getTierPath(texturePath, tierName):
+    """Returns e.g. "kimTexture2_Diffuse_half.png" for kimTexture2_Diffuse.png"""
+    basePath, extension = os.path.splitext(texturePath)
+    return f"{basePath}_{tierName}{extension}"
+
+def isTierPath(texturePath):
+    return any(os.path.splitext(texturePath)[0].endswith(f"_{tierName}") for tierName in TEXTURE_TIERS)
+
+def getTierInputPaths(path):
+    """Returns the sorted paths of every .png in path including its subdirectories, without the tiers generated from them"""
+    return [texturePath for texturePath in getTexturePaths(path) if not isTierPath(texturePath)]
+
+def isNormalMap(texturePath):
+    """Returns True for normal maps, whose suffix getTextureNewName keeps as Mixamo wrote it e.g. _Normal or _normal"""
+    return os.path.splitext(os.path.basename(texturePath))[0].lower().endswith(NORMAL_MAP_SUFFIX)
+
+def getTierSize(size, scale):
+    return tuple(max(1, length // scale) for length in size)
+
+def resizeNormalMap(image, size):
+    """Returns the normal map resized by averaging the unit normals under each new pixel, then normalizing them.
+    The alpha channel, if any, is averaged like any other channel"""
+    hasAlpha = "A" in image.getbands()
+    pixels = np.asarray(image.convert("RGBA"), dtype=np.float32) / 255
+    channels = [pixels[:, :, index] * 2 - 1 for index in range(3)] + ([pixels[:, :, 3]] if hasAlpha else [])
+    resizedChannels = [np.asarray(Image.fromarray(channel).resize(size, Image.Resampling.BOX)) for channel in channels]
+    normals = np.stack(resizedChannels[:3], axis=2)
+    lengths = np.linalg.norm(normals, axis=2, keepdims=True)
+    #Normals cancelling out each other point straight out of the surface
+    normals = np.where(lengths > 1e-6, normals / np.maximum(lengths, 1e-6), np.array([0, 0, 1], dtype=np.float32))
+    resizedPixels = np.concatenate([(normals + 1) / 2] + [channel[:, :, None] for channel in resizedChannels[3:]], axis=2)
+    return Image.fromarray(np.clip(np.round(resizedPixels * 255), 0, 255).astype(np.uint8))
+
+def resizeTexture(image, size, isNormal):
+    if isNormal:
+        return resizeNormalMap(image, size)
+    if not image.mode in RESIZABLE_MODES:
+        image = image.convert("RGBA")
+    return image.resize(size, Image.Resampling.BILINEAR)
+
+def encodeTierPng(image):
+    """Returns the tier as .png bytes. The highest compression level takes seconds per normal map for a few percent, so tiers use a faster one"""
+    output = io.BytesIO()
+    image.save(output, format="PNG", compress_level=TEXTURE_TIER_SETTINGS["compress_level"])
+    return output.getvalue()
+
+def generateTextureTiers(texturePath):
+    """Writes every tier of the texture next to it. Returns a report of the tiers' paths, or its error"""
+    report = {"path": texturePath, "tierPaths": [], "error": None}
+    try:
+        with Image.open(texturePath) as image:
+            image.load()
+        isNormal = isNormalMap(texturePath)
+        for (tierName, scale) in TEXTURE_TIERS.items():
+            tierPath = getTierPath(texturePath, tierName)
+            #Each tier is resized from the full texture so its filtering errors do not add up
+            writeLinesAtomically([encodeTierPng(resizeTexture(image, getTierSize(image.size, scale), isNormal))], tierPath)
+            report["tierPaths"].append(tierPath)
+    except Exception as e:
+        report["error"] = f"Failed to generate the tiers of {texturePath}. Reason: {e}"
+    #Worker processes exit without flushing their buffered logs
+    flushLogs()
+    return report
+
+def getTierEntry(fighterPath, texturePath):
+    """Returns the tier manifest's entry of a texture, with the memory it takes once decoded as RGBA"""
+    with Image.open(texturePath) as image:
+        width, height = image.size
+    return {"path": os.path.relpath(texturePath, fighterPath).replace(os.sep, "/"), "width": width, "height": height, "size": os.path.getsize(texturePath), "memorySize": width * height * 4}
+
+def writeTierManifest(fighterPath, texturePaths):
+    """Writes the fighter's tier manifest listing each tier's textures keyed by the full texture's name, from the largest tier to the smallest.
+    Textures missing a tier are listed at full size in it"""
+    tiers = [("full", 1)] + list(TEXTURE_TIERS.items())
+    manifestTiers = []
+    for (tierName, scale) in tiers:
+        textures = {}
+        for texturePath in texturePaths:
+            tierPath = texturePath if scale == 1 else getTierPath(texturePath, tierName)
+            textures[os.path.basename(texturePath)] = getTierEntry(fighterPath, tierPath if os.path.isfile(tierPath) else texturePath)
+        manifestTiers.append({"name": tierName, "scale": 1 / scale, "memorySize": sum(entry["memorySize"] for entry in textures.values()), "textures": textures})
+    manifestPath = f"{fighterPath}/assets/{TEXTURE_TIER_MANIFEST_NAME}"
+    writeLinesAtomically([json.dumps({"version": TEXTURE_TIER_MANIFEST_VERSION, "tiers": manifestTiers}, indent=2).encode("utf-8")], manifestPath)
+    return manifestPath
+
+def getFighterPathsWithAssets(path):
+    """Returns path if it is a fighter's folder with an assets folder, otherwise the sorted fighters' folders inside it"""
+    if os.path.isdir(f"{path}/assets"):
+        return [path]
+    return sorted(entry.path for entry in os.scandir(path) if entry.is_dir() and os.path.isdir(f"{entry.path}/assets"))
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Methods ####################################################
+#----------------------------------------------------------------------------------------------------------------
+def generateFightersTextureTiers(fighterPaths, jobs, manifest):
+    """Writes the tiers of every fighter's textures using up to jobs processes, skipping the textures the manifest shows are unchanged,
+    then writes each fighter's tier manifest. Returns the reports of the textures whose tiers were generated"""
+    requirePillow("generate texture tiers")
+    requireNumpy("generate texture tiers")
+    texturePathsByFighter = {fighterPath: getTierInputPaths(f"{fighterPath}/assets") for fighterPath in fighterPaths}
+    texturePaths = [texturePath for fighterTexturePaths in texturePathsByFighter.values() for texturePath in fighterTexturePaths]
+    texturePathsToGenerate = [texturePath for texturePath in texturePaths if not manifest.isUpToDate(texturePath, TEXTURE_TIER_SETTINGS)]
+    if jobs > 1 and len(texturePathsToGenerate) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            reports = list(executor.map(generateTextureTiers, texturePathsToGenerate))
+    else:
+        reports = list(map(generateTextureTiers, texturePathsToGenerate))
+    for report in reports:
+        if report["error"] is not None:
+            LOGE(report["error"])
+            continue
+        manifest.record(report["path"], TEXTURE_TIER_SETTINGS, report["tierPaths"])
+        LOGA(lambda: f"Generated {len(report['tierPaths'])} tiers of {report['path']}")
+    manifest.save()
+    for (fighterPath, fighterTexturePaths) in texturePathsByFighter.items():
+        if len(fighterTexturePaths) > 0:
+            manifestPath = writeTierManifest(fighterPath, fighterTexturePaths)
+            LOGA(lambda: f"Wrote the texture tiers of {fighterPath} into {manifestPath}")
+    LOG(f"Generated the tiers of {len(reports)} textures. Skipped {len(texturePaths) - len(texturePathsToGenerate)} unchanged textures")
+    return reports
+
+#----------------------------------------------------------------------------------------------------------------
+#################################################### Main #######################################################
+#----------------------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    """
+    Execute by passing a fighter's folder or the folder of the fighters whose textures get tiers
+        python3 "textureTiers.py" <path_to_folder> <optional --jobs N> <optional --force>
+        e.g. python3 "textureTiers.py" '../iOS/FuFight/Resources/3DAssets.scnassets/Characters' --jobs 8
+    """
+    from mixamoToXcode import TEXTURE_JOBS, TEXTURE_TIER_BUILD_MANIFEST_PATH, getBuildManifest, popArgument
+    manifest = getBuildManifest(TEXTURE_TIER_BUILD_MANIFEST_PATH)
+    jobs = popArgument("--jobs", hasValue=True)
+    jobs = TEXTURE_JOBS if jobs is None else int(jobs)
+    if len(sys.argv) != 2 or not os.path.isdir(sys.argv[1]) or jobs < 1:
+        LOGE("Error Usage: python3 textureTiers.py <path_to_folder> <optional --jobs N> <optional --force>")
+        sys.exit(1)
+    reports = generateFightersTextureTiers(getFighterPathsWithAssets(sys.argv[1]), jobs, manifest)
+    if any(report["error"] is not None for report in reports):
+        sys.exit(1)
+    LOG(f"✅✅✅")